@@ -1,5 +1,5 @@
 import os
-import requests
+import sys
 import time
 from django.conf import settings
 
@@ -16,26 +16,21 @@ MAX_RESULTS = getattr(settings, "X_MAX_RESULTS", 5)
 
 
 def get_user_id_from_username(username):
-    """Si solo tienes username, obtener el user_id real desde la API."""
-    url = f"https://api.twitter.com/2/users/by/username/{username}"
-    headers = {"Authorization": f"Bearer {BEARER_TOKEN}"}
-    resp = requests.get(url, headers=headers)
+    """Si solo tienes username, obtener el user_id (caché en BD o users/by por lotes)."""
+    from social_ingestion.clients import XClient
+    from social_ingestion.resolver import normalize_username, resolve_usernames
 
-    if resp.status_code == 200:
-        data = resp.json()
-        return data["data"]["id"]
-    else:
-        print("❌ Error al obtener user_id:", resp.status_code, resp.text)
-        return None
+    user_id = resolve_usernames([username], XClient(BEARER_TOKEN)).get(normalize_username(username))
+    if not user_id:
+        print("❌ Error al obtener user_id de", username)
+    return user_id
 
 
 def check_rate_limit(user_id):
-    """Consulta tweets y muestra headers de rate limit."""
-    url = f"https://api.twitter.com/2/users/{user_id}/tweets"
-    params = {"max_results": MAX_RESULTS}
-    headers = {"Authorization": f"Bearer {BEARER_TOKEN}"}
+    """Consulta tweets y muestra headers de rate limit (usa X_API_BASE_URL, p. ej. stub_social_api)."""
+    from social_ingestion.clients import XClient
 
-    resp = requests.get(url, headers=headers)
+    resp = XClient(BEARER_TOKEN).get(f"users/{user_id}/tweets", params={"max_results": MAX_RESULTS})
 
     print("\n=== Estado de la API X ===")
     print("Código HTTP:", resp.status_code)
@@ -59,7 +54,38 @@ def check_rate_limit(user_id):
         print("❌ Error:", resp.text)
 
 
+def show_stored_quota():
+    """Muestra la última cuota conocida (guardada por fetch_social/run_ingestion) sin gastar peticiones."""
+    from social_ingestion.models import IngestionRun, SourceCursor
+
+    cursors = SourceCursor.objects.filter(platform="x", rate_remaining__isnull=False).order_by("-last_fetch_at")
+    print("\n=== Cuota de la API X (últimos headers guardados) ===")
+    if not cursors:
+        print("⚠️ Aún no hay datos de cuota. Ejecuta fetch_social o usa --live para consultar la API.")
+    now = time.time()
+    for cursor in cursors:
+        reset = cursor.rate_reset_at.timestamp() if cursor.rate_reset_at else None
+        if reset and reset <= now:
+            state = "ventana ya reiniciada"
+        elif reset:
+            state = f"reset en {reset - now:.0f} s"
+        else:
+            state = "reset desconocido"
+        print(f"- {cursor.source_key}: {cursor.rate_remaining}/{cursor.rate_limit or '?'} restantes ({state})")
+
+    last_run = IngestionRun.objects.first()
+    if last_run:
+        print(
+            f"Última ejecución: {last_run.command} {last_run.finished_at:%Y-%m-%d %H:%M} UTC, "
+            f"{last_run.requests} peticiones, {last_run.throttled} con 429, {last_run.inserted} posts guardados"
+        )
+
+
 if __name__ == "__main__":
+    if "--live" not in sys.argv:
+        show_stored_quota()
+        sys.exit(0)
+
     if USERNAME and not USER_ID:
         USER_ID = get_user_id_from_username(USERNAME)
 
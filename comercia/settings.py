@@ -185,6 +185,54 @@ X_USER_ID = os.getenv("X_USER_ID", "")  # ID del usuario a analizar
 X_USERNAME = os.getenv("X_USERNAME", "")  # ej. "TwitterDev" (sin @)
 # Limitar cantidad de tweets por petición (para ahorrar tokens)
 X_MAX_RESULTS = int(os.getenv("X_MAX_RESULTS", "3"))
+# Base de la API de X (cambiar para apuntar a un servidor de prueba local)
+X_API_BASE_URL = os.getenv("X_API_BASE_URL", "https://api.twitter.com/2")
+# Páginas máximas (next_token) por cuenta al ponerse al día desde since_id
+X_MAX_PAGES = int(os.getenv("X_MAX_PAGES", "10"))
+# Días que se conserva en BD la resolución username -> id de X
+X_USER_CACHE_TTL_DAYS = int(os.getenv("X_USER_CACHE_TTL_DAYS", "7"))
+# Peticiones concurrentes a X al recorrer varias cuentas vinculadas
+X_FETCH_CONCURRENCY = int(os.getenv("X_FETCH_CONCURRENCY", "8"))
+# Espera máxima (segundos) por un reset de rate limit antes de dejar la cuenta para la próxima ejecución
+X_RATE_LIMIT_MAX_WAIT = int(os.getenv("X_RATE_LIMIT_MAX_WAIT", "90"))
+# Cada cuántos segundos revisa cada proceso si cambió la taxonomía de palabras clave
+TAXONOMY_CHECK_SECONDS = int(os.getenv("TAXONOMY_CHECK_SECONDS", "30"))
+# Daemon run_ingestion: límites del intervalo adaptativo por fuente (segundos)
+INGESTION_MIN_INTERVAL = int(os.getenv("INGESTION_MIN_INTERVAL", "60"))
+INGESTION_MAX_INTERVAL = int(os.getenv("INGESTION_MAX_INTERVAL", "3600"))
+# Publicaciones nuevas que se espera acumular entre consultas y peso del promedio móvil
+INGESTION_TARGET_POSTS = int(os.getenv("INGESTION_TARGET_POSTS", "5"))
+INGESTION_EWMA_ALPHA = float(os.getenv("INGESTION_EWMA_ALPHA", "0.3"))
+# Casi duplicados (SimHash): días hacia atrás en que se buscan y bits de diferencia tolerados (máx. 3)
+SOCIAL_DEDUP_WINDOW_DAYS = int(os.getenv("SOCIAL_DEDUP_WINDOW_DAYS", "7"))
+SOCIAL_DEDUP_MAX_DISTANCE = int(os.getenv("SOCIAL_DEDUP_MAX_DISTANCE", "3"))
+# Payloads originales de posts: antigüedad (días) a partir de la cual archive_payloads los mueve a disco
+SOCIAL_PAYLOAD_ARCHIVE_DAYS = int(os.getenv("SOCIAL_PAYLOAD_ARCHIVE_DAYS", "90"))
+# Meses de SocialPost que conserva prune_social_posts (incluido el actual)
+SOCIAL_POST_RETENTION_MONTHS = int(os.getenv("SOCIAL_POST_RETENTION_MONTHS", "12"))
+SOCIAL_ARCHIVE_DIR = os.getenv("SOCIAL_ARCHIVE_DIR", str(BASE_DIR / "archive" / "social"))
+# Base de la Bot API de Telegram (cambiar para apuntar a stub_social_api)
+TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org")
+# Si se define, las respuestas reales de X y Telegram se agregan a este cassette JSONL para reproducirlas offline
+SOCIAL_API_CASSETTE = os.getenv("SOCIAL_API_CASSETTE", "")
+# Token Bearer para /metrics/ (Prometheus); vacío = solo usuarios staff
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Secreto compartido con Telegram (setWebhook secret_token) para validar /telegram/webhook/
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+# Días que se conservan los updates de Telegram ya procesados antes de borrarlos de la cola
+TELEGRAM_UPDATE_RETENTION_DAYS = int(os.getenv("TELEGRAM_UPDATE_RETENTION_DAYS", "7"))
+# Recomendaciones: días en que el peso de un post/interés cae a la mitad, y lo mismo para la frescura del producto
+RECOMMENDATION_HALF_LIFE_DAYS = float(os.getenv("RECOMMENDATION_HALF_LIFE_DAYS", "30"))
+RECOMMENDATION_FRESHNESS_HALF_LIFE_DAYS = float(os.getenv("RECOMMENDATION_FRESHNESS_HALF_LIFE_DAYS", "14"))
+# Días de posts que se leen para la afinidad (pasado ese horizonte el peso es despreciable)
+RECOMMENDATION_HISTORY_DAYS = float(os.getenv("RECOMMENDATION_HISTORY_DAYS", "240"))
+# Peso de la popularidad (favoritos + comentarios) y de la frescura frente a la afinidad
+RECOMMENDATION_POPULARITY_WEIGHT = float(os.getenv("RECOMMENDATION_POPULARITY_WEIGHT", "0.2"))
+RECOMMENDATION_FRESHNESS_WEIGHT = float(os.getenv("RECOMMENDATION_FRESHNESS_WEIGHT", "0.1"))
+# Peso de los vecinos ítem-ítem de los favoritos del usuario (tabla de build_product_neighbors)
+RECOMMENDATION_COLLABORATIVE_WEIGHT = float(os.getenv("RECOMMENDATION_COLLABORATIVE_WEIGHT", "0.5"))
+# Segundos que cada proceso reutiliza la matriz de vectores de productos
+RECOMMENDATION_INDEX_TTL = int(os.getenv("RECOMMENDATION_INDEX_TTL", "300"))
 
 # Allies API URL (service from previous team)
 ALLY_PRODUCTS_API_URL = os.getenv('ALLY_PRODUCTS_API_URL', '')
@@ -26,7 +26,12 @@ from django.views.static import serve
 from django.conf.urls.i18n import i18n_patterns
 from django.urls import include
 
-urlpatterns = [path('i18n/', include('django.conf.urls.i18n'))]
+urlpatterns = [
+    path('i18n/', include('django.conf.urls.i18n')),
+    # Sin prefijo de idioma: Telegram y Prometheus no siguen la redirección a /es/
+    path('metrics/', social_views.ingestion_metrics, name='ingestion_metrics'),
+    path('telegram/webhook/', social_views.telegram_webhook, name='telegram_webhook'),
+]
 
 urlpatterns += i18n_patterns(
     # Admin
@@ -79,6 +84,7 @@ urlpatterns += i18n_patterns(
     path('profile/create/', profile_views.create_profile, name='create_profile'),
     path('profile/edit/', profile_views.edit_profile, name='edit_profile'),
     path('seller/<int:user_id>/', profile_views.public_profile, name='public_profile'),
+    path('seller/<int:user_id>/products/', profile_views.public_profile_products, name='public_profile_products'),
     path('sellers/', profile_views.seller_list, name='seller_list'),
 
     # Social ingestion URLs
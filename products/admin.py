@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Product, Comment, Favorite
+from .models import Product, Comment, Favorite, ProductNeighbor
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
@@ -19,4 +19,10 @@ class CommentAdmin(admin.ModelAdmin):
 class FavoriteAdmin(admin.ModelAdmin):
     list_display = ('user', 'product', 'created_at')
     list_filter = ('created_at',)
-    search_fields = ('user__username', 'product__name')
\ No newline at end of file
+    search_fields = ('user__username', 'product__name')
+
+@admin.register(ProductNeighbor)
+class ProductNeighborAdmin(admin.ModelAdmin):
+    list_display = ('product', 'rank', 'neighbor', 'score')
+    search_fields = ('product__name', 'neighbor__name')
+    raw_id_fields = ('product', 'neighbor')
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.services.similarity import rebuild_product_neighbors
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los productos similares (coseno ítem-ítem sobre favoritos) "
+        "para el bloque 'quienes guardaron esto también guardaron' y las recomendaciones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-n", type=int, default=10, help="Vecinos guardados por producto (default: 10)")
+        parser.add_argument("--block-size", type=int, default=2000, help="Productos por bloque de cálculo")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        result = rebuild_product_neighbors(top_n=options["top_n"], block_size=options["block_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.rows} vecinos guardados para {result.products} productos "
+            f"({result.users} usuarios) en {time.monotonic() - started:.1f}s."
+        ))
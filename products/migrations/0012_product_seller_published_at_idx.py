@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_product_description_en_product_name_en'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['seller', 'published_at'], name='products_pr_seller__6e7df0_idx'),
+        ),
+    ]
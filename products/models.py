@@ -130,6 +130,7 @@ class Product(models.Model):
             models.Index(fields=['name']),
             models.Index(fields=['category']),
             models.Index(fields=['available']),
+            models.Index(fields=['seller', 'published_at']),
         ]
 
     @property
@@ -212,6 +213,36 @@ class Favorite(models.Model):
     def __str__(self):
         return f'{self.user.username} ♥ {self.product.name}'
 
+class ProductNeighbor(models.Model):
+    """Vecinos más parecidos de un producto según quién lo guardó en favoritos (coseno ítem-ítem)"""
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='neighbors'
+    )
+    neighbor = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    rank = models.PositiveSmallIntegerField(
+        verbose_name='Posición'
+    )
+    score = models.FloatField(
+        verbose_name='Similitud'
+    )
+
+    class Meta:
+        verbose_name = 'Producto similar'
+        verbose_name_plural = 'Productos similares'
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='product_neighbor_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.product_id} -> {self.neighbor_id} ({self.score:.2f})'
+
 class ChatQuery(models.Model):
     """Modelo que almacena las consultas procesadas por el chatbot de IA"""
     query = models.TextField(
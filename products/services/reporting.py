@@ -1,44 +1,90 @@
 from abc import ABC, abstractmethod
-from typing import Iterable, Tuple
+from typing import Iterable, Iterator, Tuple
 from django.conf import settings
+from django.db.models import QuerySet
 import csv
-import io
 import json
 
+# Columnas del reporte, en orden
+FIELDS = ('id', 'name', 'category', 'price', 'available')
+# Filas por fragmento al transmitir y por lote al leer de la BD
+CHUNK_ROWS = 500
+
+
+def report_rows(products: Iterable) -> Iterator[tuple]:
+    """Tuplas (id, name, category, price, available).
+
+    Un queryset se lee con ``values_list().iterator()``: sin instanciar
+    modelos ni cargar todo el catálogo en memoria.
+    """
+    if isinstance(products, QuerySet):
+        return products.values_list(*FIELDS).iterator(chunk_size=CHUNK_ROWS)
+    return (tuple(getattr(p, name) for name in FIELDS) for p in products)
+
+
+class _Echo:
+    """Pseudo-archivo para csv.writer: devuelve la línea en vez de guardarla"""
+    def write(self, value: str) -> str:
+        return value
+
 
 class ReportGenerator(ABC):
+    content_type = 'application/octet-stream'
+    filename = 'products_report'
+
     @abstractmethod
+    def stream(self, products: Iterable) -> Iterator[bytes]:
+        """
+        Yields the report as encoded chunks (for StreamingHttpResponse)
+        """
+        raise NotImplementedError
+
     def generate(self, products: Iterable) -> Tuple[bytes, str, str]:
         """
         Returns (content_bytes, content_type, filename)
         """
-        raise NotImplementedError
+        return b''.join(self.stream(products)), self.content_type, self.filename
 
 
 class CSVReportGenerator(ReportGenerator):
-    def generate(self, products: Iterable) -> Tuple[bytes, str, str]:
-        buffer = io.StringIO()
-        writer = csv.writer(buffer)
-        writer.writerow(['id', 'name', 'category', 'price', 'available'])
-        for p in products:
-            writer.writerow([p.id, p.name, p.category, f"{p.price}", 'yes' if p.available else 'no'])
-        data = buffer.getvalue().encode('utf-8')
-        return data, 'text/csv; charset=utf-8', 'products_report.csv'
+    content_type = 'text/csv; charset=utf-8'
+    filename = 'products_report.csv'
+
+    def stream(self, products: Iterable) -> Iterator[bytes]:
+        writer = csv.writer(_Echo())
+        chunk = [writer.writerow(FIELDS)]
+        for pk, name, category, price, available in report_rows(products):
+            chunk.append(writer.writerow([pk, name, category, f"{price}", 'yes' if available else 'no']))
+            if len(chunk) >= CHUNK_ROWS:
+                yield ''.join(chunk).encode('utf-8')
+                chunk = []
+        if chunk:
+            yield ''.join(chunk).encode('utf-8')
 
 
 class JSONReportGenerator(ReportGenerator):
-    def generate(self, products: Iterable) -> Tuple[bytes, str, str]:
-        payload = []
-        for p in products:
-            payload.append({
-                'id': p.id,
-                'name': p.name,
-                'category': p.category,
-                'price': float(p.price),
-                'available': p.available,
-            })
-        data = json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8')
-        return data, 'application/json; charset=utf-8', 'products_report.json'
+    content_type = 'application/json; charset=utf-8'
+    filename = 'products_report.json'
+
+    def stream(self, products: Iterable) -> Iterator[bytes]:
+        # Mismo texto que json.dumps(lista, indent=2), armado objeto por objeto
+        chunk: list[str] = []
+        separator = '[\n'
+        for pk, name, category, price, available in report_rows(products):
+            item = json.dumps({
+                'id': pk,
+                'name': name,
+                'category': category,
+                'price': float(price),
+                'available': available,
+            }, ensure_ascii=False, indent=2)
+            chunk.append(separator + '  ' + item.replace('\n', '\n  '))
+            separator = ',\n'
+            if len(chunk) >= CHUNK_ROWS:
+                yield ''.join(chunk).encode('utf-8')
+                chunk = []
+        chunk.append('\n]' if separator == ',\n' else '[]')
+        yield ''.join(chunk).encode('utf-8')
 
 
 def get_report_generator() -> ReportGenerator:
@@ -46,5 +92,3 @@ def get_report_generator() -> ReportGenerator:
     if strategy == 'json':
         return JSONReportGenerator()
     return CSVReportGenerator()
-
-
@@ -0,0 +1,88 @@
+"""Filtrado colaborativo ítem-ítem a partir de ``Favorite``.
+
+El trabajo offline arma la matriz usuario x producto con ``scipy.sparse``,
+normaliza cada columna (producto) y calcula la similitud coseno por bloques
+de productos, así la memoria queda acotada por ``block_size`` y no por el
+catálogo completo. De cada producto se guardan solo sus ``top_n`` vecinos en
+``ProductNeighbor``; leerlos es una consulta por el índice (product, rank).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from django.db import transaction
+from django.dispatch import Signal
+from scipy import sparse
+
+from products.models import Favorite, ProductNeighbor
+
+# Se emite al terminar de reconstruir la tabla (las listas de recomendación la escuchan)
+neighbors_rebuilt = Signal()
+
+
+@dataclass
+class NeighborsResult:
+    users: int
+    products: int
+    rows: int
+
+
+def build_favorite_matrix() -> tuple[sparse.csr_matrix, np.ndarray]:
+    """Matriz binaria usuario x producto y los ids de producto de cada columna"""
+    pairs = np.array(list(Favorite.objects.values_list('user_id', 'product_id').iterator(chunk_size=5000)),
+                     dtype=np.int64).reshape(-1, 2)
+    user_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    product_ids, cols = np.unique(pairs[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32), (rows, cols)),
+        shape=(len(user_ids), len(product_ids)),
+    )
+    return matrix, product_ids
+
+
+def top_neighbors(matrix: sparse.spmatrix, top_n: int, block_size: int = 2000):
+    """Genera (columna, [(columna_vecina, coseno), ...]) ordenados de mayor a menor"""
+    matrix = sparse.csc_matrix(matrix, dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1.0
+    normalized = (matrix @ sparse.diags(1.0 / norms)).tocsc()
+    transposed = normalized.T.tocsr()
+    for start in range(0, normalized.shape[1], block_size):
+        block = (transposed[start:start + block_size] @ normalized).tocsr()
+        for offset in range(block.shape[0]):
+            column = start + offset
+            row = block.getrow(offset)
+            keep = row.indices != column
+            indices, scores = row.indices[keep], row.data[keep]
+            if not indices.size:
+                continue
+            if indices.size > top_n:
+                top = np.argpartition(-scores, top_n - 1)[:top_n]
+                indices, scores = indices[top], scores[top]
+            order = np.lexsort((indices, -scores))
+            yield column, [(int(indices[i]), float(scores[i])) for i in order]
+
+
+def rebuild_product_neighbors(top_n: int = 10, block_size: int = 2000) -> NeighborsResult:
+    """Recalcula toda la tabla ``ProductNeighbor`` en una transacción"""
+    matrix, product_ids = build_favorite_matrix()
+    objs = [
+        ProductNeighbor(
+            product_id=int(product_ids[column]), neighbor_id=int(product_ids[other]), rank=rank, score=score,
+        )
+        for column, neighbors in top_neighbors(matrix, top_n, block_size)
+        for rank, (other, score) in enumerate(neighbors, start=1)
+    ]
+    with transaction.atomic():
+        ProductNeighbor.objects.all().delete()
+        ProductNeighbor.objects.bulk_create(objs, batch_size=1000)
+    neighbors_rebuilt.send(sender=ProductNeighbor)
+    return NeighborsResult(users=matrix.shape[0], products=matrix.shape[1], rows=len(objs))
+
+
+def also_saved(product, limit: int = 6) -> list:
+    """Bloque "quienes guardaron esto también guardaron": una consulta por índice"""
+    return [
+        n.neighbor for n in
+        ProductNeighbor.objects.filter(product=product, neighbor__available=True)
+        .select_related('neighbor').order_by('rank')[:limit]
+    ]
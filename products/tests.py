@@ -1,8 +1,13 @@
+import csv
+import io
+import json
+
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
-from .models import Product
-from .services.reporting import CSVReportGenerator
+from .models import Favorite, Product, ProductNeighbor
+from .services.reporting import CSVReportGenerator, JSONReportGenerator
+from .services.similarity import rebuild_product_neighbors
 
 
 class ProductsApiTests(TestCase):
@@ -34,3 +39,70 @@ class ReportGeneratorTests(TestCase):
         self.assertIsInstance(content, (bytes, bytearray))
         self.assertIn('text/csv', content_type)
         self.assertTrue(filename.endswith('.csv'))
+
+
+class StreamingReportTests(TestCase):
+    def setUp(self):
+        seller = User.objects.create_user(username='r', password='p')
+        for i, name in enumerate(['Pan', 'Café "tostado"', 'Camisa, roja']):
+            Product.objects.create(
+                name=name, description='D', price=i + 0.5, seller=seller, available=bool(i % 2),
+                image='products/test.jpg',
+            )
+
+    def test_json_stream_matches_full_dump(self):
+        expected = json.dumps([
+            {'id': p.id, 'name': p.name, 'category': p.category, 'price': float(p.price), 'available': p.available}
+            for p in Product.objects.order_by('id')
+        ], ensure_ascii=False, indent=2).encode('utf-8')
+        gen = JSONReportGenerator()
+        with self.assertNumQueries(1):
+            streamed = b''.join(gen.stream(Product.objects.order_by('id')))
+        self.assertEqual(streamed, expected)
+        self.assertEqual(b''.join(gen.stream(Product.objects.none())), b'[]')
+
+    def test_csv_stream_reads_values_only_and_quotes(self):
+        with self.assertNumQueries(1):
+            content, _, _ = CSVReportGenerator().generate(Product.objects.order_by('id'))
+        rows = list(csv.reader(io.StringIO(content.decode('utf-8'))))
+        self.assertEqual(rows[0], ['id', 'name', 'category', 'price', 'available'])
+        self.assertEqual([r[1] for r in rows[1:]], ['Pan', 'Café "tostado"', 'Camisa, roja'])
+        self.assertEqual(rows[2][4], 'yes')
+
+    def test_download_report_streams(self):
+        response = self.client.get(reverse('download_report'))
+        self.assertTrue(response.streaming)
+        self.assertIn('products_report.csv', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content).count(b'\r\n'), 4)
+
+
+class ProductNeighborTests(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user(username='s', password='p')
+        self.products = {
+            name: Product.objects.create(
+                name=name, description='D', price=5, seller=self.seller, image='products/test.jpg',
+            )
+            for name in ('Pan', 'Queso', 'Vino', 'Camisa')
+        }
+        saves = {'a': ['Pan', 'Queso', 'Vino'], 'b': ['Pan', 'Queso'], 'c': ['Camisa']}
+        for username, names in saves.items():
+            user = User.objects.create_user(username=username, password='p')
+            for name in names:
+                Favorite.objects.create(user=user, product=self.products[name])
+
+    def test_rebuild_stores_top_cosine_neighbors(self):
+        result = rebuild_product_neighbors(top_n=1)
+        self.assertEqual((result.users, result.products), (3, 4))
+        pan = self.products['Pan']
+        neighbor = ProductNeighbor.objects.get(product=pan)
+        self.assertEqual((neighbor.neighbor, neighbor.rank), (self.products['Queso'], 1))
+        self.assertAlmostEqual(neighbor.score, 1.0, places=5)
+        self.assertFalse(ProductNeighbor.objects.filter(product=self.products['Camisa']).exists())
+
+    def test_detail_shows_also_saved_block(self):
+        rebuild_product_neighbors(top_n=5)
+        response = self.client.get(reverse('product_detail', args=[self.products['Vino'].id]))
+        self.assertEqual(
+            [p.name for p in response.context['also_saved']], ['Pan', 'Queso'],
+        )
@@ -1,5 +1,5 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.http import HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from .models import Product, Comment, Favorite, ChatQuery
 from seller_profiles.models import SellerProfile
 from django.contrib.auth.decorators import login_required
@@ -18,6 +18,7 @@ from django.core.paginator import Paginator
 from django.urls import reverse
 import requests
 from .services.reporting import get_report_generator
+from .services.similarity import also_saved
 
 # Importar pyngrok para poder iniciar ngrok desde Django
 from pyngrok import ngrok, conf
@@ -276,7 +277,8 @@ def product_detail(request, product_id):
         'comment_form': comment_form,
         'is_favorite': is_favorite,
         'seller_profile': seller_profile,
-        'whatsapp_link': whatsapp_link
+        'whatsapp_link': whatsapp_link,
+        'also_saved': also_saved(product),
     })
 
 def register_whatsapp_click(request):
@@ -417,12 +419,11 @@ def aliados_list(request):
 
 
 def download_report(request):
-    """Generate a report using DI and return as attachment"""
+    """Generate a report using DI and stream it as attachment (constant memory)"""
     generator = get_report_generator()
     products = Product.objects.all().order_by('-published_at')
-    content, content_type, filename = generator.generate(products)
-    response = HttpResponse(content, content_type=content_type)
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response = StreamingHttpResponse(generator.stream(products), content_type=generator.content_type)
+    response['Content-Disposition'] = f'attachment; filename="{generator.filename}"'
     return response
 
 
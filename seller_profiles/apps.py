@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SellerProfilesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'seller_profiles'
+
+    def ready(self):
+        from . import signals  # noqa: F401
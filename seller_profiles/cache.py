@@ -0,0 +1,37 @@
+import time
+
+from .models import SellerProfile
+
+# La existencia del perfil se recuerda en la sesión del usuario (compartida por todos
+# los workers porque vive en la BD/backend de sesiones). Solo se recuerda un resultado
+# positivo y por pocos minutos: un usuario sin perfil siempre se comprueba en la BD
+# (solo pasa en las vistas de vendedor), así que nunca queda un "no" obsoleto que lo
+# devuelva a create_profile, y un perfil borrado desde el admin deja de contar al vencer el TTL.
+PROFILE_FLAG_SESSION_KEY = 'seller_profile_checked_at'
+PROFILE_FLAG_TTL = 5 * 60
+
+
+def has_seller_profile(user, session=None) -> bool:
+    """Indica si el usuario tiene perfil de vendedor sin consultar la BD en cada petición"""
+    if not user.is_authenticated:
+        return False
+    # Memoizar en el objeto usuario durante la petición
+    cached = getattr(user, '_has_seller_profile', None)
+    if cached is not None:
+        return cached
+    checked_at = session.get(PROFILE_FLAG_SESSION_KEY) if session is not None else None
+    if checked_at is not None and time.time() - checked_at < PROFILE_FLAG_TTL:
+        exists = True
+    else:
+        exists = SellerProfile.objects.filter(user_id=user.pk).exists()
+        if session is not None:
+            set_profile_flag(session, exists)
+    user._has_seller_profile = exists
+    return exists
+
+
+def set_profile_flag(session, exists: bool) -> None:
+    if exists:
+        session[PROFILE_FLAG_SESSION_KEY] = time.time()
+    else:
+        session.pop(PROFILE_FLAG_SESSION_KEY, None)
@@ -0,0 +1,89 @@
+"""Listado paginado por cursor del catálogo de un vendedor.
+
+Los productos se ordenan por ``(-published_at, -id)`` usando el índice
+``(seller, published_at)`` de ``Product``. La primera página de cada
+vendedor se guarda en caché y se invalida cuando cambia uno de sus productos.
+"""
+import base64
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from products.models import Product
+
+PAGE_SIZE = 12
+CATALOG_CACHE_KEY = 'seller_catalog:{seller_id}'
+CATALOG_CACHE_TTL = 60 * 15
+
+
+def encode_cursor(published_at: datetime, product_id: int) -> str:
+    raw = f"{published_at.isoformat()}|{product_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int] | None:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        published_at, product_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(published_at), int(product_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def _serialize(product: Product) -> dict:
+    return {
+        'id': product.id,
+        'name': product.name,
+        'name_en': product.name_en,
+        'category': product.category,
+        'category_display': product.get_category_display(),
+        'price': float(product.price),
+        'image_url': product.image.url if product.image else None,
+    }
+
+
+def _fetch_page(seller_id: int, position: tuple[datetime, int] | None, page_size: int) -> dict:
+    products = (
+        Product.objects.filter(seller_id=seller_id, available=True)
+        .order_by('-published_at', '-id')
+    )
+    if position is not None:
+        published_at, product_id = position
+        products = products.filter(
+            Q(published_at__lt=published_at) |
+            Q(published_at=published_at, id__lt=product_id)
+        )
+    # Pedir un elemento extra para saber si hay página siguiente
+    rows = list(products[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.published_at, last.id)
+    return {
+        'products': [_serialize(p) for p in rows],
+        'next_cursor': next_cursor,
+    }
+
+
+def get_catalog_page(seller_id: int, cursor: str | None = None, page_size: int = PAGE_SIZE) -> dict:
+    """Retorna ``{'products': [...], 'next_cursor': str | None}``"""
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            return {'products': [], 'next_cursor': None}
+        return _fetch_page(seller_id, position, page_size)
+
+    if page_size != PAGE_SIZE:
+        return _fetch_page(seller_id, None, page_size)
+    key = CATALOG_CACHE_KEY.format(seller_id=seller_id)
+    page = cache.get(key)
+    if page is None:
+        page = _fetch_page(seller_id, None, page_size)
+        cache.set(key, page, CATALOG_CACHE_TTL)
+    return page
+
+
+def invalidate_catalog(seller_id: int) -> None:
+    cache.delete(CATALOG_CACHE_KEY.format(seller_id=seller_id))
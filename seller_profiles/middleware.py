@@ -1,25 +1,28 @@
 from django.shortcuts import redirect
 from django.contrib import messages
-from django.urls import resolve, reverse
+
+from .cache import has_seller_profile
+
+# Vistas que requieren perfil de vendedor
+SELLER_URLS = {'add_product', 'edit_product', 'delete_product'}
+
 
 class SellerProfileMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        if request.user.is_authenticated and not request.path.startswith('/admin/'):
-            current_url = resolve(request.path_info).url_name
-            seller_urls = ['add_product', 'edit_product', 'delete_product']
-            
-            if current_url in seller_urls:
-                try:
-                    request.user.seller_profile
-                except:
-                    messages.warning(
-                        request,
-                        'Necesitas crear un perfil de vendedor antes de publicar productos.'
-                    )
-                    return redirect('create_profile')
+        return self.get_response(request)
 
-        response = self.get_response(request)
-        return response 
\ No newline at end of file
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Django ya resolvió la URL: reutilizar request.resolver_match
+        match = request.resolver_match
+        if match is None or match.url_name not in SELLER_URLS:
+            return None
+        if request.user.is_authenticated and not has_seller_profile(request.user, request.session):
+            messages.warning(
+                request,
+                'Necesitas crear un perfil de vendedor antes de publicar productos.'
+            )
+            return redirect('create_profile')
+        return None
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from seller_profiles import search
+
+
+def build_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if not search.is_supported(conn):
+        return
+    search.create_index(conn)
+    SellerProfile = apps.get_model('seller_profiles', 'SellerProfile')
+    for profile in SellerProfile.objects.select_related('user').iterator():
+        search.write_document(conn, profile.pk, search.profile_documents(profile))
+
+
+def drop_index(apps, schema_editor):
+    search.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller_profiles', '0006_sellerprofile_description_en_sellerprofile_slogan_en'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_index, drop_index),
+    ]
@@ -0,0 +1,142 @@
+"""Índice de búsqueda de texto completo para el directorio de vendedores.
+
+En SQLite se usa una tabla virtual FTS5 y en PostgreSQL una tabla con una
+columna ``tsvector`` e índice GIN. En otros motores ``search_profile_ids``
+devuelve ``None`` y la vista usa el filtro ``icontains`` de siempre.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+
+SEARCH_TABLE = 'seller_profiles_search'
+
+# Peso de cada columna en el ranking: nombre > usuario > slogan > descripción
+COLUMN_WEIGHTS = {
+    'store_name': 10.0,
+    'username': 6.0,
+    'slogan': 4.0,
+    'description': 1.0,
+}
+_PG_WEIGHTS = {'store_name': 'A', 'username': 'B', 'slogan': 'C', 'description': 'D'}
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def fold(text: str | None) -> str:
+    """Pasa a minúsculas y elimina tildes para que 'Café' y 'cafe' coincidan"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def _documents(store_name, slogan, slogan_en, description, description_en, username) -> dict[str, str]:
+    return {
+        'store_name': fold(store_name),
+        'username': fold(username),
+        'slogan': fold(' '.join(filter(None, [slogan, slogan_en]))),
+        'description': fold(' '.join(filter(None, [description, description_en]))),
+    }
+
+
+def profile_documents(profile) -> dict[str, str]:
+    return _documents(
+        profile.store_name, profile.slogan, profile.slogan_en,
+        profile.description, profile.description_en, profile.user.username,
+    )
+
+
+def is_supported(conn=None) -> bool:
+    return (conn or connection).vendor in ('sqlite', 'postgresql')
+
+
+def create_index(conn) -> None:
+    """Crea la tabla del índice si el motor lo soporta"""
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+                'store_name, username, slogan, description, '
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        elif conn.vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+                'profile_id bigint PRIMARY KEY, document tsvector NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx '
+                f'ON {SEARCH_TABLE} USING GIN (document)'
+            )
+
+
+def drop_index(conn) -> None:
+    if is_supported(conn):
+        with conn.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+def write_document(conn, profile_id: int, docs: dict[str, str]) -> None:
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [profile_id])
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, store_name, username, slogan, description) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [profile_id, docs['store_name'], docs['username'], docs['slogan'], docs['description']],
+            )
+        elif conn.vendor == 'postgresql':
+            vector_sql = ' || '.join(
+                f"setweight(to_tsvector('simple', %s), '{_PG_WEIGHTS[col]}')" for col in _PG_WEIGHTS
+            )
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (profile_id, document) VALUES (%s, {vector_sql}) '
+                'ON CONFLICT (profile_id) DO UPDATE SET document = EXCLUDED.document',
+                [profile_id] + [docs[col] for col in _PG_WEIGHTS],
+            )
+
+
+def index_profile(profile) -> None:
+    if is_supported():
+        write_document(connection, profile.pk, profile_documents(profile))
+
+
+def remove_profile(profile_id: int) -> None:
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [profile_id])
+        else:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE profile_id = %s', [profile_id])
+
+
+def search_profile_ids(query: str, limit: int = 200) -> list[int] | None:
+    """Devuelve los ids de perfiles ordenados por relevancia.
+
+    Cada palabra se busca como prefijo y todas deben aparecer. Retorna
+    ``None`` si el motor no tiene índice disponible.
+    """
+    if not is_supported():
+        return None
+    tokens = _TOKEN_RE.findall(fold(query))
+    if not tokens:
+        return []
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            match = ' '.join(f'"{token}"*' for token in tokens)
+            weights = ', '.join(str(COLUMN_WEIGHTS[col]) for col in ('store_name', 'username', 'slogan', 'description'))
+            cursor.execute(
+                f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+                f'ORDER BY bm25({SEARCH_TABLE}, {weights}) LIMIT %s',
+                [match, limit],
+            )
+        else:
+            tsquery = ' & '.join(f'{token}:*' for token in tokens)
+            cursor.execute(
+                f"SELECT profile_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('simple', %s) "
+                f"ORDER BY ts_rank(document, to_tsquery('simple', %s)) DESC LIMIT %s",
+                [tsquery, tsquery, limit],
+            )
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from products.models import Product
+from .models import SellerProfile
+from .catalog import invalidate_catalog
+from . import search
+
+
+@receiver(post_save, sender=SellerProfile)
+def profile_saved(sender, instance, created, **kwargs):
+    search.index_profile(instance)
+
+
+@receiver(post_delete, sender=SellerProfile)
+def profile_deleted(sender, instance, **kwargs):
+    search.remove_profile(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def seller_user_saved(sender, instance, update_fields=None, **kwargs):
+    # El username forma parte del índice; ignorar guardados de last_login
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    profile = SellerProfile.objects.filter(user=instance).first()
+    if profile is not None:
+        search.index_profile(profile)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def seller_product_changed(sender, instance, **kwargs):
+    invalidate_catalog(instance.seller_id)
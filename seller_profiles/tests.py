@@ -1,3 +1,107 @@
 from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
 
-# Create your tests here.
+from products.models import Product
+from .models import SellerProfile
+from .cache import PROFILE_FLAG_SESSION_KEY, PROFILE_FLAG_TTL, has_seller_profile
+from .catalog import PAGE_SIZE, get_catalog_page
+
+
+class SellerProfileGateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='seller', password='p')
+        self.client.force_login(self.user)
+
+    def test_add_product_redirects_without_profile(self):
+        resp = self.client.get(reverse('add_product'))
+        self.assertRedirects(resp, reverse('create_profile'), fetch_redirect_response=False)
+
+    def test_other_views_skip_profile_check(self):
+        self.client.get(reverse('seller_list'))
+        self.assertNotIn(PROFILE_FLAG_SESSION_KEY, self.client.session)
+
+    def test_profile_flag_follows_create_and_delete(self):
+        self.assertFalse(has_seller_profile(User.objects.get(pk=self.user.pk)))
+        profile = SellerProfile.objects.create(user=self.user, store_name='Tienda', description='D')
+        self.assertTrue(has_seller_profile(User.objects.get(pk=self.user.pk)))
+        resp = self.client.get(reverse('add_product'))
+        self.assertEqual(resp.status_code, 200)
+        profile.delete()
+        self.assertFalse(has_seller_profile(User.objects.get(pk=self.user.pk)))
+
+    def test_flag_is_not_stale_when_profile_changes_without_signals(self):
+        gate = reverse('add_product')
+        self.assertEqual(self.client.get(gate).status_code, 302)
+        # Creado por otro proceso (admin, comando): aquí no llega ninguna señal
+        SellerProfile.objects.bulk_create([SellerProfile(user=self.user, store_name='Tienda', description='D')])
+        self.assertEqual(self.client.get(gate).status_code, 200)
+        self.assertIn(PROFILE_FLAG_SESSION_KEY, self.client.session)
+
+        SellerProfile.objects.filter(user=self.user)._raw_delete(SellerProfile.objects.db)
+        session = self.client.session
+        session[PROFILE_FLAG_SESSION_KEY] -= PROFILE_FLAG_TTL
+        session.save()
+        self.assertEqual(self.client.get(gate).status_code, 302)
+
+
+class SellerSearchTests(TestCase):
+    def setUp(self):
+        cafe = User.objects.create_user(username='ana', password='p')
+        books = User.objects.create_user(username='beto', password='p')
+        self.cafe = SellerProfile.objects.create(
+            user=cafe, store_name='Tienda Andina', slogan='El mejor café de la U',
+            description='Granos tostados', description_en='Roasted coffee beans',
+        )
+        self.books = SellerProfile.objects.create(
+            user=books, store_name='Café Libros', description='Libros usados',
+        )
+
+    def _search(self, query):
+        resp = self.client.get(reverse('seller_list'), {'search': query})
+        return [row['profile'].pk for row in resp.context['sellers']]
+
+    def test_search_folds_accents_and_covers_all_fields(self):
+        self.assertEqual(self._search('cafe'), [self.books.pk, self.cafe.pk])
+        self.assertEqual(self._search('roasted'), [self.cafe.pk])
+        self.assertEqual(self._search('lib'), [self.books.pk])
+
+    def test_index_follows_profile_changes(self):
+        self.books.store_name = 'Papelería Central'
+        self.books.save()
+        self.assertEqual(self._search('papeleria'), [self.books.pk])
+        self.books.delete()
+        self.assertEqual(self._search('papeleria'), [])
+
+
+class SellerCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(username='vendedor', password='p')
+        SellerProfile.objects.create(user=self.seller, store_name='Tienda', description='D')
+        for i in range(15):
+            Product.objects.create(
+                name=f'Prod {i}', description='D', price=10 + i, seller=self.seller,
+                image='products/test.jpg',
+            )
+
+    def test_cursor_pages_cover_catalog_without_repeats(self):
+        url = reverse('public_profile_products', args=[self.seller.id])
+        first = self.client.get(url).json()
+        self.assertEqual(len(first['results']), PAGE_SIZE)
+        second = self.client.get(url, {'cursor': first['next_cursor']}).json()
+        self.assertIsNone(second['next_cursor'])
+        names = [p['name'] for p in first['results'] + second['results']]
+        self.assertEqual(len(set(names)), 15)
+        self.assertEqual(names[0], 'Prod 14')
+
+    def test_first_page_cache_invalidated_on_product_change(self):
+        self.assertEqual(len(get_catalog_page(self.seller.id)['products']), PAGE_SIZE)
+        with self.assertNumQueries(0):
+            get_catalog_page(self.seller.id)
+        Product.objects.create(
+            name='Nuevo', description='D', price=5, seller=self.seller, image='products/test.jpg',
+        )
+        self.assertEqual(get_catalog_page(self.seller.id)['products'][0]['name'], 'Nuevo')
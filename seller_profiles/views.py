@@ -8,7 +8,12 @@ from django.contrib.auth.models import User
 from django.db.models import Q
 from products.models import Product
 from .models import SellerProfile, ProfileClick
-from django.db.models import Count
+from django.db.models import Count, Case, When, IntegerField
+from django.http import JsonResponse
+from django.urls import reverse
+from .cache import has_seller_profile, set_profile_flag
+from .catalog import get_catalog_page
+from . import search
 
 # Create your views here.
 
@@ -27,7 +32,7 @@ def view_profile(request):
 
 @login_required
 def create_profile(request):
-    if hasattr(request.user, 'seller_profile'):
+    if has_seller_profile(request.user, request.session):
         return redirect('edit_profile')
 
     if request.method == 'POST':
@@ -42,6 +47,7 @@ def create_profile(request):
                 
                 schedule_formset.instance = profile
                 schedule_formset.save()
+                set_profile_flag(request.session, True)
                 
                 messages.success(request, '¡Perfil creado exitosamente!')
                 return redirect('view_profile')
@@ -90,9 +96,6 @@ def edit_profile(request):
         'profile': profile
     })
 
-def has_seller_profile(user):
-    return hasattr(user, 'seller_profile')
-
 from seller_profiles.models import SellerProfile
 
 def public_profile(request, user_id):
@@ -115,10 +118,15 @@ def public_profile(request, user_id):
         # Puedes también guardar un nuevo clic si quieres rastrear vistas de perfil
         ProfileClick.objects.create(profile=profile, user=request.user if request.user.is_authenticated else None)
 
+        # Primera página del catálogo (cacheada por vendedor)
+        catalog = get_catalog_page(seller.id)
+
         return render(request, 'seller_profiles/public_profile.html', {
             'profile': profile,
             'total_clicks': total_clicks,
-            'ordered_schedules': ordered_schedules
+            'ordered_schedules': ordered_schedules,
+            'catalog_products': catalog['products'],
+            'next_cursor': catalog['next_cursor'],
         })
 
     except SellerProfile.DoesNotExist:
@@ -129,11 +137,29 @@ def public_profile(request, user_id):
         return redirect('home')
 
 
+def public_profile_products(request, user_id):
+    """JSON API: catálogo paginado por cursor de un vendedor (scroll infinito)"""
+    seller = get_object_or_404(User, id=user_id)
+    page = get_catalog_page(seller.id, cursor=request.GET.get('cursor') or None)
+    lang = getattr(request, 'LANGUAGE_CODE', 'es')
+    results = []
+    for item in page['products']:
+        results.append({
+            'id': item['id'],
+            'name': item['name_en'] if lang == 'en' and item['name_en'] else item['name'],
+            'category': item['category_display'],
+            'price': item['price'],
+            'image_url': request.build_absolute_uri(item['image_url']) if item['image_url'] else None,
+            'detail_url': request.build_absolute_uri(reverse('product_detail', args=[item['id']])),
+        })
+    return JsonResponse({'results': results, 'next_cursor': page['next_cursor']})
+
+
 # Actualizar la vista del producto para incluir el perfil del vendedor
 @login_required
 def add_product(request):
     # Verificar si el usuario tiene perfil de vendedor
-    if not hasattr(request.user, 'seller_profile'):
+    if not has_seller_profile(request.user, request.session):
         messages.warning(request, 'Necesitas crear un perfil de vendedor antes de publicar productos.')
         return redirect('create_profile')
     # ... resto del código existente ...
@@ -146,12 +172,25 @@ def seller_list(request):
     search_query = request.GET.get('search', '').strip()
     selected_categories = request.GET.getlist('categories')
     
-    # Aplicar filtro de búsqueda por nombre
+    # Aplicar búsqueda de texto completo (nombre, slogan, descripción y usuario)
     if search_query:
-        sellers = sellers.filter(
-            Q(store_name__icontains=search_query) |
-            Q(user__username__icontains=search_query)
-        )
+        ranked_ids = search.search_profile_ids(search_query)
+        if ranked_ids is None:
+            sellers = sellers.filter(
+                Q(store_name__icontains=search_query) |
+                Q(user__username__icontains=search_query) |
+                Q(slogan__icontains=search_query) |
+                Q(slogan_en__icontains=search_query) |
+                Q(description__icontains=search_query) |
+                Q(description_en__icontains=search_query)
+            )
+        else:
+            # Conservar el orden de relevancia del índice
+            relevance = Case(
+                *[When(pk=pk, then=position) for position, pk in enumerate(ranked_ids)],
+                output_field=IntegerField(),
+            )
+            sellers = sellers.filter(pk__in=ranked_ids).order_by(relevance)
     
     # Aplicar filtro por categorías
     if selected_categories:
@@ -1,3 +1,8 @@
+from functools import lru_cache
+
+from .matcher import KeywordMatcher
+
+# Taxonomía inicial; en ejecución se usa la de CategoryKeyword (ver taxonomy.py)
 DEFAULT_KEYWORD_MAP = {
     # comida
     "comida": "Comida",
@@ -57,14 +62,28 @@ DEFAULT_KEYWORD_MAP = {
     "cuadernos": "Libros",
 }
 
+@lru_cache(maxsize=8)
+def _compiled_matcher(items: frozenset) -> KeywordMatcher:
+    return KeywordMatcher(dict(items))
+
+
+def get_matcher(keyword_map: dict | None = None) -> KeywordMatcher:
+    """Retorna el clasificador compilado para el mapa dado (se construye una sola vez).
+
+    Sin mapa explícito se usa la taxonomía administrada en la base de datos.
+    """
+    if keyword_map is None:
+        from .taxonomy import get_taxonomy_matcher
+        return get_taxonomy_matcher()
+    return _compiled_matcher(frozenset(keyword_map.items()))
+
+
 def recommend_categories_from_text(text: str, keyword_map: dict | None = None) -> list[str]:
     if not text:
         return []
-    mapping = keyword_map or DEFAULT_KEYWORD_MAP
-    lowered = text.lower()
-    categories: set[str] = set()
-    for keyword, category in mapping.items():
-        if keyword in lowered:
-            categories.add(category)
-    return sorted(categories)
+    return get_matcher(keyword_map).categories(text)
+
 
+def classify_many(texts, keyword_map: dict | None = None) -> list[list[str]]:
+    """Clasifica un lote de textos reutilizando el mismo autómata"""
+    return get_matcher(keyword_map).classify_many(texts)
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from . import models
+from .search import search_interests, search_posts
 
 
 @admin.register(models.SocialSource)
@@ -11,10 +12,32 @@ class SocialSourceAdmin(admin.ModelAdmin):
 
 @admin.register(models.SocialPost)
 class SocialPostAdmin(admin.ModelAdmin):
-    list_display = ("platform", "post_id", "author", "published_at", "matched_categories")
+    list_display = ("platform", "post_id", "author", "published_at", "matched_categories", "duplicate_count")
     search_fields = ("post_id", "author", "text")
+    search_help_text = "Palabras o prefijos del texto (sin importar tildes); @usuario filtra por autor."
     list_filter = ("platform", "published_at")
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        # Un post_id exacto también se encuentra
+        by_id = queryset.filter(post_id=search_term.strip())
+        return search_posts(queryset, search_term) | by_id, False
+
+
+@admin.register(models.UserInterest)
+class UserInterestAdmin(admin.ModelAdmin):
+    list_display = ("user", "text", "matched_categories", "created_at")
+    search_fields = ("text",)
+    search_help_text = "Palabras o prefijos del texto (sin importar tildes)."
+    list_filter = ("created_at",)
+    raw_id_fields = ("user",)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_interests(queryset, search_term), False
+
 
 @admin.register(models.SocialAccount)
 class SocialAccountAdmin(admin.ModelAdmin):
@@ -22,4 +45,59 @@ class SocialAccountAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "username", "user_id")
     list_filter = ("platform",)
 
-# Register your models here.
+@admin.register(models.CategoryKeyword)
+class CategoryKeywordAdmin(admin.ModelAdmin):
+    list_display = ("keyword", "category", "active", "updated_at")
+    list_editable = ("category", "active")
+    search_fields = ("keyword",)
+    list_filter = ("category", "active")
+
+
+@admin.register(models.TaxonomyVersion)
+class TaxonomyVersionAdmin(admin.ModelAdmin):
+    list_display = ("version", "updated_at")
+    readonly_fields = ("version", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(models.ReclassificationJob)
+class ReclassificationJobAdmin(admin.ModelAdmin):
+    list_display = ("taxonomy_version", "status", "posts_updated", "interests_updated", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = ("taxonomy_version", "status", "last_post_id", "last_interest_id",
+                       "posts_updated", "interests_updated", "finished_at")
+
+
+@admin.register(models.TelegramUpdate)
+class TelegramUpdateAdmin(admin.ModelAdmin):
+    list_display = ("update_id", "received_at", "processed_at")
+    readonly_fields = ("update_id", "payload", "received_at", "processed_at")
+
+
+@admin.register(models.XUserCache)
+class XUserCacheAdmin(admin.ModelAdmin):
+    list_display = ("username", "user_id", "resolved_at")
+    search_fields = ("username", "user_id")
+
+
+class SourceFetchMetricInline(admin.TabularInline):
+    model = models.SourceFetchMetric
+    extra = 0
+    can_delete = False
+    fields = ("platform", "source_key", "requests", "throttled", "errors", "latency_sum",
+              "fetched", "matched", "inserted", "duplicates", "rate_remaining", "rate_reset_at")
+    readonly_fields = fields
+
+
+@admin.register(models.IngestionRun)
+class IngestionRunAdmin(admin.ModelAdmin):
+    list_display = ("command", "finished_at", "requests", "throttled", "errors", "fetched", "inserted", "duplicates")
+    list_filter = ("command", "finished_at")
+    readonly_fields = ("command", "started_at", "finished_at", "requests", "throttled", "errors",
+                       "fetched", "matched", "inserted", "skipped", "duplicates")
+    inlines = [SourceFetchMetricInline]
+
+    def has_add_permission(self, request):
+        return False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SocialIngestionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'social_ingestion'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,43 @@
+"""Categorías como máscara de bits.
+
+Cada categoría de ``Product.CATEGORY_CHOICES`` ocupa un bit según su
+posición; las nuevas deben agregarse al final para no cambiar los bits de
+las existentes. ``category_mask`` se guarda junto a ``matched_categories``
+y permite filtrar por categoría con una búsqueda indexada: como hay pocas
+categorías, "tiene el bit b" se traduce a ``category_mask IN (...)`` con
+todas las máscaras que incluyen ese bit.
+"""
+from functools import lru_cache
+from typing import Iterable
+
+from products.models import Product
+
+CATEGORY_NAMES: list[str] = [name for name, _ in Product.CATEGORY_CHOICES]
+CATEGORY_BITS: dict[str, int] = {name: 1 << i for i, name in enumerate(CATEGORY_NAMES)}
+ALL_MASKS = range(1, 1 << len(CATEGORY_NAMES))
+
+
+def split_categories(value: str | Iterable[str] | None) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [c.strip() for c in value if c and c.strip()]
+
+
+def categories_to_mask(value: str | Iterable[str] | None) -> int:
+    """'Comida,Ropa' o ['Comida', 'Ropa'] -> 0b11; las categorías desconocidas se ignoran"""
+    mask = 0
+    for name in split_categories(value):
+        mask |= CATEGORY_BITS.get(name, 0)
+    return mask
+
+
+def mask_to_categories(mask: int | None) -> list[str]:
+    return [name for name in CATEGORY_NAMES if mask and mask & CATEGORY_BITS[name]]
+
+
+@lru_cache(maxsize=None)
+def masks_with_any(bits: int) -> tuple[int, ...]:
+    """Todas las máscaras que comparten algún bit con ``bits`` (para ``category_mask__in``)"""
+    return tuple(mask for mask in ALL_MASKS if mask & bits)
@@ -0,0 +1,148 @@
+"""Cliente HTTP de la API v2 de X.
+
+Una sola ``requests.Session`` con pool de conexiones (tamaño
+``X_FETCH_CONCURRENCY``) y reintentos con backoff para errores 5xx y de
+conexión. Los 429 no se reintentan aquí: los maneja el token bucket del
+llamador. La URL base sale de ``X_API_BASE_URL`` para poder apuntar a un
+servidor de prueba local (``stub_social_api``), y con ``SOCIAL_API_CASSETTE``
+cada respuesta se graba para reproducirla después (ver ``replay``).
+"""
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Iterator
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .ratelimit import TokenBucket
+from .replay import attach_recorder
+
+DEFAULT_BASE_URL = "https://api.twitter.com/2"
+
+
+def parse_tweet_datetime(value: str | None) -> datetime:
+    if not value:
+        return datetime.now(dt_timezone.utc)
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class XTimeline:
+    """Timeline de una cuenta recorrido página a página con ``next_token``.
+
+    Al iterar genera los tweets a medida que llegan las páginas. Al terminar
+    ``status``, ``headers``, ``meta`` y ``error`` describen la última
+    respuesta (la que trae la cuota vigente) y ``pages`` cuántas se pidieron.
+    ``requests`` guarda (status, segundos) de cada petición, con status None
+    si falló la conexión.
+
+    Con ``bucket`` cada página después de la primera toma su propia ficha
+    (la primera la toma el llamador) y la devuelve con los headers de su
+    respuesta; si no quedan fichas el recorrido se detiene y el timeline
+    queda incompleto (``complete`` False, con ``next_token`` pendiente).
+    """
+
+    def __init__(self, client: "XClient", user_id: str, params: dict[str, Any], max_pages: int,
+                 bucket: TokenBucket | None = None):
+        self.client = client
+        self.user_id = user_id
+        self.params = dict(params)
+        self.max_pages = max_pages
+        self.bucket = bucket
+        self.status: int | None = None
+        self.headers: dict[str, str] = {}
+        self.meta: dict[str, Any] = {}
+        self.error = ""
+        self.pages = 0
+        self.requests: list[tuple[int | None, float]] = []
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        params = dict(self.params)
+        while self.pages < self.max_pages:
+            bucket = self.bucket if self.pages else None
+            if bucket is not None and bucket.acquire():
+                return
+            started = time.perf_counter()
+            try:
+                response = self.client.get(f"users/{self.user_id}/tweets", params=params)
+            except requests.exceptions.RequestException as e:
+                self.requests.append((None, time.perf_counter() - started))
+                self.status, self.error = None, str(e)
+                if bucket is not None:
+                    bucket.release()
+                return
+            self.requests.append((response.status_code, time.perf_counter() - started))
+            if bucket is not None:
+                bucket.release(response.headers, throttled=response.status_code == 429)
+            self.pages += 1
+            self.status = response.status_code
+            self.headers = dict(response.headers)
+            if response.status_code != 200:
+                self.error = "" if response.status_code == 429 else response.text
+                return
+            data = response.json()
+            self.meta = data.get("meta", {})
+            yield from data.get("data", [])
+            # Con since_id, X pagina solo sobre los tweets posteriores a ese id
+            next_token = self.meta.get("next_token")
+            if not next_token:
+                return
+            params["pagination_token"] = next_token
+
+    @property
+    def complete(self) -> bool:
+        """True si se llegó al final sin errores (no queda next_token pendiente)"""
+        return self.status == 200 and not self.meta.get("next_token")
+
+
+class XClient:
+    def __init__(self, bearer_token: str, base_url: str | None = None, pool_size: int | None = None,
+                 retries: int = 3, timeout: float = 15):
+        self.base_url = (base_url or getattr(settings, "X_API_BASE_URL", "") or DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        pool_size = pool_size or max(1, int(getattr(settings, "X_FETCH_CONCURRENCY", 8)))
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Authorization": f"Bearer {bearer_token}", "User-Agent": "ComercIA/1.0"})
+        attach_recorder(self.session)
+
+    def get(self, path: str, params: dict[str, Any] | None = None) -> requests.Response:
+        return self.session.get(f"{self.base_url}/{path.lstrip('/')}", params=params, timeout=self.timeout)
+
+    def user_timeline(self, user_id: str, params: dict[str, Any], max_pages: int = 1,
+                      bucket: TokenBucket | None = None) -> XTimeline:
+        return XTimeline(self, user_id, params, max_pages, bucket=bucket)
+
+    def iter_user_tweets(self, user_id: str, params: dict[str, Any], max_pages: int = 1) -> Iterator[dict[str, Any]]:
+        """Atajo para recorrer los tweets sin necesitar el estado de la respuesta"""
+        return iter(self.user_timeline(user_id, params, max_pages))
+
+    def users_by_usernames(self, usernames: list[str]) -> tuple[dict[str, str], set[str], requests.Response]:
+        """Resuelve hasta 100 usernames en una petición.
+
+        Retorna ({username_minúsculas: id}, usernames inexistentes, respuesta).
+        """
+        response = self.get("users/by", params={"usernames": ",".join(usernames)})
+        found: dict[str, str] = {}
+        missing: set[str] = set()
+        if response.status_code == 200:
+            data = response.json()
+            for user in data.get("data", []):
+                found[user["username"].lower()] = user["id"]
+            for error in data.get("errors", []):
+                if error.get("parameter") == "usernames" and error.get("value"):
+                    missing.add(str(error["value"]).lower())
+        return found, missing, response
+
+    def close(self) -> None:
+        self.session.close()
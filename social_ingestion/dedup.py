@@ -0,0 +1,104 @@
+"""Detección de publicaciones casi duplicadas con SimHash y LSH por bandas.
+
+Cada post recibe una huella SimHash de 64 bits calculada sobre sus palabras
+normalizadas y los pares de palabras consecutivas. La huella se parte en
+``BANDS`` bandas de 16 bits, cada una en una columna indexada junto con
+``published_at``. Si dos huellas difieren en ``SOCIAL_DEDUP_MAX_DISTANCE``
+bits o menos (con 4 bandas, hasta 3), al menos una banda es idéntica. Por eso
+buscar candidatos es una igualdad indexada por banda dentro de la ventana
+reciente, y la distancia de Hamming exacta se comprueba solo sobre esos
+pocos candidatos.
+"""
+import hashlib
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.db.models import Q
+
+from .matcher import tokenize
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+BAND_FIELDS = tuple(f"simhash_band{i}" for i in range(BANDS))
+# Por encima de 2**63 la huella se guarda con signo (BigIntegerField)
+_SIGN = 1 << (BITS - 1)
+
+
+def _features(text: str | None) -> list[str]:
+    words = tokenize(text)
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str | None) -> int | None:
+    """Huella sin signo de 64 bits; None si el texto no tiene palabras"""
+    features = _features(text)
+    if not features:
+        return None
+    weights = [0] * BITS
+    for feature in features:
+        value = _hash(feature)
+        for bit in range(BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def to_signed(value: int) -> int:
+    return value - (1 << BITS) if value >= _SIGN else value
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << BITS) if value < 0 else value
+
+
+def bands(value: int) -> tuple[int, ...]:
+    mask = (1 << BAND_BITS) - 1
+    return tuple(value >> (i * BAND_BITS) & mask for i in range(BANDS))
+
+
+def hamming(a: int, b: int) -> int:
+    return (to_unsigned(a) ^ to_unsigned(b)).bit_count()
+
+
+def fingerprint_fields(text: str | None) -> dict[str, int | None]:
+    """Valores de ``simhash`` y las columnas de banda para un texto"""
+    value = simhash(text)
+    if value is None:
+        return {"simhash": None, **{name: None for name in BAND_FIELDS}}
+    return {"simhash": to_signed(value), **dict(zip(BAND_FIELDS, bands(value)))}
+
+
+def max_distance() -> int:
+    return int(getattr(settings, "SOCIAL_DEDUP_MAX_DISTANCE", 3))
+
+
+def window_days() -> int:
+    return int(getattr(settings, "SOCIAL_DEDUP_WINDOW_DAYS", 7))
+
+
+def band_query(fingerprints: Iterable[int]) -> Q:
+    """Q que selecciona los posts con alguna banda igual a la de alguna huella"""
+    values: list[set[int]] = [set() for _ in range(BANDS)]
+    for fingerprint in fingerprints:
+        for i, band in enumerate(bands(to_unsigned(fingerprint))):
+            values[i].add(band)
+    query = Q()
+    for name, band_values in zip(BAND_FIELDS, values):
+        if band_values:
+            query |= Q(**{f"{name}__in": sorted(band_values)})
+    return query
+
+
+def nearest(fingerprint: int, candidates: Iterable[tuple[Any, int]]) -> Any | None:
+    """Clave del candidato (clave, huella) más cercano dentro de ``max_distance``"""
+    limit = max_distance()
+    best_id, best_distance = None, limit + 1
+    for candidate_id, other in candidates:
+        distance = hamming(fingerprint, other)
+        if distance < best_distance:
+            best_id, best_distance = candidate_id, distance
+    return best_id
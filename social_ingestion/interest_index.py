@@ -0,0 +1,129 @@
+"""Índice invertido de intereses: término -> usuarios.
+
+Cada ``UserInterest`` y cada ``SocialPost`` de una cuenta vinculada aporta
+los términos ``cat:<Categoría>`` de su máscara y ``kw:<palabra clave>`` de la
+taxonomía vigente a ``InterestTerm``. Al publicar un producto se calculan sus
+términos y los usuarios interesados salen de un ``IN`` sobre el índice único
+(term, user): el costo depende de cuántos usuarios coinciden y no de cuántos
+intereses existen. Sus listas de recomendación se marcan en un solo UPDATE.
+"""
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from products.models import Product
+
+from .categories import mask_to_categories
+from .matcher import KeywordMatcher
+from .models import InterestTerm, SocialAccount, SocialPost, UserInterest
+from .recommender import mark_dirty
+from .taxonomy import get_taxonomy_matcher
+
+BATCH_SIZE = 500
+
+
+def text_terms(text: str, mask: int = 0, matcher: KeywordMatcher | None = None) -> set[str]:
+    matcher = matcher or get_taxonomy_matcher()
+    terms = {f"cat:{name}" for name in mask_to_categories(mask)}
+    terms.update(f"kw:{keyword}" for keyword, _ in matcher.find(text or ""))
+    return terms
+
+
+def product_terms(product: Product, matcher: KeywordMatcher | None = None) -> set[str]:
+    matcher = matcher or get_taxonomy_matcher()
+    terms = text_terms(f"{product.name} {product.description}", matcher=matcher)
+    if product.category:
+        terms.add(f"cat:{product.category}")
+    return terms
+
+
+def add_terms(pairs: Iterable[tuple[int, str]]) -> None:
+    """Inserta pares (user_id, término); los repetidos se ignoran"""
+    objs = [InterestTerm(user_id=user_id, term=term[:150]) for user_id, term in set(pairs)]
+    InterestTerm.objects.bulk_create(objs, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def users_by_author(authors: Iterable[str]) -> dict[str, int]:
+    """{autor_minúsculas: user_id} de las cuentas vinculadas, en una consulta"""
+    names = {a.lower() for a in authors if a}
+    if not names:
+        return {}
+    return dict(
+        SocialAccount.objects.annotate(username_lower=Lower('username'))
+        .filter(username_lower__in=names).values_list('username_lower', 'user_id')
+    )
+
+
+def index_interest(interest: UserInterest) -> None:
+    add_terms((interest.user_id, term) for term in text_terms(interest.text, interest.category_mask))
+
+
+def index_posts(posts: Iterable[SocialPost]) -> list[int]:
+    """Indexa posts nuevos de cuentas vinculadas; retorna los user_id afectados"""
+    posts = list(posts)
+    users = users_by_author(p.author for p in posts)
+    if not users:
+        return []
+    matcher = get_taxonomy_matcher()
+    pairs = []
+    for post in posts:
+        user_id = users.get((post.author or "").lower())
+        if user_id is not None:
+            pairs.extend((user_id, term) for term in text_terms(post.text, post.category_mask, matcher))
+    add_terms(pairs)
+    return sorted(set(users.values()))
+
+
+def index_user(user_id: int) -> None:
+    """Recalcula los términos de un usuario (al borrar un interés o cambiar la cuenta vinculada)"""
+    matcher = get_taxonomy_matcher()
+    pairs = []
+    for text, mask in UserInterest.objects.filter(user_id=user_id).values_list('text', 'category_mask'):
+        pairs.extend((user_id, term) for term in text_terms(text, mask, matcher))
+    account = SocialAccount.objects.filter(user_id=user_id).only('username').first()
+    if account:
+        for text, mask in (
+            SocialPost.objects.filter(author__iexact=account.username)
+            .values_list('text', 'category_mask').iterator(chunk_size=2000)
+        ):
+            pairs.extend((user_id, term) for term in text_terms(text, mask, matcher))
+    with transaction.atomic():
+        InterestTerm.objects.filter(user_id=user_id).delete()
+        add_terms(pairs)
+
+
+def rebuild_interest_index() -> int:
+    """Reconstruye todo el índice (tras una reclasificación o para poblarlo por primera vez)"""
+    matcher = get_taxonomy_matcher()
+    pairs: set[tuple[int, str]] = set()
+    for user_id, text, mask in UserInterest.objects.values_list('user_id', 'text', 'category_mask').iterator(chunk_size=2000):
+        pairs.update((user_id, term) for term in text_terms(text, mask, matcher))
+    users = dict(
+        SocialAccount.objects.annotate(username_lower=Lower('username')).values_list('username_lower', 'user_id')
+    )
+    names = list(users)
+    for start in range(0, len(names), BATCH_SIZE):
+        for author, text, mask in (
+            SocialPost.objects.annotate(author_lower=Lower('author'))
+            .filter(author_lower__in=names[start:start + BATCH_SIZE])
+            .values_list('author_lower', 'text', 'category_mask').iterator(chunk_size=2000)
+        ):
+            pairs.update((users[author], term) for term in text_terms(text, mask, matcher))
+    with transaction.atomic():
+        InterestTerm.objects.all().delete()
+        add_terms(pairs)
+    return len(pairs)
+
+
+def interested_users(product: Product):
+    """Queryset de user_id con algún término del producto (búsqueda por el índice de term)"""
+    return (
+        InterestTerm.objects.filter(term__in=product_terms(product))
+        .exclude(user_id=product.seller_id).values_list('user_id', flat=True).distinct()
+    )
+
+
+def match_new_product(product: Product) -> int:
+    """Marca en bloque las listas de los usuarios interesados en un producto recién publicado"""
+    return mark_dirty(interested_users(product))
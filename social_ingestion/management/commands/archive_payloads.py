@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from social_ingestion.models import SocialPostPayload
+from social_ingestion.payloads import archive_payload_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve los payloads originales de posts viejos a archivos JSONL gzip particionados por día "
+        "(SOCIAL_ARCHIVE_DIR/AAAA/MM/DD.jsonl.gz) y los borra de la base de datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days", type=int, default=None,
+            help="Antigüedad mínima del post (default: SOCIAL_PAYLOAD_ARCHIVE_DAYS)",
+        )
+        parser.add_argument("--dir", default=None, help="Directorio de archivo (default: SOCIAL_ARCHIVE_DIR)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Payloads por lote")
+        parser.add_argument("--dry-run", action="store_true", help="Solo contar lo que se archivaría")
+
+    def handle(self, *args, **options):
+        days = options["older_than_days"]
+        if days is None:
+            days = int(getattr(settings, "SOCIAL_PAYLOAD_ARCHIVE_DAYS", 90))
+        cutoff = timezone.now() - timedelta(days=days)
+        old = SocialPostPayload.objects.filter(post__published_at__lt=cutoff)
+        if options["dry_run"]:
+            self.stdout.write(f"DRY: {old.count()} payload(s) anteriores a {cutoff:%Y-%m-%d} se archivarían.")
+            return
+
+        archived, partitions = archive_payload_rows(old, options["dir"], options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{archived} payload(s) archivados en {len(partitions)} partición(es) diarias."
+        ))
@@ -0,0 +1,66 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from social_ingestion import DEFAULT_KEYWORD_MAP, classify_many, get_matcher
+
+
+_FILLER = (
+    "hoy en la universidad estaba pensando que necesito algo nuevo para la semana "
+    "alguien sabe donde venden cosas buenas cerca del bloque 38 gracias por la ayuda"
+).split()
+
+
+def _legacy_categories(text: str, mapping: dict) -> list[str]:
+    """Implementación anterior (substring por cada palabra clave), solo para comparar"""
+    lowered = text.lower()
+    return sorted({category for keyword, category in mapping.items() if keyword in lowered})
+
+
+class Command(BaseCommand):
+    help = "Mide el rendimiento del clasificador de categorías sobre publicaciones sintéticas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=100_000, help="Cantidad de publicaciones sintéticas")
+        parser.add_argument("--words", type=int, default=25, help="Palabras por publicación")
+        parser.add_argument("--extra-keywords", type=int, default=0, help="Palabras clave sintéticas extra (simula una taxonomía grande)")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--skip-legacy", action="store_true", help="No medir la implementación anterior")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        mapping = dict(DEFAULT_KEYWORD_MAP)
+        for i in range(options["extra_keywords"]):
+            mapping[f"producto{i}"] = "Otros"
+        keywords = list(mapping)
+        texts = []
+        for _ in range(options["posts"]):
+            words = rng.choices(_FILLER, k=options["words"])
+            for _ in range(rng.randint(0, 2)):
+                words[rng.randrange(len(words))] = rng.choice(keywords)
+            texts.append(" ".join(words))
+
+        self.stdout.write(f"{len(texts)} publicaciones sintéticas, {len(mapping)} palabras clave")
+        start = time.perf_counter()
+        get_matcher(mapping)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        results = classify_many(texts, mapping)
+        elapsed = time.perf_counter() - start
+        matched = sum(1 for cats in results if cats)
+        self.stdout.write(
+            f"Aho-Corasick: {len(texts)} posts en {elapsed:.2f}s "
+            f"({len(texts) / elapsed:,.0f} posts/s, compilación {build_ms:.1f} ms, {matched} con categorías)"
+        )
+
+        if not options["skip_legacy"]:
+            start = time.perf_counter()
+            for text in texts:
+                _legacy_categories(text, mapping)
+            legacy = time.perf_counter() - start
+            self.stdout.write(
+                f"Substring (anterior): {len(texts)} posts en {legacy:.2f}s "
+                f"({len(texts) / legacy:,.0f} posts/s)"
+            )
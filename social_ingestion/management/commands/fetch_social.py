@@ -1,6 +1,8 @@
-import os
-import json
 import time
+import heapq
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
 from datetime import datetime, timezone as dt_timezone, timedelta
 from typing import Any
 import requests
@@ -8,14 +10,37 @@ import requests
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from social_ingestion import recommend_categories_from_text
-from social_ingestion.models import SocialPost, SocialSource, SocialAccount
+from social_ingestion import classify_many, telegram
+from social_ingestion.categories import categories_to_mask
+from social_ingestion.clients import XClient, parse_tweet_datetime
+from social_ingestion.interest_index import index_posts
+from social_ingestion.metrics import RunMetrics
+from social_ingestion.models import SocialPost, SocialSource, SocialAccount, SourceCursor
+from social_ingestion.persistence import PersistResult, classify_posts, persist_posts
+from social_ingestion.ratelimit import RateLimiter
+from social_ingestion.recommender import mark_dirty_for_authors
+from social_ingestion.resolver import backfill_external_ids, normalize_username, resolve_usernames
 
 
-_LAST_FETCH_AT: datetime | None = None
+# Intervalo mínimo entre consultas a una misma fuente (salvo --force)
 _FETCH_CACHE_TTL = timedelta(minutes=3)
 
 
+@dataclass
+class XFetchOutcome:
+    """Resultado de una petición al timeline de X"""
+    status: int | None
+    posts: list[dict[str, Any]] = field(default_factory=list)
+    headers: dict[str, str] = field(default_factory=dict)
+    meta: dict[str, Any] = field(default_factory=dict)
+    error: str = ""
+    pages: int = 1
+    # False si el recorrido quedó cortado (X_MAX_PAGES o sin fichas) con next_token pendiente
+    complete: bool = True
+    # (status, segundos) de cada petición, para las métricas
+    requests: list[tuple[int | None, float]] = field(default_factory=list)
+
+
 class Command(BaseCommand):
     help = "Fetch posts from configured social sources (X and Telegram) and store matches"
 
@@ -33,12 +58,7 @@ class Command(BaseCommand):
         parser.add_argument("--reclassify", action="store_true", help="Recompute categories for existing tweets of the account")
 
     def handle(self, *args, **options):
-        global _LAST_FETCH_AT
-        now = datetime.now(dt_timezone.utc)
-        force = options.get("force", False)
-        if not force and _LAST_FETCH_AT and now - _LAST_FETCH_AT < _FETCH_CACHE_TTL:
-            self.stdout.write(self.style.WARNING("Fetch saltado (cache activa) para ahorrar consumo."))
-            return
+        self.setup(force=options.get("force", False), dry_run=options.get("dry_run", False))
 
         platform_filter = options.get("platform")
         dry_run = options.get("dry_run", False)
@@ -51,168 +71,161 @@ class Command(BaseCommand):
         save_all = options.get("save_all", False)
         reclassify = options.get("reclassify", False)
 
-        saved_count = 0
-        matched_count = 0
-        fetched_count = 0
+        result = PersistResult()
 
         if platform_filter == "x" or not platform_filter:
             # Si se especifica una cuenta concreta, usarla y no iterar sobre todas
             if single_username or single_user_id:
-                posts = self._fetch_x_by_identifiers(single_user_id, single_username, no_since, debug, include_retweets, include_replies)
-                fetched_count += len(posts)
+                source_key, posts = self._fetch_x_by_identifiers(single_user_id, single_username, no_since, debug, include_retweets, include_replies)
                 if reclassify:
-                    # Recalcular categorías para los últimos posts del autor
-                    existing_qs = SocialPost.objects.filter(platform="x", author__iexact=single_username).order_by("-published_at")[:50]
-                    for p in existing_qs:
-                        cats = recommend_categories_from_text(p.text or "")
-                        p.matched_categories = ",".join(cats)
-                        p.save(update_fields=["matched_categories"])
-                for post in posts:
-                    categories = recommend_categories_from_text(post.get("text", ""))
-                    if not categories and not save_all:
-                        continue
-                    matched_count += 1
-                    if dry_run:
-                        self.stdout.write(f"DRY: x {post.get('id')} @{post.get('author','')} -> {categories}")
-                        continue
-                    payload = dict(post)
-                    if isinstance(payload.get("published_at"), datetime):
-                        payload["published_at"] = payload["published_at"].isoformat()
-                    if SocialPost.objects.filter(platform="x", post_id=post["id"]).exists():
-                        continue
-                    SocialPost.objects.create(
-                        platform="x",
-                        post_id=post["id"],
-                        author=post.get("author", single_username or "unknown"),
-                        text=post.get("text", ""),
-                        published_at=post.get("published_at", datetime.now(dt_timezone.utc)),
-                        raw_payload=payload,
-                        matched_categories=",".join(categories),
-                    )
-                    saved_count += 1
-                _LAST_FETCH_AT = now
-                # Si se pidió cuenta específica, no continuar con otras plataformas/cuentas
-                if platform_filter == "x" or not platform_filter:
-                    # Continuar a telegram solo si explicitamente se pidió telegram
-                    if platform_filter == "x":
-                        # Resumen y salida
-                        if dry_run:
-                            if matched_count > 0:
-                                self.stdout.write(self.style.SUCCESS(f"Se detectaron {matched_count} publicaciones con categorías (simulación)."))
-                            else:
-                                self.stdout.write(self.style.WARNING("No se detectaron publicaciones con palabras clave (simulación)."))
-                        else:
-                            if saved_count > 0:
-                                self.stdout.write(self.style.SUCCESS(f"Listo: guardadas {saved_count} publicaciones (de {matched_count} con categorías, {fetched_count} obtenidas)."))
-                            elif fetched_count > 0 and matched_count == 0:
-                                self.stdout.write(self.style.WARNING("Se obtuvieron publicaciones, pero ninguna coincidió con palabras clave."))
-                            else:
-                                self.stdout.write(self.style.WARNING("No se obtuvieron publicaciones nuevas. Puede haber límite de tasa o no hay tweets recientes."))
-                        return
+                    self._reclassify_author(single_username)
+                result += self._store("x", posts, save_all=save_all, dry_run=dry_run,
+                                      default_author=single_username or "unknown", source_key=source_key)
+                # Continuar a telegram solo si explicitamente se pidió telegram
+                if platform_filter == "x":
+                    self._finish(result, dry_run)
+                    return
             # Iterar sobre TODAS las cuentas vinculadas (multiusuario)
             accounts = SocialAccount.objects.all()
             if not accounts.exists():
                 self.stdout.write(self.style.WARNING("No hay cuentas de X vinculadas (SocialAccount). Intentando usar settings X_USER_ID/X_USERNAME..."))
                 # Fallback a settings si no hay cuentas
-                fallback_posts = self._fetch_x_from_settings()
-                fetched_count += len(fallback_posts)
-                for post in fallback_posts:
-                    categories = recommend_categories_from_text(post.get("text", ""))
-                    if not categories and not save_all:
-                        continue
-                    matched_count += 1
-                    if dry_run:
-                        self.stdout.write(f"DRY: x {post.get('id')} @{post.get('author','')} -> {categories}")
-                    else:
-                        payload = dict(post)
-                        if isinstance(payload.get("published_at"), datetime):
-                            payload["published_at"] = payload["published_at"].isoformat()
-                        if not SocialPost.objects.filter(platform="x", post_id=post["id"]).exists():
-                            SocialPost.objects.create(
-                                platform="x",
-                                post_id=post["id"],
-                                author=post.get("author", "unknown"),
-                                text=post.get("text", ""),
-                                published_at=post.get("published_at", datetime.now(dt_timezone.utc)),
-                                raw_payload=payload,
-                                matched_categories=",".join(categories),
-                            )
-                            saved_count += 1
-            for account in accounts:
-                posts = self._fetch_x_for_account(account, no_since, debug, include_retweets, include_replies)
-                fetched_count += len(posts)
-                if reclassify:
-                    existing_qs = SocialPost.objects.filter(platform="x", author__iexact=account.username).order_by("-published_at")[:50]
-                    for p in existing_qs:
-                        cats = recommend_categories_from_text(p.text or "")
-                        p.matched_categories = ",".join(cats)
-                        p.save(update_fields=["matched_categories"])
-                for post in posts:
-                    categories = recommend_categories_from_text(post.get("text", ""))
-                    if not categories and not save_all:
-                        continue
-                    matched_count += 1
-                    if dry_run:
-                        self.stdout.write(f"DRY: x {post.get('id')} @{account.username} -> {categories}")
-                        continue
-                    payload = dict(post)
-                    if isinstance(payload.get("published_at"), datetime):
-                        payload["published_at"] = payload["published_at"].isoformat()
-                    if SocialPost.objects.filter(platform="x", post_id=post["id"]).exists():
-                        continue
-                    SocialPost.objects.create(
-                        platform="x",
-                        post_id=post["id"],
-                        author=account.username,
-                        text=post.get("text", ""),
-                        published_at=post.get("published_at", datetime.now(dt_timezone.utc)),
-                        raw_payload=payload,
-                        matched_categories=",".join(categories),
-                    )
-                    saved_count += 1
-
-        if platform_filter == "telegram" or (not platform_filter and SocialSource.objects.filter(platform="telegram", active=True).exists()):
-            sources = SocialSource.objects.filter(active=True, platform="telegram")
-            for source in sources:
-                posts = self._fetch_telegram(source)
-                fetched_count += len(posts)
-                for post in posts:
-                    categories = recommend_categories_from_text(post.get("text", ""))
-                    if not categories:
-                        continue
-                    matched_count += 1
-                    if dry_run:
-                        self.stdout.write(f"DRY: telegram {post.get('id')} -> {categories}")
-                        continue
-                    payload = dict(post)
-                    if isinstance(payload.get("published_at"), datetime):
-                        payload["published_at"] = payload["published_at"].isoformat()
-                    if SocialPost.objects.filter(platform="telegram", post_id=post["id"]).exists():
-                        continue
-                    SocialPost.objects.create(
-                        platform="telegram",
-                        post_id=post["id"],
-                        author=post.get("author", "unknown"),
-                        text=post.get("text", ""),
-                        published_at=post.get("published_at", datetime.now(dt_timezone.utc)),
-                        raw_payload=payload,
-                        matched_categories=",".join(categories),
-                    )
-                    saved_count += 1
-
-        _LAST_FETCH_AT = now
-
-        # Resumen amigable para el usuario
+                source_key, fallback_posts = self._fetch_x_from_settings()
+                result += self._store("x", fallback_posts, save_all=save_all, dry_run=dry_run, source_key=source_key)
+            else:
+                for account, posts in self._fetch_x_accounts(accounts, no_since, debug, include_retweets, include_replies):
+                    if reclassify:
+                        self._reclassify_author(account.username)
+                    result += self._store("x", posts, save_all=save_all, dry_run=dry_run, author=account.username,
+                                          source_key=account.external_user_id)
+
+        if platform_filter == "telegram" or not platform_filter:
+            sources = list(SocialSource.objects.filter(active=True, platform="telegram"))
+            if sources:
+                posts_by_chat = self._fetch_telegram(sources)
+                for source in sources:
+                    posts = posts_by_chat.get(str(source.handle), [])
+                    result += self._store("telegram", posts, save_all=False, dry_run=dry_run, source_key="bot")
+
+        self._finish(result, dry_run)
+
+    def setup(self, force: bool = False, dry_run: bool = False, command: str = "fetch_social") -> None:
+        """Carga cursores y token bucket; también lo usa el daemon run_ingestion"""
+        self.now = datetime.now(dt_timezone.utc)
+        self.force = force
+        self.dry_run = dry_run
+        self.skipped_sources = 0
+        self.x_client = None
+        self.metrics = RunMetrics(command)
+        # Todos los cursores en una sola consulta; luego cada fuente se busca en O(1)
+        self.cursors = {(c.platform, c.source_key): c for c in SourceCursor.objects.all()}
+        self.rate_limiter = RateLimiter(capacity=max(1, int(getattr(settings, "X_FETCH_CONCURRENCY", 8))))
+        self._seed_rate_limiter()
+
+    def _cursor(self, platform: str, source_key: str) -> SourceCursor:
+        key = (platform, str(source_key))
+        if key not in self.cursors:
+            self.cursors[key] = SourceCursor(platform=platform, source_key=str(source_key))
+        return self.cursors[key]
+
+    def _is_due(self, cursor: SourceCursor, label: str) -> bool:
+        if self.force or cursor.is_due(self.now, _FETCH_CACHE_TTL):
+            return True
+        self.skipped_sources += 1
+        self.stdout.write(f"Fuente {label} consultada recientemente o sin cuota; se omite.")
+        return False
+
+    def _save_cursor(self, cursor: SourceCursor) -> None:
+        if not self.dry_run:
+            cursor.save()
+
+    def save_metrics(self) -> None:
+        """Guarda las métricas acumuladas (salvo en simulación) y empieza una ejecución nueva"""
+        if not self.dry_run:
+            self.metrics.save()
+        self.metrics = RunMetrics(self.metrics.command)
+
+    def _record_x_outcome(self, cursor: SourceCursor, outcome: "XFetchOutcome") -> None:
+        stats = self.metrics.source("x", cursor.source_key)
+        requests_made = outcome.requests or [(outcome.status, None)]
+        for i, (status, seconds) in enumerate(requests_made):
+            # Los headers de cuota son los de la última respuesta
+            stats.observe(status, seconds, outcome.headers if i == len(requests_made) - 1 else None)
+        cursor.record_rate_limit(outcome.headers)
+        if outcome.status == 200:
+            cursor.advance_timeline((post["id"] for post in outcome.posts), complete=outcome.complete)
+            cursor.last_fetch_at = self.now
+        self._save_cursor(cursor)
+
+    def _seed_rate_limiter(self) -> None:
+        """Arrancar el token bucket con la última cuota conocida de X"""
+        known = [
+            c for c in self.cursors.values()
+            if c.platform == "x" and c.rate_reset_at and c.rate_reset_at > self.now and c.rate_remaining is not None
+        ]
+        if known:
+            latest = max(known, key=lambda c: c.last_fetch_at or self.now)
+            self.rate_limiter.bucket("users/tweets").sync(
+                latest.rate_limit, latest.rate_remaining, latest.rate_reset_at.timestamp()
+            )
+
+    def _store(self, platform: str, posts: list[dict[str, Any]], save_all: bool, dry_run: bool,
+               author: str | None = None, default_author: str = "unknown",
+               source_key: str | None = None) -> PersistResult:
+        """Clasifica y guarda un lote de posts de una fuente (``source_key`` como en SourceCursor)"""
+        classified = classify_posts(posts, save_all=save_all)
+        if dry_run:
+            for post, categories in classified:
+                who = author or post.get("author", "")
+                if platform == "x":
+                    self.stdout.write(f"DRY: x {post.get('id')} @{who} -> {categories}")
+                else:
+                    self.stdout.write(f"DRY: {platform} {post.get('id')} -> {categories}")
+            result = PersistResult()
+        else:
+            result = persist_posts(platform, classified, author=author, default_author=default_author)
+        result.fetched = len(posts)
+        result.matched = len(classified)
+        self.metrics.add_result(result, platform, source_key)
+        return result
+
+    def _reclassify_author(self, username: str) -> None:
+        """Recalcular categorías para los últimos posts del autor"""
+        existing = list(SocialPost.objects.filter(platform="x", author__iexact=username).order_by("-published_at")[:50])
+        for p, cats in zip(existing, classify_many(p.text or "" for p in existing)):
+            p.matched_categories = ",".join(cats)
+            p.category_mask = categories_to_mask(cats)
+        SocialPost.objects.bulk_update(existing, ["matched_categories", "category_mask"])
+        index_posts(existing)
+        mark_dirty_for_authors([username])
+
+    def _finish(self, result: PersistResult, dry_run: bool) -> None:
+        self.save_metrics()
+        self._report(result, dry_run)
+
+    def _report(self, result: PersistResult, dry_run: bool) -> None:
+        """Resumen amigable para el usuario"""
+        if result.fetched == 0 and self.skipped_sources and not self.force:
+            self.stdout.write(self.style.WARNING("Fetch saltado (cache activa) para ahorrar consumo."))
+            return
         if dry_run:
-            if matched_count > 0:
-                self.stdout.write(self.style.SUCCESS(f"Se detectaron {matched_count} publicaciones con categorías (simulación)."))
+            if result.matched > 0:
+                self.stdout.write(self.style.SUCCESS(f"Se detectaron {result.matched} publicaciones con categorías (simulación)."))
             else:
                 self.stdout.write(self.style.WARNING("No se detectaron publicaciones con palabras clave (simulación)."))
         else:
-            if saved_count > 0:
-                self.stdout.write(self.style.SUCCESS(f"Listo: guardadas {saved_count} publicaciones (de {matched_count} con categorías, {fetched_count} obtenidas)."))
-            elif fetched_count > 0 and matched_count == 0:
+            if result.inserted > 0:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Listo: guardadas {result.inserted} publicaciones, {result.skipped} ya existían, "
+                    f"{result.duplicates} casi duplicadas (de {result.matched} con categorías, {result.fetched} obtenidas)."
+                ))
+            elif result.fetched > 0 and result.matched == 0:
                 self.stdout.write(self.style.WARNING("Se obtuvieron publicaciones, pero ninguna coincidió con palabras clave."))
+            elif result.skipped > 0 or result.duplicates > 0:
+                self.stdout.write(self.style.WARNING(
+                    f"No hay publicaciones nuevas: {result.skipped} ya estaban guardadas, "
+                    f"{result.duplicates} casi duplicadas de otras."
+                ))
             else:
                 self.stdout.write(self.style.WARNING("No se obtuvieron publicaciones nuevas. Puede haber límite de tasa o no hay tweets recientes."))
 
@@ -223,47 +236,42 @@ class Command(BaseCommand):
             return explicit_id, None
         if not username:
             return None, None
-        url = f"https://api.twitter.com/2/users/by/username/{username}"
-        headers = {"Authorization": f"Bearer {bearer_token}"}
-        try:
-            resp = requests.get(url, headers=headers, timeout=10)
-            if resp.status_code == 200:
-                data = resp.json()
-                return data.get("data", {}).get("id"), username
-            self.stdout.write(self.style.ERROR(f"X username->id error: {resp.status_code} - {resp.text}"))
-            return None, username
-        except requests.exceptions.RequestException as e:
-            self.stdout.write(self.style.ERROR(f"X username->id request failed: {e}"))
-            return None, username
+        user_id = resolve_usernames([username], self._x_client(bearer_token)).get(normalize_username(username))
+        if not user_id:
+            self.stdout.write(self.style.ERROR(f"No se pudo resolver el id de X para @{username}."))
+        return user_id, username
+
+    def _x_client(self, bearer_token: str) -> XClient:
+        """Cliente compartido por todas las peticiones (y todos los hilos) de la ejecución"""
+        if self.x_client is None:
+            self.x_client = XClient(bearer_token)
+        return self.x_client
 
-    def _fetch_x_for_account(self, account: SocialAccount, no_since: bool, debug: bool, include_retweets: bool, include_replies: bool) -> list[dict[str, Any]]:
+    def _x_bearer_token(self) -> str | None:
         bearer_token = getattr(settings, "X_BEARER_TOKEN", "").strip()
         if not bearer_token or bearer_token == "TU_TOKEN_DE_ACCESO_AQUI":
             self.stdout.write(self.style.WARNING("X_BEARER_TOKEN no configurado."))
-            return []
+            return None
+        return bearer_token
 
-        user_id = account.external_user_id.strip() if account.external_user_id else None
-        username = account.username
-        if not user_id:
-            user_id, _ = self._resolve_x_user_id(bearer_token, username)
-        if not user_id:
-            self.stdout.write(self.style.WARNING("No se resolvió X_USER_ID/X_USERNAME."))
-            return []
-
-        url = f"https://api.twitter.com/2/users/{user_id}/tweets"
-        headers = {"Authorization": f"Bearer {bearer_token}", "User-Agent": "ComercIA/1.0"}
-        max_results = max(5, min(int(getattr(settings, "X_MAX_RESULTS", 5)), 25))
-
-        latest = None
-        params = {"max_results": max_results, "tweet.fields": "created_at,text"}
+    def _x_timeline_params(self, cursor: SourceCursor, username: str | None, no_since: bool, include_retweets: bool, include_replies: bool) -> dict[str, Any]:
+        max_results = max(5, min(int(getattr(settings, "X_MAX_RESULTS", 5)), 100))
+        params: dict[str, Any] = {"max_results": max_results, "tweet.fields": "created_at,text"}
         if not no_since:
-            latest = (
-                SocialPost.objects.filter(platform="x", author__iexact=username)
-                .order_by("-published_at")
-                .first()
-            )
-            if latest and latest.post_id.isnumeric():
-                params["since_id"] = latest.post_id
+            if cursor.since_id.isdigit():
+                params["since_id"] = cursor.since_id
+                if cursor.gap_until_id.isdigit():
+                    # Completar primero lo que quedó sin leer en la consulta anterior
+                    params["until_id"] = cursor.gap_until_id
+            else:
+                # Fuente sin cursor todavía: partir del último post guardado
+                latest = (
+                    SocialPost.objects.filter(platform="x", author__iexact=username or "")
+                    .order_by("-published_at")
+                    .first()
+                )
+                if latest and latest.post_id.isnumeric():
+                    params["since_id"] = cursor.since_id = latest.post_id
 
         # Exclude set: Twitter v2 supports exclude=retweets,replies
         exclude_values = []
@@ -273,155 +281,201 @@ class Command(BaseCommand):
             exclude_values.append("replies")
         if exclude_values:
             params["exclude"] = ",".join(exclude_values)
+        return params
+
+    def _x_timeline_request(self, bearer_token: str, user_id: str, username: str | None, params: dict[str, Any]) -> XFetchOutcome:
+        """Recorre el timeline por páginas; no escribe en la BD ni duerme (segura para hilos).
+
+        Con ``since_id`` sigue ``next_token`` hasta ponerse al día (máximo
+        ``X_MAX_PAGES`` páginas); sin él solo pide la página más reciente.
+        El llamador toma la ficha de la primera página y cada página extra
+        toma la suya del mismo token bucket.
+        """
+        max_pages = max(1, int(getattr(settings, "X_MAX_PAGES", 10))) if "since_id" in params else 1
+        timeline = self._x_client(bearer_token).user_timeline(
+            user_id, params, max_pages=max_pages, bucket=self.rate_limiter.bucket("users/tweets"),
+        )
+        posts = [
+            {
+                "id": tweet["id"],
+                "author": username or "unknown",
+                "text": tweet.get("text", ""),
+                "published_at": parse_tweet_datetime(tweet.get("created_at")),
+            }
+            for tweet in timeline
+        ]
+        return XFetchOutcome(
+            status=timeline.status, posts=posts, headers=timeline.headers, meta=timeline.meta,
+            error=timeline.error, pages=timeline.pages, requests=timeline.requests,
+            # Sin since_id se pide solo la página más reciente a propósito: no queda hueco
+            complete=timeline.complete or "since_id" not in params,
+        )
 
-        backoff_seconds = 5
+    def _log_x_outcome(self, outcome: XFetchOutcome, label: str, params: dict[str, Any], debug: bool) -> None:
+        if debug:
+            self.stdout.write(f"X request -> {label} params: {params}")
+            if outcome.status == 200:
+                self.stdout.write(f"X response meta: {outcome.meta} ({outcome.pages} página(s))")
+        if outcome.status is None:
+            self.stdout.write(self.style.ERROR(f"X API request failed ({label}): {outcome.error}"))
+        elif outcome.status not in (200, 429):
+            if debug:
+                self.stdout.write(self.style.ERROR(f"X API error body: {outcome.error}"))
+            self.stdout.write(self.style.ERROR(f"X API error ({label}): {outcome.status}"))
+
+    def _try_x_timeline(self, bearer_token: str, cursor: SourceCursor, username: str | None, params: dict[str, Any], debug: bool) -> tuple[list[dict[str, Any]], float]:
+        """Un intento sin dormir: retorna (posts, segundos a esperar).
+
+        Si la ventana está agotada o la respuesta es 429 no hay posts y el
+        llamador decide si espera o reprograma la fuente (run_ingestion).
+        """
+        bucket = self.rate_limiter.bucket("users/tweets")
+        wait_seconds = bucket.acquire()
+        if wait_seconds:
+            return [], wait_seconds
+        outcome = self._x_timeline_request(bearer_token, cursor.source_key, username, params)
+        throttled = outcome.status == 429
+        bucket.release(outcome.headers, throttled=throttled)
+        self._log_x_outcome(outcome, f"@{username or cursor.source_key}", params, debug)
+        self._record_x_outcome(cursor, outcome)
+        if throttled:
+            return [], max(bucket.wait_time(), 1.0)
+        return outcome.posts, 0.0
+
+    def _fetch_x_timeline(self, bearer_token: str, cursor: SourceCursor, username: str | None, params: dict[str, Any], debug: bool) -> list[dict[str, Any]]:
+        """Obtiene un timeline de una sola cuenta (CLI), esperando el reset si es corto"""
+        max_wait = float(getattr(settings, "X_RATE_LIMIT_MAX_WAIT", 90))
         for attempt in range(3):
-            try:
-                response = requests.get(url, headers=headers, params=params, timeout=15)
-                if debug:
-                    self.stdout.write(f"X request -> URL: {url}")
-                    self.stdout.write(f"X request -> params: {params}")
-                if response.status_code == 200:
-                    data = response.json()
-                    if debug:
-                        meta = data.get("meta", {})
-                        self.stdout.write(f"X response meta: {meta}")
-                    tweets = data.get("data", [])
-                    posts = []
-                    for tweet in tweets:
-                        posts.append(
-                            {
-                                "id": tweet["id"],
-                                "author": username or "unknown",
-                                "text": tweet.get("text", ""),
-                                "published_at": datetime.fromisoformat(tweet["created_at"].replace("Z", "+00:00")) if tweet.get("created_at") else datetime.now(dt_timezone.utc),
-                            }
-                        )
-                    return posts
-                elif response.status_code == 429:
-                    reset_header = response.headers.get("x-rate-limit-reset")
-                    wait_seconds = None
-                    if reset_header:
-                        try:
-                            reset_ts = int(reset_header)
-                            now_ts = int(time.time())
-                            wait_seconds = max(0, reset_ts - now_ts)
-                        except ValueError:
-                            wait_seconds = None
-                    if wait_seconds is not None and wait_seconds <= 90:
-                        self.stdout.write(self.style.WARNING(f"Rate limit X (429). Esperando hasta reset ({wait_seconds}s)..."))
-                        time.sleep(wait_seconds)
-                    else:
-                        self.stdout.write(self.style.WARNING(f"Rate limit X (429). Reintentando en {backoff_seconds}s..."))
-                        time.sleep(backoff_seconds)
-                        backoff_seconds *= 2
+            posts, wait_seconds = self._try_x_timeline(bearer_token, cursor, username, params, debug)
+            if not wait_seconds:
+                return posts
+            if wait_seconds > max_wait:
+                self.stdout.write(self.style.WARNING(f"Rate limit X: ventana agotada, se reintentará en {wait_seconds:.0f}s (próxima ejecución)."))
+                return []
+            # Con una sola cuenta no hay otro trabajo que adelantar mientras tanto
+            self.stdout.write(self.style.WARNING(f"Rate limit X (429). Esperando hasta reset ({wait_seconds:.0f}s)..."))
+            time.sleep(wait_seconds)
+        return []
+
+    def _fetch_x_accounts(self, accounts, no_since: bool, debug: bool, include_retweets: bool, include_replies: bool):
+        """Obtiene los timelines de varias cuentas en paralelo.
+
+        Un pool acotado de hilos hace las peticiones y el hilo principal
+        reparte fichas del token bucket. Las cuentas que reciben 429 se
+        aparcan hasta el reset de la ventana en vez de bloquear a las demás;
+        si el reset supera ``X_RATE_LIMIT_MAX_WAIT`` quedan para la próxima
+        ejecución. Genera tuplas (cuenta, posts) a medida que terminan.
+        """
+        bearer_token = self._x_bearer_token()
+        if not bearer_token:
+            return
+
+        # Preparar en el hilo principal todo lo que toca la BD
+        accounts = list(accounts)
+        backfill_external_ids(accounts, self._x_client(bearer_token))
+        ready: deque = deque()
+        for account in accounts:
+            user_id = (account.external_user_id or "").strip()
+            if not user_id:
+                self.stdout.write(self.style.WARNING(f"No se resolvió el id de X para @{account.username}."))
+                continue
+            cursor = self._cursor("x", user_id)
+            if not self._is_due(cursor, f"@{account.username}"):
+                continue
+            params = self._x_timeline_params(cursor, account.username, no_since, include_retweets, include_replies)
+            ready.append((account, cursor, params, 0))
+
+        bucket = self.rate_limiter.bucket("users/tweets")
+        max_wait = float(getattr(settings, "X_RATE_LIMIT_MAX_WAIT", 90))
+        workers = max(1, int(getattr(settings, "X_FETCH_CONCURRENCY", 8)))
+        parked: list = []  # heap de (listo_en, orden, tarea)
+        order = 0
+        deferred = 0
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            running: dict = {}
+            while ready or running or parked:
+                now = time.time()
+                while parked and parked[0][0] <= now:
+                    ready.append(heapq.heappop(parked)[2])
+
+                while ready and len(running) < workers:
+                    wait_seconds = bucket.acquire()
+                    if wait_seconds:
+                        break
+                    task = ready.popleft()
+                    account, cursor, params, _ = task
+                    future = pool.submit(self._x_timeline_request, bearer_token, cursor.source_key, account.username, params)
+                    running[future] = task
+
+                if ready and not running:
+                    # Ventana agotada sin peticiones en vuelo: aparcar o diferir
+                    wait_seconds = bucket.wait_time()
+                    if wait_seconds > max_wait:
+                        deferred += len(ready) + len(parked)
+                        ready.clear()
+                        parked.clear()
+                        break
+                    for task in ready:
+                        order += 1
+                        heapq.heappush(parked, (now + wait_seconds, order, task))
+                    ready.clear()
+
+                if running:
+                    timeout = max(parked[0][0] - now, 0.05) if parked else None
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                elif parked:
+                    time.sleep(max(min(parked[0][0] - now, max_wait), 0.05))
                     continue
                 else:
-                    if debug:
-                        self.stdout.write(self.style.ERROR(f"X API error body: {response.text}"))
-                    self.stdout.write(self.style.ERROR(f"X API error: {response.status_code}"))
-                    break
-            except requests.exceptions.RequestException as e:
-                self.stdout.write(self.style.ERROR(f"X API request failed: {e}"))
-                break
+                    continue
 
-        return []
+                for future in done:
+                    account, cursor, params, attempts = running.pop(future)
+                    outcome = future.result()
+                    throttled = outcome.status == 429
+                    bucket.release(outcome.headers, throttled=throttled)
+                    self._log_x_outcome(outcome, f"@{account.username}", params, debug)
+                    self._record_x_outcome(cursor, outcome)
+                    if not throttled:
+                        yield account, outcome.posts
+                        continue
+                    retry_in = bucket.wait_time()
+                    if attempts >= 2 or retry_in > max_wait:
+                        deferred += 1
+                        continue
+                    order += 1
+                    heapq.heappush(parked, (time.time() + retry_in, order, (account, cursor, params, attempts + 1)))
 
-    def _fetch_x_by_identifiers(self, explicit_user_id: str | None, username: str | None, no_since: bool, debug: bool, include_retweets: bool, include_replies: bool) -> list[dict[str, Any]]:
-        bearer_token = getattr(settings, "X_BEARER_TOKEN", "").strip()
-        if not bearer_token or bearer_token == "TU_TOKEN_DE_ACCESO_AQUI":
-            self.stdout.write(self.style.WARNING("X_BEARER_TOKEN no configurado."))
-            return []
+        if deferred:
+            self.stdout.write(self.style.WARNING(
+                f"Rate limit X: {deferred} cuenta(s) quedan para la próxima ejecución (ventana agotada)."
+            ))
+
+    def _fetch_x_by_identifiers(self, explicit_user_id: str | None, username: str | None, no_since: bool, debug: bool, include_retweets: bool, include_replies: bool) -> tuple[str | None, list[dict[str, Any]]]:
+        """Retorna (user_id de X, posts)"""
+        bearer_token = self._x_bearer_token()
+        if not bearer_token:
+            return None, []
 
         user_id = (explicit_user_id or "").strip() or None
         if not user_id and username:
             user_id, username = self._resolve_x_user_id(bearer_token, username)
         if not user_id:
             self.stdout.write(self.style.WARNING("No se resolvió X_USER_ID/X_USERNAME para la cuenta indicada."))
-            return []
-
-        url = f"https://api.twitter.com/2/users/{user_id}/tweets"
-        headers = {"Authorization": f"Bearer {bearer_token}", "User-Agent": "ComercIA/1.0"}
-        max_results = max(5, min(int(getattr(settings, "X_MAX_RESULTS", 5)), 25))
-
-        params = {"max_results": max_results, "tweet.fields": "created_at,text"}
-        if not no_since:
-            latest = (
-                SocialPost.objects.filter(platform="x", author__iexact=username or "")
-                .order_by("-published_at")
-                .first()
-            )
-            if latest and latest.post_id.isnumeric():
-                params["since_id"] = latest.post_id
-
-        # Exclude set similar to _fetch_x_for_account
-        exclude_values = []
-        if not include_retweets:
-            exclude_values.append("retweets")
-        if not include_replies:
-            exclude_values.append("replies")
-        if exclude_values:
-            params["exclude"] = ",".join(exclude_values)
-
-        backoff_seconds = 5
-        for attempt in range(3):
-            try:
-                response = requests.get(url, headers=headers, params=params, timeout=15)
-                if debug:
-                    self.stdout.write(f"X request -> URL: {url}")
-                    self.stdout.write(f"X request -> params: {params}")
-                if response.status_code == 200:
-                    data = response.json()
-                    if debug:
-                        meta = data.get("meta", {})
-                        self.stdout.write(f"X response meta: {meta}")
-                    tweets = data.get("data", [])
-                    posts: list[dict[str, Any]] = []
-                    for tweet in tweets:
-                        posts.append(
-                            {
-                                "id": tweet["id"],
-                                "author": username or "unknown",
-                                "text": tweet.get("text", ""),
-                                "published_at": datetime.fromisoformat(tweet["created_at"].replace("Z", "+00:00")) if tweet.get("created_at") else datetime.now(dt_timezone.utc),
-                            }
-                        )
-                    return posts
-                elif response.status_code == 429:
-                    reset_header = response.headers.get("x-rate-limit-reset")
-                    wait_seconds = None
-                    if reset_header:
-                        try:
-                            reset_ts = int(reset_header)
-                            now_ts = int(time.time())
-                            wait_seconds = max(0, reset_ts - now_ts)
-                        except ValueError:
-                            wait_seconds = None
-                    if wait_seconds is not None and wait_seconds <= 90:
-                        self.stdout.write(self.style.WARNING(f"Rate limit X (429). Esperando hasta reset ({wait_seconds}s)..."))
-                        time.sleep(wait_seconds)
-                    else:
-                        self.stdout.write(self.style.WARNING(f"Rate limit X (429). Reintentando en {backoff_seconds}s..."))
-                        time.sleep(backoff_seconds)
-                        backoff_seconds *= 2
-                    continue
-                else:
-                    if debug:
-                        self.stdout.write(self.style.ERROR(f"X API error body: {response.text}"))
-                    self.stdout.write(self.style.ERROR(f"X API error: {response.status_code}"))
-                    break
-            except requests.exceptions.RequestException as e:
-                self.stdout.write(self.style.ERROR(f"X API request failed: {e}"))
-                break
-
-        return []
-
-    def _fetch_x_from_settings(self) -> list[dict[str, Any]]:
-        """Fallback para obtener tweets usando settings cuando no hay SocialAccount."""
-        bearer_token = getattr(settings, "X_BEARER_TOKEN", "").strip()
-        if not bearer_token or bearer_token == "TU_TOKEN_DE_ACCESO_AQUI":
-            self.stdout.write(self.style.WARNING("X_BEARER_TOKEN no configurado."))
-            return []
+            return None, []
+
+        cursor = self._cursor("x", user_id)
+        if not self._is_due(cursor, f"@{username or user_id}"):
+            return user_id, []
+        params = self._x_timeline_params(cursor, username, no_since, include_retweets, include_replies)
+        return user_id, self._fetch_x_timeline(bearer_token, cursor, username, params, debug)
+
+    def _fetch_x_from_settings(self) -> tuple[str | None, list[dict[str, Any]]]:
+        """Fallback para obtener tweets usando settings cuando no hay SocialAccount; retorna (user_id, posts)"""
+        bearer_token = self._x_bearer_token()
+        if not bearer_token:
+            return None, []
         explicit_id = getattr(settings, "X_USER_ID", "").strip()
         username = getattr(settings, "X_USERNAME", "").strip()
         user_id = explicit_id
@@ -429,147 +483,66 @@ class Command(BaseCommand):
             user_id, username = self._resolve_x_user_id(bearer_token, username)
         if not user_id:
             self.stdout.write(self.style.WARNING("No se resolvió X_USER_ID/X_USERNAME desde settings."))
-            return []
-
-        url = f"https://api.twitter.com/2/users/{user_id}/tweets"
-        headers = {"Authorization": f"Bearer {bearer_token}", "User-Agent": "ComercIA/1.0"}
-        max_results = max(5, min(int(getattr(settings, "X_MAX_RESULTS", 5)), 25))
-        latest = (
-            SocialPost.objects.filter(platform="x", author__iexact=username)
-            .order_by("-published_at")
-            .first()
-        )
-        params = {"max_results": max_results, "tweet.fields": "created_at,text"}
-        if latest and latest.post_id.isnumeric():
-            params["since_id"] = latest.post_id
+            return None, []
+
+        # El fallback original no excluía retweets ni respuestas
+        cursor = self._cursor("x", user_id)
+        if not self._is_due(cursor, f"@{username or user_id}"):
+            return user_id, []
+        params = self._x_timeline_params(cursor, username, False, True, True)
+        return user_id, self._fetch_x_timeline(bearer_token, cursor, username, params, False)
+
+    def _fetch_telegram(self, sources: list[SocialSource]) -> dict[str, list[dict[str, Any]]]:
+        """Obtiene mensajes de los canales/grupos de Telegram usando Bot API.
+
+        ``getUpdates`` entrega las actualizaciones de todo el bot, así que se
+        hace una sola petición con ``offset`` = último ``update_id`` + 1 y los
+        mensajes se reparten por chat. Retorna {chat_id: [posts]}.
+        """
+        bot_token = telegram.bot_token()
+        if not bot_token:
+            self.stdout.write(self.style.WARNING("TELEGRAM_BOT_TOKEN no configurado."))
+            return {}
 
-        backoff_seconds = 5
-        for attempt in range(3):
-            try:
-                response = requests.get(url, headers=headers, params=params, timeout=15)
-                if response.status_code == 200:
-                    data = response.json()
-                    tweets = data.get("data", [])
-                    posts: list[dict[str, Any]] = []
-                    for tweet in tweets:
-                        posts.append(
-                            {
-                                "id": tweet["id"],
-                                "author": username or "unknown",
-                                "text": tweet.get("text", ""),
-                                "published_at": datetime.fromisoformat(tweet["created_at"].replace("Z", "+00:00")) if tweet.get("created_at") else datetime.now(dt_timezone.utc),
-                            }
-                        )
-                    return posts
-                elif response.status_code == 429:
-                    reset_header = response.headers.get("x-rate-limit-reset")
-                    wait_seconds = None
-                    if reset_header:
-                        try:
-                            reset_ts = int(reset_header)
-                            now_ts = int(time.time())
-                            wait_seconds = max(0, reset_ts - now_ts)
-                        except ValueError:
-                            wait_seconds = None
-                    if wait_seconds is not None and wait_seconds <= 90:
-                        self.stdout.write(self.style.WARNING(f"Rate limit X (429). Esperando hasta reset ({wait_seconds}s)..."))
-                        time.sleep(wait_seconds)
-                    else:
-                        self.stdout.write(self.style.WARNING(f"Rate limit X (429). Reintentando en {backoff_seconds}s..."))
-                        time.sleep(backoff_seconds)
-                        backoff_seconds *= 2
-                    continue
-                else:
-                    self.stdout.write(self.style.ERROR(f"X API error: {response.status_code} - {response.text}"))
-                    break
-            except requests.exceptions.RequestException as e:
-                self.stdout.write(self.style.ERROR(f"X API request failed: {e}"))
-                break
+        chat_ids = {str(source.handle) for source in sources if source.handle}
+        if not chat_ids:
+            self.stdout.write(self.style.WARNING("Chat ID no configurado en las fuentes de Telegram."))
+            return {}
 
-        return []
+        cursor = self._cursor("telegram", "bot")
+        if not self._is_due(cursor, "telegram"):
+            return {}
 
-    def _fetch_telegram(self, source: SocialSource) -> list[dict[str, Any]]:
-        """Obtiene mensajes de un canal/grupo de Telegram usando Bot API"""
-        bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-        chat_id = source.handle
-        
-        if not bot_token:
-            self.stdout.write(self.style.WARNING("TELEGRAM_BOT_TOKEN no configurado."))
-            return []
-        
-        if not chat_id:
-            self.stdout.write(self.style.WARNING(f"Chat ID no configurado para fuente {source}"))
-            return []
-        
-        # Obtener el último mensaje procesado para evitar duplicados
-        latest = (
-            SocialPost.objects.filter(platform="telegram", author=chat_id)
-            .order_by("-published_at")
-            .first()
-        )
-        
-        # Configurar parámetros de la API
-        url = f"https://api.telegram.org/bot{bot_token}/getUpdates"
-        params = {
-            "chat_id": chat_id,
-            "limit": 20,  # Máximo 20 mensajes por request
-        }
-        
-        # Si tenemos un mensaje reciente, usar su ID como offset
-        if latest and latest.post_id.isnumeric():
-            params["offset"] = int(latest.post_id) + 1
-        
+        offset = cursor.update_id + 1 if cursor.update_id is not None else None
+        stats = self.metrics.source("telegram", "bot")
+        started = time.perf_counter()
         try:
-            response = requests.get(url, params=params, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if not data.get("ok"):
-                    self.stdout.write(self.style.ERROR(f"Telegram API error: {data.get('description', 'Unknown error')}"))
-                    return []
-                
-                updates = data.get("result", [])
-                posts = []
-                
-                for update in updates:
-                    message = update.get("message", {})
-                    if not message:
-                        continue
-                    
-                    # Solo procesar mensajes de texto
-                    if "text" not in message:
-                        continue
-                    
-                    # Verificar que el mensaje sea del chat correcto
-                    chat = message.get("chat", {})
-                    if str(chat.get("id")) != str(chat_id):
-                        continue
-                    
-                    # Extraer información del mensaje
-                    message_id = str(message.get("message_id", ""))
-                    text = message.get("text", "")
-                    date = message.get("date", 0)
-                    
-                    # Convertir timestamp a datetime
-                    published_at = datetime.fromtimestamp(date, tz=dt_timezone.utc)
-                    
-                    posts.append({
-                        "id": message_id,
-                        "author": chat.get("title", chat.get("username", chat_id)),
-                        "text": text,
-                        "published_at": published_at,
-                    })
-                
-                return posts
-                
-            elif response.status_code == 429:
-                self.stdout.write(self.style.WARNING("Rate limit de Telegram alcanzado. Reintentando más tarde..."))
-                return []
-            else:
-                self.stdout.write(self.style.ERROR(f"Telegram API error: {response.status_code} - {response.text}"))
-                return []
-                
+            response = telegram.get_updates(bot_token, offset=offset)
         except requests.exceptions.RequestException as e:
+            stats.observe(None, time.perf_counter() - started)
             self.stdout.write(self.style.ERROR(f"Telegram API request failed: {e}"))
-            return []
+            return {}
+        stats.observe(response.status_code, time.perf_counter() - started)
+
+        if response.status_code == 429:
+            self.stdout.write(self.style.WARNING("Rate limit de Telegram alcanzado. Reintentando más tarde..."))
+            return {}
+        if response.status_code == 409:
+            # Con un webhook activo Telegram no permite getUpdates
+            self.stdout.write(self.style.WARNING("Webhook de Telegram activo: los mensajes se procesan con process_telegram_updates."))
+            return {}
+        if response.status_code != 200:
+            self.stdout.write(self.style.ERROR(f"Telegram API error: {response.status_code} - {response.text}"))
+            return {}
+
+        data = response.json()
+        if not data.get("ok"):
+            self.stdout.write(self.style.ERROR(f"Telegram API error: {data.get('description', 'Unknown error')}"))
+            return {}
+
+        posts_by_chat, max_update_id = telegram.parse_updates(data.get("result", []), chat_ids)
+        if max_update_id is not None:
+            cursor.update_id = max_update_id
+        cursor.last_fetch_at = self.now
+        self._save_cursor(cursor)
+        return posts_by_chat
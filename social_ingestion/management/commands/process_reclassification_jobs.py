@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from social_ingestion.models import ReclassificationJob
+from social_ingestion.taxonomy import run_reclassification_job
+
+
+class Command(BaseCommand):
+    help = "Reclasifica SocialPost/UserInterest por lotes tras cambios en la taxonomía de palabras clave"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Filas por lote")
+        parser.add_argument("--loop", action="store_true", help="Seguir esperando nuevos trabajos")
+        parser.add_argument("--interval", type=int, default=30, help="Segundos entre revisiones con --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            self.process_pending(options["chunk_size"])
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+
+    def process_pending(self, chunk_size: int) -> None:
+        # Los trabajos parciales (--since) de reclassify se retoman solo con reclassify --resume
+        jobs = list(
+            ReclassificationJob.objects.exclude(status="done").filter(since__isnull=True)
+            .order_by("-taxonomy_version", "-created_at")
+        )
+        if not jobs:
+            self.stdout.write("No hay reclasificaciones pendientes.")
+            return
+        latest, superseded = jobs[0], jobs[1:]
+        if superseded:
+            # El trabajo más reciente recorre todas las filas con la taxonomía vigente
+            ReclassificationJob.objects.filter(pk__in=[j.pk for j in superseded]).update(
+                status="done", finished_at=timezone.now()
+            )
+        run_reclassification_job(latest, chunk_size=chunk_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Taxonomía v{latest.taxonomy_version}: {latest.posts_updated} posts y "
+            f"{latest.interests_updated} intereses actualizados."
+        ))
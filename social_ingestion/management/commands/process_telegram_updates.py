@@ -0,0 +1,81 @@
+import signal
+import threading
+
+import requests
+from django.core.management.base import BaseCommand
+
+from social_ingestion import telegram
+from social_ingestion.models import SourceCursor
+
+
+class Command(BaseCommand):
+    help = (
+        "Clasifica e inserta los updates de Telegram encolados por el webhook. "
+        "Con --long-poll los obtiene con getUpdates (desarrollo local, sin webhook)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Updates por lote")
+        parser.add_argument("--loop", action="store_true", help="Seguir procesando la cola")
+        parser.add_argument("--interval", type=int, default=5, help="Segundos entre revisiones con --loop")
+        parser.add_argument("--long-poll", action="store_true", help="Obtener updates con getUpdates en vez del webhook")
+        parser.add_argument("--timeout", type=int, default=30, help="Segundos que Telegram mantiene abierto getUpdates")
+
+    def handle(self, *args, **options):
+        self.stop_event = threading.Event()
+        previous_handlers = {
+            sig: signal.signal(sig, lambda signum, frame: self.stop_event.set())
+            for sig in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            while not self.stop_event.is_set():
+                if options["long_poll"] and not self.poll_once(options["timeout"]):
+                    return
+                self.process_pending(options["batch_size"])
+                if not (options["loop"] or options["long_poll"]):
+                    return
+                if not options["long_poll"]:
+                    self.stop_event.wait(options["interval"])
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+
+    def poll_once(self, timeout: int) -> bool:
+        """Encola una tanda de getUpdates y confirma el offset. Retorna False si no se puede seguir"""
+        token = telegram.bot_token()
+        if not token:
+            self.stdout.write(self.style.ERROR("TELEGRAM_BOT_TOKEN no configurado."))
+            return False
+        cursor, _ = SourceCursor.objects.get_or_create(platform="telegram", source_key="bot")
+        offset = cursor.update_id + 1 if cursor.update_id is not None else None
+        try:
+            response = telegram.get_updates(token, offset=offset, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            self.stdout.write(self.style.ERROR(f"Telegram API request failed: {e}"))
+            self.stop_event.wait(5)
+            return True
+        if response.status_code == 409:
+            self.stdout.write(self.style.ERROR("Hay un webhook activo; quítalo con setup_telegram --delete-webhook."))
+            return False
+        data = response.json() if response.status_code == 200 else {}
+        if not data.get("ok"):
+            self.stdout.write(self.style.ERROR(f"Telegram API error: {response.status_code} - {response.text}"))
+            self.stop_event.wait(5)
+            return True
+
+        updates = data.get("result", [])
+        telegram.enqueue_updates(updates)
+        update_ids = [u["update_id"] for u in updates if isinstance(u.get("update_id"), int)]
+        if update_ids:
+            # Guardar el offset solo después de encolar: un corte no pierde updates
+            cursor.update_id = max(update_ids)
+            cursor.save(update_fields=["update_id"])
+        return True
+
+    def process_pending(self, batch_size: int) -> None:
+        result = telegram.process_pending_updates(batch_size=batch_size)
+        if result.fetched:
+            self.stdout.write(self.style.SUCCESS(
+                f"Telegram: {result.inserted} publicaciones guardadas, {result.skipped} ya existían, "
+                f"{result.duplicates} casi duplicadas (de {result.matched} con categorías, {result.fetched} mensajes)."
+            ))
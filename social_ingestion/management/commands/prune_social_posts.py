@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from social_ingestion.interest_index import rebuild_interest_index
+from social_ingestion.recommender import mark_all_dirty
+from social_ingestion.retention import drop_before, expired_month_counts, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina los meses de SocialPost más viejos que la retención "
+        "(SOCIAL_POST_RETENTION_MONTHS). Con --archive mueve antes sus payloads a SOCIAL_ARCHIVE_DIR."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-months", type=int, default=None, help="Meses a conservar, incluido el actual")
+        parser.add_argument("--archive", action="store_true", help="Archivar los payloads antes de borrar")
+        parser.add_argument("--dir", default=None, help="Directorio de archivo (default: SOCIAL_ARCHIVE_DIR)")
+        parser.add_argument("--dry-run", action="store_true", help="Solo listar los meses que se borrarían")
+
+    def handle(self, *args, **options):
+        keep = options["keep_months"]
+        if keep is None:
+            keep = int(getattr(settings, "SOCIAL_POST_RETENTION_MONTHS", 12))
+        if keep < 1:
+            raise CommandError("--keep-months debe ser al menos 1.")
+
+        cutoff = retention_cutoff(keep)
+        counts = expired_month_counts(cutoff)
+        for month, count in sorted(counts.items()):
+            prefix = "DRY: " if options["dry_run"] else ""
+            self.stdout.write(f"{prefix}{month // 100}-{month % 100:02d}: {count} post(s)")
+        if options["dry_run"]:
+            self.stdout.write(f"DRY: {len(counts)} mes(es) vencidos.")
+            return
+
+        deleted = drop_before(cutoff, archive=options["archive"], root=options["dir"])
+        if deleted:
+            # Los términos y listas podían venir de los posts eliminados
+            rebuild_interest_index()
+            mark_all_dirty()
+        self.stdout.write(self.style.SUCCESS(
+            f"{deleted} post(s) eliminados de {len(counts)} mes(es) anteriores a {cutoff:%Y-%m}."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from social_ingestion.interest_index import rebuild_interest_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice invertido término -> usuario de intereses y posts vinculados"
+
+    def handle(self, *args, **options):
+        count = rebuild_interest_index()
+        self.stdout.write(self.style.SUCCESS(f"{count} término(s) indexados."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from social_ingestion.search import install_fts, uses_fts
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea los índices de texto completo de posts e intereses si faltan: FTS5 con sus triggers "
+        "(repoblado) en SQLite, GIN sobre tsvector en PostgreSQL"
+    )
+
+    def handle(self, *args, **options):
+        if not uses_fts():
+            self.stdout.write(self.style.WARNING("La base de datos no es SQLite ni PostgreSQL: la búsqueda usa icontains, nada que hacer."))
+            return
+        with connection.schema_editor() as schema_editor:
+            install_fts(schema_editor)
+        self.stdout.write(self.style.SUCCESS("Índices de búsqueda reconstruidos."))
@@ -0,0 +1,58 @@
+import os
+import time
+from datetime import datetime, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from social_ingestion.models import ReclassificationJob
+from social_ingestion.taxonomy import current_version, run_reclassification_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Reclasifica SocialPost y UserInterest con la taxonomía vigente: recorre las tablas por lotes, "
+        "clasifica en un pool de procesos y guarda con bulk_update y checkpoints reanudables"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Filas por lote")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Procesos para clasificar (1 = en este proceso)")
+        parser.add_argument("--since", help="Solo filas publicadas/creadas desde esta fecha (AAAA-MM-DD o ISO 8601)")
+        parser.add_argument("--resume", action="store_true", help="Continuar el último trabajo interrumpido")
+
+    def handle(self, *args, **options):
+        if options["resume"]:
+            job = ReclassificationJob.objects.exclude(status="done").order_by("-created_at").first()
+            if job is None:
+                self.stdout.write("No hay reclasificaciones interrumpidas.")
+                return
+            self.stdout.write(
+                f"Retomando v{job.taxonomy_version} desde post {job.last_post_id} e interés {job.last_interest_id}."
+            )
+        else:
+            job = ReclassificationJob.objects.create(
+                taxonomy_version=current_version(), since=self._parse_since(options.get("since"))
+            )
+
+        started = time.monotonic()
+        run_reclassification_job(job, chunk_size=options["chunk_size"], workers=max(1, options["workers"]))
+        self.stdout.write(self.style.SUCCESS(
+            f"Reclasificación terminada en {time.monotonic() - started:.1f}s: "
+            f"{job.posts_updated} posts y {job.interests_updated} intereses actualizados."
+        ))
+
+    def _parse_since(self, value: str | None):
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f"Fecha inválida para --since: {value}")
+            parsed = datetime.combine(day, dt_time.min)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from social_ingestion.models import UserRecommendation
+from social_ingestion.recommender import compute_for_user
+
+
+class Command(BaseCommand):
+    help = "Recalcula las listas de recomendación marcadas como desactualizadas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recalcular también las listas vigentes")
+        parser.add_argument("--limit", type=int, default=0, help="Máximo de usuarios a recalcular (0 = todos)")
+
+    def handle(self, *args, **options):
+        rows = UserRecommendation.objects.all() if options["all"] else UserRecommendation.objects.filter(dirty=True)
+        user_ids = rows.order_by("user_id").values_list("user_id", flat=True)
+        if options["limit"]:
+            user_ids = user_ids[:options["limit"]]
+        count = 0
+        for user in User.objects.filter(id__in=list(user_ids)).iterator(chunk_size=500):
+            compute_for_user(user)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} lista(s) de recomendación recalculadas."))
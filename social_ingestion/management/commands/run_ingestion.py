@@ -0,0 +1,158 @@
+import os
+import signal
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from social_ingestion import telegram
+from social_ingestion.management.commands.fetch_social import Command as FetchSocialCommand
+from social_ingestion.models import SocialAccount, SocialSource
+from social_ingestion.persistence import PersistResult
+from social_ingestion.resolver import backfill_external_ids
+from social_ingestion.scheduler import SourceQueue, record_fetch
+
+
+class Command(BaseCommand):
+    help = (
+        "Daemon de ingesta: consulta cada fuente de X/Telegram según su frecuencia de publicación "
+        "y la cuota restante de la API. Termina de forma ordenada con SIGTERM/SIGINT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="No guardar posts ni cursores")
+        parser.add_argument("--refresh", type=int, default=300, help="Segundos entre recargas de cuentas y fuentes")
+        parser.add_argument("--max-fetches", type=int, default=0, help="Terminar tras N consultas (0 = sin límite)")
+
+    def handle(self, *args, **options):
+        self.dry_run = options["dry_run"]
+        self.stop_event = threading.Event()
+        previous_handlers = {
+            sig: signal.signal(sig, self._request_stop) for sig in (signal.SIGTERM, signal.SIGINT)
+        }
+        # El daemon decide cuándo toca cada fuente: se omite la caché de fetch_social
+        self.fetcher = FetchSocialCommand(stdout=self.stdout, stderr=self.stderr)
+        self.fetcher.setup(force=True, dry_run=self.dry_run, command="run_ingestion")
+        self.queue = SourceQueue()
+        self.sources: dict[tuple[str, str], object] = {}
+        fetches = 0
+        try:
+            next_refresh = self._now()
+            while not self.stop_event.is_set():
+                now = self._now()
+                if now >= next_refresh:
+                    self._load_sources(now)
+                    next_refresh = now + timedelta(seconds=options["refresh"])
+
+                key = self.queue.pop_due(now)
+                if key is None:
+                    head = self.queue.peek()
+                    wake_at = min(head[1], next_refresh) if head else next_refresh
+                    self.stop_event.wait(max((wake_at - now).total_seconds(), 0.05))
+                    continue
+                if key not in self.sources:
+                    continue
+
+                self._run_source(key, now)
+                fetches += 1
+                if options["max_fetches"] and fetches >= options["max_fetches"]:
+                    break
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+        self.stdout.write(self.style.SUCCESS(f"Ingesta detenida tras {fetches} consulta(s)."))
+
+    def _request_stop(self, signum, frame):
+        # Solo se marca la parada: la consulta en curso termina y guarda su cursor
+        self.stdout.write(self.style.WARNING("Señal recibida, terminando la consulta en curso..."))
+        self.stop_event.set()
+
+    def _now(self) -> datetime:
+        return datetime.now(dt_timezone.utc)
+
+    def _load_sources(self, now: datetime) -> None:
+        """Sincroniza la cola con las cuentas de X y las fuentes de Telegram activas"""
+        sources: dict[tuple[str, str], object] = {}
+        accounts = list(SocialAccount.objects.all())
+        bearer_token = self.fetcher._x_bearer_token() if accounts else None
+        if bearer_token:
+            backfill_external_ids(accounts, self.fetcher._x_client(bearer_token))
+        for account in accounts:
+            user_id = (account.external_user_id or "").strip()
+            if user_id:
+                sources[("x", user_id)] = account.username
+
+        telegram_sources = list(SocialSource.objects.filter(active=True, platform="telegram"))
+        if telegram_sources and os.getenv("TELEGRAM_BOT_TOKEN"):
+            sources[("telegram", "bot")] = telegram_sources
+
+        for key in set(self.sources) - set(sources):
+            self.queue.discard(key)
+        for key in sources:
+            if key not in self.queue and key not in self.sources:
+                cursor = self.fetcher._cursor(*key)
+                due_at = cursor.next_fetch_at if cursor.next_fetch_at and cursor.next_fetch_at > now else now
+                self.queue.schedule(key, due_at)
+        self.sources = sources
+
+    def _run_source(self, key: tuple[str, str], now: datetime) -> None:
+        platform, source_key = key
+        cursor = self.fetcher._cursor(platform, source_key)
+        previous_fetch_at = cursor.last_fetch_at
+        self.fetcher.now = now
+        result = PersistResult()
+
+        if platform == "x":
+            username = self.sources[key]
+            bucket = self.fetcher.rate_limiter.bucket("users/tweets")
+            wait_seconds = bucket.wait_time()
+            if wait_seconds:
+                # Ventana agotada: reintentar en el reset sin ocupar el turno de otras fuentes
+                self.queue.schedule(key, now + timedelta(seconds=wait_seconds))
+                return
+            bearer_token = self.fetcher._x_bearer_token()
+            if bearer_token:
+                params = self.fetcher._x_timeline_params(cursor, username, False, False, False)
+                # Nunca dormir aquí: con la ventana agotada la fuente se reprograma para el reset
+                posts, wait_seconds = self.fetcher._try_x_timeline(bearer_token, cursor, username, params, False)
+                if wait_seconds:
+                    self.fetcher.save_metrics()
+                    self.queue.schedule(key, now + timedelta(seconds=wait_seconds))
+                    self.stdout.write(f"@{username}: rate limit X, se reintentará en {wait_seconds:.0f}s.")
+                    return
+                result += self.fetcher._store("x", posts, save_all=False, dry_run=self.dry_run, author=username,
+                                              source_key=source_key)
+            label = f"@{username}"
+            sharing = sum(1 for k in self.sources if k[0] == "x")
+        elif getattr(settings, "TELEGRAM_WEBHOOK_SECRET", "") and not self.dry_run:
+            # Con webhook los updates ya están en la cola: solo hay que procesarlos
+            processed = telegram.process_pending_updates()
+            self.fetcher.metrics.add_result(processed, "telegram", source_key)
+            result += processed
+            cursor.last_fetch_at = now
+            label = "telegram (webhook)"
+            sharing = 1
+        else:
+            sources = self.sources[key]
+            posts_by_chat = self.fetcher._fetch_telegram(sources)
+            for source in sources:
+                posts = posts_by_chat.get(str(source.handle), [])
+                result += self.fetcher._store("telegram", posts, save_all=False, dry_run=self.dry_run,
+                                              source_key=source_key)
+            label = "telegram"
+            sharing = 1
+
+        # Solo una consulta exitosa (que movió last_fetch_at) alimenta el promedio
+        fetched_ok = cursor.last_fetch_at is not None and cursor.last_fetch_at != previous_fetch_at
+        record_fetch(cursor, now, result.fetched, previous_fetch_at if fetched_ok else None, sharing)
+        if not self.dry_run:
+            cursor.save()
+        # Cada consulta del daemon queda como una ejecución en IngestionRun
+        self.fetcher.save_metrics()
+        self.queue.schedule(key, cursor.next_fetch_at)
+        minutes = (cursor.next_fetch_at - now).total_seconds() / 60
+        self.stdout.write(
+            f"{label}: {result.fetched} nuevas, {result.inserted} guardadas "
+            f"({cursor.post_rate:.1f}/h); próxima consulta en {minutes:.0f} min."
+        )
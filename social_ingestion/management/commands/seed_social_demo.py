@@ -4,7 +4,7 @@ import uuid
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 
-from social_ingestion.models import SocialPost, SocialAccount
+from social_ingestion.models import SocialPost, SocialAccount, SocialPostPayload
 from social_ingestion import recommend_categories_from_text
 
 
@@ -54,11 +54,11 @@ class Command(BaseCommand):
                     "author": social.username,
                     "text": text,
                     "published_at": datetime.now(dt_timezone.utc),
-                    "raw_payload": {"id": post_id, "text": text, "author": social.username},
                     "matched_categories": ",".join(categories),
                 },
             )
             if created:
+                SocialPostPayload.from_dict(post_id, {"id": post_id, "text": text, "author": social.username}).save()
                 created_count += 1
 
         self.stdout.write(self.style.SUCCESS(f"Creados {created_count} posts demo."))
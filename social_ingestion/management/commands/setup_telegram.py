@@ -1,5 +1,7 @@
 import os
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from social_ingestion import telegram
 from social_ingestion.models import SocialSource
 
 
@@ -28,6 +30,16 @@ class Command(BaseCommand):
             type=int, 
             help="ID de la fuente a eliminar"
         )
+        parser.add_argument(
+            "--set-webhook",
+            type=str,
+            help="URL pública de /telegram/webhook/ (usa TELEGRAM_WEBHOOK_SECRET)"
+        )
+        parser.add_argument(
+            "--delete-webhook",
+            action="store_true",
+            help="Quitar el webhook para volver a getUpdates (long polling)"
+        )
 
     def handle(self, *args, **options):
         # Verificar configuración del bot
@@ -50,6 +62,26 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.WARNING("No hay fuentes de Telegram configuradas"))
             return
 
+        # Registrar o quitar el webhook
+        if options["set_webhook"]:
+            secret = getattr(settings, "TELEGRAM_WEBHOOK_SECRET", "")
+            if not secret:
+                self.stdout.write(self.style.ERROR("TELEGRAM_WEBHOOK_SECRET no configurado"))
+                return
+            data = telegram.set_webhook(bot_token, options["set_webhook"], secret)
+            if data.get("ok"):
+                self.stdout.write(self.style.SUCCESS(f"Webhook registrado en {options['set_webhook']}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"Error al registrar webhook: {data.get('description')}"))
+            return
+        if options["delete_webhook"]:
+            data = telegram.delete_webhook(bot_token)
+            if data.get("ok"):
+                self.stdout.write(self.style.SUCCESS("Webhook eliminado; fetch_social vuelve a usar getUpdates"))
+            else:
+                self.stdout.write(self.style.ERROR(f"Error al eliminar webhook: {data.get('description')}"))
+            return
+
         # Eliminar fuente
         if options["remove"]:
             try:
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from social_ingestion.replay import StubAPIServer, SyntheticConfig, load_cassette
+
+
+class Command(BaseCommand):
+    help = (
+        "Levanta un servidor local que imita las APIs de X y Telegram: reproduce cassettes grabados "
+        "con SOCIAL_API_CASSETTE y genera timelines sintéticos con rate limit y 429 para lo que no esté grabado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--cassette", action="append", default=[],
+            help="Cassette JSONL a reproducir (se puede repetir)",
+        )
+        parser.add_argument("--tweets-per-page", type=int, default=10)
+        parser.add_argument("--pages", type=int, default=3, help="Páginas (next_token) por timeline")
+        parser.add_argument("--tweets-per-minute", type=float, default=0.0, help="Tweets nuevos por minuto y cuenta")
+        parser.add_argument("--rate-limit", type=int, default=900, help="Peticiones por ventana y endpoint")
+        parser.add_argument("--window", type=int, default=900, help="Duración de la ventana (segundos)")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de 429 aleatorios (0-1)")
+        parser.add_argument("--updates-per-poll", type=int, default=5, help="Updates de Telegram por getUpdates")
+        parser.add_argument("--telegram-chat-id", default="-1001")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        cassettes = [entry for path in options["cassette"] for entry in load_cassette(path)]
+        config = SyntheticConfig(
+            tweets_per_page=options["tweets_per_page"],
+            pages=options["pages"],
+            tweets_per_minute=options["tweets_per_minute"],
+            rate_limit=options["rate_limit"],
+            window=options["window"],
+            error_rate=options["error_rate"],
+            updates_per_poll=options["updates_per_poll"],
+            telegram_chat_id=options["telegram_chat_id"],
+            seed=options["seed"],
+        )
+        server = StubAPIServer((options["host"], options["port"]), cassettes, config)
+        self.stdout.write(self.style.SUCCESS(
+            f"Servidor de prueba en {server.base_url} ({len(cassettes)} interacción(es) grabadas)."
+        ))
+        self.stdout.write(f"  export X_API_BASE_URL={server.base_url}/2")
+        self.stdout.write(f"  export TELEGRAM_API_BASE_URL={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"{server.requests_served} petición(es) atendidas.")
@@ -0,0 +1,133 @@
+"""Clasificador de categorías por palabras clave basado en Aho-Corasick.
+
+El texto se normaliza (minúsculas, sin tildes) y se divide en palabras; el
+autómata recorre esas palabras una sola vez, así que el costo es lineal en
+el tamaño del texto sin importar cuántas palabras clave existan. Al trabajar
+sobre palabras completas, 'pan' ya no coincide dentro de 'pantalón'. Las
+palabras clave pueden tener varias palabras ('comida rapida').
+
+Los plurales simples del español se reducen a la palabra clave singular:
+una palabra del texto que no está en el vocabulario pero sí lo está sin
+'-s' o '-es' cuenta como esa palabra ('camisas' -> 'camisa',
+'pantalones' -> 'pantalon', 'celulares' -> 'celular').
+"""
+import re
+import unicodedata
+from collections import deque
+from typing import Iterable
+
+_WORD_RE = re.compile(r'\w+')
+_COMBINING_RE = re.compile('[\u0300-\u036f]')
+
+
+def fold_text(text: str | None) -> str:
+    """Minúsculas y sin tildes: 'Café' -> 'cafe'"""
+    if not text:
+        return ''
+    if text.isascii():
+        return text.lower()
+    return _COMBINING_RE.sub('', unicodedata.normalize('NFKD', text)).lower()
+
+
+def tokenize(text: str | None) -> list[str]:
+    return _WORD_RE.findall(fold_text(text))
+
+
+class KeywordMatcher:
+    """Autómata Aho-Corasick sobre palabras, compilado una vez y reutilizable"""
+
+    def __init__(self, keyword_map: dict[str, str]):
+        self.keyword_map = dict(keyword_map)
+        # Estado 0 es la raíz; cada estado tiene transiciones, enlace de fallo y salidas
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[tuple[str, str], ...]] = [()]
+        self.categories_list = sorted(set(self.keyword_map.values()))
+        self._vocabulary: frozenset[str] = frozenset()
+        self._build()
+
+    def _build(self) -> None:
+        outputs: dict[int, set[tuple[str, str]]] = {}
+        vocabulary: set[str] = set()
+        for keyword, category in self.keyword_map.items():
+            tokens = tokenize(keyword)
+            if not tokens:
+                continue
+            vocabulary.update(tokens)
+            state = 0
+            for token in tokens:
+                nxt = self._goto[state].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][token] = nxt
+                state = nxt
+            outputs.setdefault(state, set()).add((' '.join(tokens), category))
+
+        for state, found in outputs.items():
+            self._out[state] = tuple(sorted(found))
+        self._first_tokens = frozenset(self._goto[0])
+        self._vocabulary = frozenset(vocabulary)
+
+        # BFS para calcular enlaces de fallo y heredar salidas
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _singular(self, token: str) -> str:
+        """La palabra del vocabulario de la que ``token`` es plural ('-s'/'-es'), o ``token``"""
+        if token in self._vocabulary or not token.endswith('s'):
+            return token
+        if token[:-1] in self._vocabulary:
+            return token[:-1]
+        if token.endswith('es') and token[:-2] in self._vocabulary:
+            return token[:-2]
+        return token
+
+    def find(self, text: str | None) -> list[tuple[str, str]]:
+        """Lista de (palabra_clave, categoría) encontradas en el texto, en orden"""
+        tokens = [self._singular(token) for token in tokenize(text)]
+        # Salida rápida: ninguna palabra inicia una palabra clave
+        if self._first_tokens.isdisjoint(tokens):
+            return []
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        found: list[tuple[str, str]] = []
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if out[state]:
+                found.extend(out[state])
+        return found
+
+    def categories(self, text: str | None) -> list[str]:
+        return sorted({category for _, category in self.find(text)})
+
+    def classify_many(self, texts: Iterable[str | None]) -> list[list[str]]:
+        return [self.categories(text) for text in texts]
+
+
+# Estado de cada proceso del pool de reclasificación (sin dependencias de Django)
+_worker_matcher: KeywordMatcher | None = None
+
+
+def init_worker(keyword_map: dict[str, str]) -> None:
+    global _worker_matcher
+    _worker_matcher = KeywordMatcher(keyword_map)
+
+
+def classify_chunk(texts: list[str | None]) -> list[str]:
+    """Categorías unidas por comas para cada texto, con el autómata del proceso"""
+    return [",".join(categories) for categories in _worker_matcher.classify_many(texts)]
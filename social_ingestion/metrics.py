@@ -0,0 +1,188 @@
+"""Métricas de la ingesta: por ejecución, por fuente y por petición a la API.
+
+``RunMetrics`` acumula en memoria lo que pasa durante una ejecución de
+``fetch_social`` (o un ciclo de ``run_ingestion``): por cada fuente cuenta
+peticiones, 429, errores, un histograma de latencias y la última cuota
+informada por los headers ``x-rate-limit-*``, y los posts obtenidos,
+clasificados, insertados y duplicados. ``save`` lo guarda en
+``IngestionRun`` y ``SourceFetchMetric`` con dos INSERT.
+
+``render_prometheus`` arma el texto del endpoint ``/metrics/`` solo con
+agregados de esas tablas y de ``SourceCursor``, así que ver el estado de la
+cuota no gasta peticiones.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timezone as dt_timezone
+from typing import Iterable, Mapping
+
+from django.db.models import Count, Max, Sum
+
+from .models import IngestionRun, SourceCursor, SourceFetchMetric
+from .persistence import PersistResult
+from .ratelimit import parse_rate_limit_headers
+
+# Límites superiores (segundos) de los tramos del histograma; hay un tramo extra para +Inf
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_COUNTERS = ("requests", "throttled", "errors", "fetched", "matched", "inserted", "skipped", "duplicates")
+
+
+def bucket_index(seconds: float) -> int:
+    return next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+
+
+@dataclass
+class SourceStats:
+    platform: str
+    source_key: str
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    latency_sum: float = 0.0
+    latency_buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    result: PersistResult = field(default_factory=PersistResult)
+    rate_limit: int | None = None
+    rate_remaining: int | None = None
+    rate_reset_at: datetime | None = None
+
+    def observe(self, status: int | None, seconds: float | None = None,
+                headers: Mapping[str, str] | None = None) -> None:
+        """Registra una petición; ``status`` None es un error de conexión"""
+        self.requests += 1
+        if status == 429:
+            self.throttled += 1
+        elif status is None or status >= 400:
+            self.errors += 1
+        if seconds is not None:
+            self.latency_sum += seconds
+            self.latency_buckets[bucket_index(seconds)] += 1
+        limit, remaining, reset = parse_rate_limit_headers(headers or {})
+        if remaining is not None:
+            self.rate_limit, self.rate_remaining = limit, remaining
+            if reset is not None:
+                self.rate_reset_at = datetime.fromtimestamp(reset, tz=dt_timezone.utc)
+
+    def to_model(self, run: IngestionRun) -> SourceFetchMetric:
+        return SourceFetchMetric(
+            run=run, platform=self.platform, source_key=self.source_key,
+            requests=self.requests, throttled=self.throttled, errors=self.errors,
+            latency_sum=self.latency_sum, latency_buckets=self.latency_buckets,
+            fetched=self.result.fetched, matched=self.result.matched, inserted=self.result.inserted,
+            skipped=self.result.skipped, duplicates=self.result.duplicates,
+            rate_limit=self.rate_limit, rate_remaining=self.rate_remaining, rate_reset_at=self.rate_reset_at,
+        )
+
+
+class RunMetrics:
+    def __init__(self, command: str):
+        self.command = command
+        self.started_at = datetime.now(dt_timezone.utc)
+        self.sources: dict[tuple[str, str], SourceStats] = {}
+        self.result = PersistResult()
+
+    def source(self, platform: str, source_key: str) -> SourceStats:
+        key = (platform, str(source_key))
+        if key not in self.sources:
+            self.sources[key] = SourceStats(platform, str(source_key))
+        return self.sources[key]
+
+    def add_result(self, result: PersistResult, platform: str | None = None, source_key: str | None = None) -> None:
+        """Suma los posts de un lote a la ejecución y, si se indica, a su fuente"""
+        self.result += result
+        if platform and source_key:
+            self.source(platform, source_key).result += result
+
+    @property
+    def empty(self) -> bool:
+        return not self.sources and not self.result.fetched
+
+    def save(self) -> IngestionRun | None:
+        """Guarda la ejecución y sus fuentes; no escribe nada si no hubo actividad"""
+        if self.empty:
+            return None
+        stats = list(self.sources.values())
+        run = IngestionRun.objects.create(
+            command=self.command,
+            started_at=self.started_at,
+            finished_at=datetime.now(dt_timezone.utc),
+            requests=sum(s.requests for s in stats),
+            throttled=sum(s.throttled for s in stats),
+            errors=sum(s.errors for s in stats),
+            fetched=self.result.fetched,
+            matched=self.result.matched,
+            inserted=self.result.inserted,
+            skipped=self.result.skipped,
+            duplicates=self.result.duplicates,
+        )
+        SourceFetchMetric.objects.bulk_create([s.to_model(run) for s in stats])
+        return run
+
+
+def _labels(**labels: str) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def _metric(lines: list[str], name: str, kind: str, help_text: str, samples: Iterable[tuple[dict, float]]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(**labels)} {value:g}")
+
+
+def render_prometheus() -> str:
+    """Texto en formato de exposición de Prometheus (version 0.0.4)"""
+    lines: list[str] = []
+
+    runs = IngestionRun.objects.values("command").annotate(total=Count("id"), last=Max("finished_at")).order_by("command")
+    _metric(lines, "social_ingestion_runs_total", "counter", "Ejecuciones de ingesta guardadas.",
+            (({"command": r["command"]}, r["total"]) for r in runs))
+    _metric(lines, "social_ingestion_last_run_timestamp_seconds", "gauge", "Fin de la última ejecución (epoch).",
+            (({"command": r["command"]}, r["last"].timestamp()) for r in runs))
+
+    per_platform = list(
+        SourceFetchMetric.objects.values("platform")
+        .annotate(**{name: Sum(name) for name in _COUNTERS}, latency=Sum("latency_sum")).order_by("platform")
+    )
+    _metric(lines, "social_ingestion_requests_total", "counter", "Peticiones a la API por plataforma.",
+            (({"platform": p["platform"]}, p["requests"]) for p in per_platform))
+    _metric(lines, "social_ingestion_throttled_total", "counter", "Respuestas 429 por plataforma.",
+            (({"platform": p["platform"]}, p["throttled"]) for p in per_platform))
+    _metric(lines, "social_ingestion_request_errors_total", "counter", "Errores de conexión o HTTP (sin contar 429).",
+            (({"platform": p["platform"]}, p["errors"]) for p in per_platform))
+    _metric(lines, "social_ingestion_posts_total", "counter", "Posts por etapa: obtenidos, con categoría, insertados, repetidos y casi duplicados.",
+            (({"platform": p["platform"], "stage": stage}, p[stage])
+             for p in per_platform for stage in ("fetched", "matched", "inserted", "skipped", "duplicates")))
+
+    # Histograma: los tramos se guardan sin acumular y Prometheus los espera acumulados
+    histograms: dict[str, list[int]] = {}
+    for platform, buckets in SourceFetchMetric.objects.values_list("platform", "latency_buckets").iterator(chunk_size=2000):
+        totals = histograms.setdefault(platform, [0] * (len(LATENCY_BUCKETS) + 1))
+        for i, count in enumerate(buckets[:len(totals)]):
+            totals[i] += count
+    name = "social_ingestion_request_latency_seconds"
+    lines.append(f"# HELP {name} Latencia de las peticiones a la API.")
+    lines.append(f"# TYPE {name} histogram")
+    latency_sums = {p["platform"]: p["latency"] or 0.0 for p in per_platform}
+    for platform, totals in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip((*(f"{b:g}" for b in LATENCY_BUCKETS), "+Inf"), totals):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(platform=platform, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(platform=platform)} {latency_sums.get(platform, 0.0):g}")
+        lines.append(f"{name}_count{_labels(platform=platform)} {cumulative}")
+
+    # Cuota vigente según los últimos headers guardados en cada cursor
+    cursors = list(
+        SourceCursor.objects.filter(rate_remaining__isnull=False)
+        .values_list("platform", "source_key", "rate_limit", "rate_remaining", "rate_reset_at")
+        .order_by("platform", "source_key")
+    )
+    _metric(lines, "social_ingestion_rate_limit_limit", "gauge", "Peticiones permitidas por ventana (x-rate-limit-limit).",
+            (({"platform": p, "source": s}, limit) for p, s, limit, _, _ in cursors if limit is not None))
+    _metric(lines, "social_ingestion_rate_limit_remaining", "gauge", "Peticiones restantes en la ventana (x-rate-limit-remaining).",
+            (({"platform": p, "source": s}, remaining) for p, s, _, remaining, _ in cursors))
+    _metric(lines, "social_ingestion_rate_limit_reset_timestamp_seconds", "gauge", "Fin de la ventana de cuota (epoch).",
+            (({"platform": p, "source": s}, reset.timestamp()) for p, s, _, _, reset in cursors if reset))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0003_userinterest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryKeyword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('keyword', models.CharField(help_text="Palabra o frase, ej: 'pan', 'comida rapida'", max_length=100, unique=True)),
+                ('category', models.CharField(choices=[('Comida', 'Comida'), ('Ropa', 'Ropa'), ('Tecnología', 'Tecnología'), ('Libros', 'Libros'), ('Otros', 'Otros')], max_length=50)),
+                ('active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Palabra clave',
+                'verbose_name_plural': 'Palabras clave',
+                'ordering': ['category', 'keyword'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaxonomyVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Versión de taxonomía',
+                'verbose_name_plural': 'Versión de taxonomía',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReclassificationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taxonomy_version', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En curso'), ('done', 'Terminado')], default='pending', max_length=20)),
+                ('last_post_id', models.BigIntegerField(default=0, help_text='Último SocialPost procesado')),
+                ('last_interest_id', models.BigIntegerField(default=0, help_text='Último UserInterest procesado')),
+                ('posts_updated', models.PositiveIntegerField(default=0)),
+                ('interests_updated', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='social_inge_status_750e49_idx')],
+            },
+        ),
+    ]
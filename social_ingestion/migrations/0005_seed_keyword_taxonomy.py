@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from social_ingestion import DEFAULT_KEYWORD_MAP
+
+
+def seed_taxonomy(apps, schema_editor):
+    CategoryKeyword = apps.get_model('social_ingestion', 'CategoryKeyword')
+    TaxonomyVersion = apps.get_model('social_ingestion', 'TaxonomyVersion')
+    CategoryKeyword.objects.bulk_create(
+        [CategoryKeyword(keyword=keyword, category=category) for keyword, category in DEFAULT_KEYWORD_MAP.items()],
+        ignore_conflicts=True,
+    )
+    TaxonomyVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0004_keyword_taxonomy'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_taxonomy, migrations.RunPython.noop),
+    ]
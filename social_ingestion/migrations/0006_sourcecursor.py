@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0005_seed_keyword_taxonomy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20)),
+                ('source_key', models.CharField(help_text="Id de usuario de X o 'bot' para Telegram", max_length=255)),
+                ('since_id', models.CharField(blank=True, help_text='Último id de tweet leído (X)', max_length=64)),
+                ('update_id', models.BigIntegerField(blank=True, help_text='Último update_id procesado (Telegram)', null=True)),
+                ('last_fetch_at', models.DateTimeField(blank=True, null=True)),
+                ('rate_limit', models.PositiveIntegerField(blank=True, null=True)),
+                ('rate_remaining', models.PositiveIntegerField(blank=True, null=True)),
+                ('rate_reset_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('platform', 'source_key'), name='unique_source_cursor')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0006_sourcecursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sourcecursor',
+            name='next_fetch_at',
+            field=models.DateTimeField(blank=True, help_text='Próxima consulta programada por run_ingestion', null=True),
+        ),
+        migrations.AddField(
+            model_name='sourcecursor',
+            name='post_rate',
+            field=models.FloatField(default=0.0, help_text='Promedio móvil de publicaciones nuevas por hora'),
+        ),
+    ]
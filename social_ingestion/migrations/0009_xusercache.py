@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0008_telegramupdate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XUserCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(help_text='En minúsculas, sin @', max_length=255, unique=True)),
+                ('user_id', models.CharField(blank=True, max_length=64)),
+                ('resolved_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0009_xusercache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reclassificationjob',
+            name='since',
+            field=models.DateTimeField(blank=True, help_text='Solo filas publicadas/creadas desde esta fecha', null=True),
+        ),
+    ]
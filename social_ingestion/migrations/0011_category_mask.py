@@ -0,0 +1,49 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Bits vigentes al crear la migración (Product.CATEGORY_CHOICES en orden)
+CATEGORY_BITS = {'Comida': 1, 'Ropa': 2, 'Tecnología': 4, 'Libros': 8, 'Otros': 16}
+
+
+def backfill_masks(apps, schema_editor):
+    for model_name in ('SocialPost', 'UserInterest'):
+        model = apps.get_model('social_ingestion', model_name)
+        batch = []
+        for pk, categories in model.objects.exclude(matched_categories='').values_list('pk', 'matched_categories').iterator(chunk_size=2000):
+            mask = 0
+            for name in categories.split(','):
+                mask |= CATEGORY_BITS.get(name.strip(), 0)
+            if mask:
+                batch.append(model(pk=pk, category_mask=mask))
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, ['category_mask'])
+                batch = []
+        model.objects.bulk_update(batch, ['category_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0010_reclassificationjob_since'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socialpost',
+            name='category_mask',
+            field=models.PositiveIntegerField(db_index=True, default=0, help_text='Categorías como bits (ver categories.py)'),
+        ),
+        migrations.AddField(
+            model_name='userinterest',
+            name='category_mask',
+            field=models.PositiveIntegerField(default=0, help_text='Categorías como bits (ver categories.py)'),
+        ),
+        migrations.AddIndex(
+            model_name='userinterest',
+            index=models.Index(fields=['user', 'category_mask'], name='social_inge_user_id_ab585f_idx'),
+        ),
+        migrations.RunPython(backfill_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0011_category_mask'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('detected_mask', models.PositiveIntegerField(db_index=True, default=0, help_text='Categorías detectadas (bits)')),
+                ('items', models.JSONField(default=list, help_text='Productos serializados en orden de recomendación')),
+                ('dirty', models.BooleanField(db_index=True, default=True)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recommendation', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:47
+
+from django.db import migrations, models
+
+from social_ingestion.dedup import fingerprint_fields
+
+
+def backfill_fingerprints(apps, schema_editor):
+    SocialPost = apps.get_model('social_ingestion', 'SocialPost')
+    fields = list(fingerprint_fields('x'))
+    batch = []
+    for pk, text in SocialPost.objects.values_list('pk', 'text').iterator(chunk_size=2000):
+        values = fingerprint_fields(text)
+        if values['simhash'] is not None:
+            batch.append(SocialPost(pk=pk, **values))
+        if len(batch) >= 2000:
+            SocialPost.objects.bulk_update(batch, fields)
+            batch = []
+    SocialPost.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0013_interestterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socialpost',
+            name='duplicate_count',
+            field=models.PositiveIntegerField(default=0, help_text='Copias casi idénticas colapsadas en este post'),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='simhash_band0',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='simhash_band1',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='simhash_band2',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='simhash_band3',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='socialpost',
+            index=models.Index(fields=['simhash_band0', 'published_at'], name='social_inge_simhash_cf53ea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='socialpost',
+            index=models.Index(fields=['simhash_band1', 'published_at'], name='social_inge_simhash_f11c27_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='socialpost',
+            index=models.Index(fields=['simhash_band2', 'published_at'], name='social_inge_simhash_e6174d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='socialpost',
+            index=models.Index(fields=['simhash_band3', 'published_at'], name='social_inge_simhash_88750c_idx'),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from social_ingestion.payloads import compress_payload
+
+
+def move_payloads(apps, schema_editor):
+    SocialPost = apps.get_model('social_ingestion', 'SocialPost')
+    SocialPostPayload = apps.get_model('social_ingestion', 'SocialPostPayload')
+    batch = []
+    for post_id, payload in SocialPost.objects.exclude(raw_payload=None).values_list('post_id', 'raw_payload').iterator(chunk_size=2000):
+        batch.append(SocialPostPayload(post_id=post_id, data=compress_payload(payload)))
+        if len(batch) >= 2000:
+            SocialPostPayload.objects.bulk_create(batch)
+            batch = []
+    SocialPostPayload.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0014_socialpost_simhash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SocialPostPayload',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payload', serialize=False, to='social_ingestion.socialpost', to_field='post_id')),
+                ('data', models.BinaryField()),
+            ],
+        ),
+        migrations.RunPython(move_payloads, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='socialpost',
+            name='raw_payload',
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:51
+
+from datetime import timezone as dt_timezone
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_months(apps, schema_editor):
+    SocialPost = apps.get_model('social_ingestion', 'SocialPost')
+    SocialPost.objects.update(
+        published_month=ExtractYear('published_at', tzinfo=dt_timezone.utc) * 100
+        + ExtractMonth('published_at', tzinfo=dt_timezone.utc)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0015_socialpostpayload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socialpost',
+            name='published_month',
+            field=models.PositiveIntegerField(default=0, help_text='AAAAMM de published_at (partición mensual)'),
+        ),
+        migrations.AddIndex(
+            model_name='socialpost',
+            index=models.Index(fields=['published_month', 'published_at'], name='social_inge_publish_855cca_idx'),
+        ),
+        migrations.RunPython(backfill_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:53
+
+from django.db import migrations
+
+from social_ingestion.search import install_fts, uninstall_fts
+
+
+def install(apps, schema_editor):
+    install_fts(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0016_socialpost_published_month'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
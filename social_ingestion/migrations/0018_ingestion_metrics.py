@@ -0,0 +1,59 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0017_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('command', models.CharField(max_length=30)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(db_index=True)),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('throttled', models.PositiveIntegerField(default=0, help_text='Respuestas 429')),
+                ('errors', models.PositiveIntegerField(default=0, help_text='Errores de conexión o HTTP distintos de 429')),
+                ('fetched', models.PositiveIntegerField(default=0)),
+                ('matched', models.PositiveIntegerField(default=0)),
+                ('inserted', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('duplicates', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-finished_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SourceFetchMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20)),
+                ('source_key', models.CharField(help_text='Igual que en SourceCursor', max_length=255)),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('throttled', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('latency_sum', models.FloatField(default=0.0, help_text='Segundos sumados de todas las peticiones')),
+                ('latency_buckets', models.JSONField(default=list, help_text='Peticiones por tramo de latencia (límites en metrics.LATENCY_BUCKETS, el último es +Inf)')),
+                ('fetched', models.PositiveIntegerField(default=0)),
+                ('matched', models.PositiveIntegerField(default=0)),
+                ('inserted', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('duplicates', models.PositiveIntegerField(default=0)),
+                ('rate_limit', models.PositiveIntegerField(blank=True, null=True)),
+                ('rate_remaining', models.PositiveIntegerField(blank=True, null=True)),
+                ('rate_reset_at', models.DateTimeField(blank=True, null=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sources', to='social_ingestion.ingestionrun')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['platform', 'source_key'], name='social_inge_platfor_a18ef5_idx')],
+            },
+        ),
+    ]
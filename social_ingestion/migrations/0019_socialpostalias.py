@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0018_ingestion_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SocialPostAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.CharField(max_length=255, unique=True)),
+                ('original', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='social_ingestion.socialpost', to_field='post_id')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0019_socialpostalias'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sourcecursor',
+            name='gap_newest_id',
+            field=models.CharField(blank=True, help_text='Nuevo since_id al completar el hueco', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='sourcecursor',
+            name='gap_until_id',
+            field=models.CharField(blank=True, help_text='Tweet más viejo leído en una consulta cortada por X_MAX_PAGES: falta leer entre since_id y este id', max_length=64),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:26
+
+from django.db import migrations
+
+from social_ingestion.search import install_fts
+
+
+def reinstall_fts(apps, schema_editor):
+    # En SQLite quitar la columna reconstruye la tabla y se pierden los triggers de FTS5
+    install_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0020_sourcecursor_gap'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='socialpost',
+            name='social_inge_publish_855cca_idx',
+        ),
+        migrations.RemoveField(
+            model_name='socialpost',
+            name='published_month',
+        ),
+        migrations.RunPython(reinstall_fts, migrations.RunPython.noop),
+    ]
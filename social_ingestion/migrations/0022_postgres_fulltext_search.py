@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:40
+
+from django.db import migrations
+
+from social_ingestion.search import install_fts, uninstall_fts
+
+
+def install(apps, schema_editor):
+    # En SQLite los índices FTS5 ya los creó 0017; aquí solo falta PostgreSQL
+    if schema_editor.connection.vendor == 'postgresql':
+        install_fts(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        uninstall_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social_ingestion', '0021_drop_published_month'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -1,7 +1,15 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
 
+from products.models import Product
+
+from .categories import categories_to_mask, mask_to_categories
+from .dedup import fingerprint_fields
+from .payloads import compress_payload, decompress_payload
+
 
 class SocialSource(models.Model):
     """Modelo que representa una fuente de redes sociales para monitorear"""
@@ -24,6 +32,13 @@ class SocialSource(models.Model):
         return f"{self.platform}:{self.handle}"
 
 
+class SocialPostQuerySet(models.QuerySet):
+    def recent(self, days: float, now=None):
+        """Posts de los últimos ``days`` días (rango sobre el índice de ``published_at``)"""
+        now = now or timezone.now()
+        return self.filter(published_at__gte=now - timedelta(days=days))
+
+
 class SocialPost(models.Model):
     """Modelo que almacena publicaciones de redes sociales con categorías detectadas"""
     platform = models.CharField(max_length=20)
@@ -31,19 +46,84 @@ class SocialPost(models.Model):
     author = models.CharField(max_length=255)
     text = models.TextField()
     published_at = models.DateTimeField(default=timezone.now)
-    raw_payload = models.JSONField(null=True, blank=True)
     matched_categories = models.CharField(max_length=255, blank=True, help_text="Categorias detectadas")
+    category_mask = models.PositiveIntegerField(default=0, db_index=True, help_text="Categorías como bits (ver categories.py)")
+    # Huella SimHash del texto y sus 4 bandas de 16 bits para buscar casi duplicados (ver dedup.py)
+    simhash = models.BigIntegerField(null=True, blank=True)
+    simhash_band0 = models.PositiveIntegerField(null=True, blank=True)
+    simhash_band1 = models.PositiveIntegerField(null=True, blank=True)
+    simhash_band2 = models.PositiveIntegerField(null=True, blank=True)
+    simhash_band3 = models.PositiveIntegerField(null=True, blank=True)
+    duplicate_count = models.PositiveIntegerField(default=0, help_text="Copias casi idénticas colapsadas en este post")
+
+    objects = SocialPostQuerySet.as_manager()
 
     class Meta:
         ordering = ["-published_at"]
         indexes = [
             models.Index(fields=["platform", "post_id"]),
             models.Index(fields=["published_at"]),
+            models.Index(fields=["simhash_band0", "published_at"]),
+            models.Index(fields=["simhash_band1", "published_at"]),
+            models.Index(fields=["simhash_band2", "published_at"]),
+            models.Index(fields=["simhash_band3", "published_at"]),
         ]
 
     def __str__(self) -> str:
         return f"{self.platform}:{self.post_id}"
 
+    def save(self, *args, **kwargs):
+        self.category_mask = categories_to_mask(self.matched_categories)
+        for name, value in fingerprint_fields(self.text).items():
+            setattr(self, name, value)
+        super().save(*args, **kwargs)
+
+    @property
+    def categories_list(self) -> list[str]:
+        return mask_to_categories(self.category_mask)
+
+    @property
+    def raw_payload(self) -> dict | None:
+        """JSON original (consulta aparte a ``SocialPostPayload``); None si ya se archivó"""
+        try:
+            return self.payload.load()
+        except SocialPostPayload.DoesNotExist:
+            return None
+
+
+class SocialPostPayload(models.Model):
+    """JSON original de un post comprimido con zlib, fuera de la tabla caliente de posts"""
+    post = models.OneToOneField(
+        SocialPost, on_delete=models.CASCADE, to_field="post_id", primary_key=True, related_name="payload",
+    )
+    data = models.BinaryField()
+
+    def __str__(self) -> str:
+        return f"payload {self.post_id} ({len(self.data)} bytes)"
+
+    @classmethod
+    def from_dict(cls, post_id: str, payload: dict) -> "SocialPostPayload":
+        return cls(post_id=post_id, data=compress_payload(payload))
+
+    def load(self) -> dict:
+        return decompress_payload(self.data)
+
+
+class SocialPostAlias(models.Model):
+    """``post_id`` de un casi duplicado colapsado en ``original``.
+
+    Recordarlo hace idempotente la re-ingesta: al volver a leer la misma
+    página el duplicado cuenta como ya guardado y no suma otra vez a
+    ``duplicate_count``.
+    """
+    post_id = models.CharField(max_length=255, unique=True)
+    original = models.ForeignKey(
+        SocialPost, on_delete=models.CASCADE, to_field="post_id", related_name="aliases",
+    )
+
+    def __str__(self) -> str:
+        return f"{self.post_id} -> {self.original_id}"
+
 
 class SocialAccount(models.Model):
     """Modelo que vincula cuentas de usuarios con sus perfiles de redes sociales"""
@@ -67,15 +147,250 @@ class UserInterest(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interests')
     text = models.TextField(help_text="Texto del interés, ej: 'me gustan las manzanas'")
     matched_categories = models.CharField(max_length=255, blank=True, help_text="Categorías detectadas del texto")
+    category_mask = models.PositiveIntegerField(default=0, help_text="Categorías como bits (ver categories.py)")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["user", "category_mask"]),
         ]
 
     def __str__(self) -> str:
         return f"{self.user.username}: {self.text[:50]}..."
 
-# Create your models here.
+    def save(self, *args, **kwargs):
+        self.category_mask = categories_to_mask(self.matched_categories)
+        super().save(*args, **kwargs)
+
+    @property
+    def categories_list(self) -> list[str]:
+        return mask_to_categories(self.category_mask)
+
+class TaxonomyVersion(models.Model):
+    """Versión global de la taxonomía de palabras clave (fila única)"""
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Versión de taxonomía"
+        verbose_name_plural = "Versión de taxonomía"
+
+    def __str__(self) -> str:
+        return f"Taxonomía v{self.version}"
+
+
+class CategoryKeyword(models.Model):
+    """Palabra clave que asigna una categoría de producto a un texto"""
+    keyword = models.CharField(max_length=100, unique=True, help_text="Palabra o frase, ej: 'pan', 'comida rapida'")
+    category = models.CharField(max_length=50, choices=Product.CATEGORY_CHOICES)
+    active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["category", "keyword"]
+        verbose_name = "Palabra clave"
+        verbose_name_plural = "Palabras clave"
+
+    def __str__(self) -> str:
+        return f"{self.keyword} -> {self.category}"
+
+
+class ReclassificationJob(models.Model):
+    """Trabajo de reclasificación por lotes tras un cambio de taxonomía"""
+    STATUS_CHOICES = [
+        ("pending", "Pendiente"),
+        ("running", "En curso"),
+        ("done", "Terminado"),
+    ]
+
+    taxonomy_version = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    last_post_id = models.BigIntegerField(default=0, help_text="Último SocialPost procesado")
+    last_interest_id = models.BigIntegerField(default=0, help_text="Último UserInterest procesado")
+    posts_updated = models.PositiveIntegerField(default=0)
+    interests_updated = models.PositiveIntegerField(default=0)
+    since = models.DateTimeField(null=True, blank=True, help_text="Solo filas publicadas/creadas desde esta fecha")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Reclasificación v{self.taxonomy_version} ({self.status})"
+
+
+class SourceCursor(models.Model):
+    """Estado persistente de cada fuente: hasta dónde se leyó y cuánta cuota queda"""
+    platform = models.CharField(max_length=20)
+    source_key = models.CharField(max_length=255, help_text="Id de usuario de X o 'bot' para Telegram")
+    since_id = models.CharField(max_length=64, blank=True, help_text="Último id de tweet leído (X)")
+    gap_until_id = models.CharField(
+        max_length=64, blank=True,
+        help_text="Tweet más viejo leído en una consulta cortada por X_MAX_PAGES: falta leer entre since_id y este id",
+    )
+    gap_newest_id = models.CharField(max_length=64, blank=True, help_text="Nuevo since_id al completar el hueco")
+    update_id = models.BigIntegerField(null=True, blank=True, help_text="Último update_id procesado (Telegram)")
+    last_fetch_at = models.DateTimeField(null=True, blank=True)
+    rate_limit = models.PositiveIntegerField(null=True, blank=True)
+    rate_remaining = models.PositiveIntegerField(null=True, blank=True)
+    rate_reset_at = models.DateTimeField(null=True, blank=True)
+    post_rate = models.FloatField(default=0.0, help_text="Promedio móvil de publicaciones nuevas por hora")
+    next_fetch_at = models.DateTimeField(null=True, blank=True, help_text="Próxima consulta programada por run_ingestion")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["platform", "source_key"], name="unique_source_cursor"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.platform}:{self.source_key}"
+
+    def is_due(self, now, min_interval) -> bool:
+        """Indica si vale la pena consultar la fuente otra vez"""
+        if self.rate_reset_at and self.rate_remaining == 0 and now < self.rate_reset_at:
+            return False
+        return not self.last_fetch_at or now - self.last_fetch_at >= min_interval
+
+    def record_rate_limit(self, headers) -> None:
+        from .ratelimit import parse_rate_limit_headers
+
+        limit, remaining, reset = parse_rate_limit_headers(headers or {})
+        if limit is not None:
+            self.rate_limit = limit
+        if remaining is not None:
+            self.rate_remaining = remaining
+        if reset is not None:
+            self.rate_reset_at = datetime.fromtimestamp(reset, tz=dt_timezone.utc)
+
+    def advance_timeline(self, post_ids, complete: bool = True) -> None:
+        """Avanza since_id con los ids recibidos (el timeline llega del más nuevo al más viejo).
+
+        Si la consulta quedó cortada (``complete`` False) since_id no se mueve:
+        se guarda el hueco hasta el id más viejo leído para pedirlo con
+        ``until_id`` en la próxima consulta, y al completarlo since_id salta al
+        mayor id visto.
+        """
+        numeric = [int(pid) for pid in post_ids if str(pid).isdigit()]
+        seen = numeric + [int(v) for v in (self.since_id, self.gap_newest_id) if v.isdigit()]
+        if complete:
+            if seen:
+                self.since_id = str(max(seen))
+            self.gap_until_id = self.gap_newest_id = ""
+        elif numeric:
+            self.gap_newest_id = str(max(seen))
+            self.gap_until_id = str(min(numeric))
+
+
+class TelegramUpdate(models.Model):
+    """Cola de updates de Telegram recibidos por webhook o long polling, pendientes de clasificar"""
+    update_id = models.BigIntegerField(unique=True)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        ordering = ["update_id"]
+
+    def __str__(self) -> str:
+        return f"telegram update {self.update_id}"
+
+
+class XUserCache(models.Model):
+    """Username de X -> id numérico, resuelto por lotes; ``user_id`` vacío si la cuenta no existe"""
+    username = models.CharField(max_length=255, unique=True, help_text="En minúsculas, sin @")
+    user_id = models.CharField(max_length=64, blank=True)
+    resolved_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"@{self.username} -> {self.user_id or '?'}"
+
+
+class UserRecommendation(models.Model):
+    """Lista de productos recomendados ya calculada para un usuario"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='recommendation')
+    detected_mask = models.PositiveIntegerField(default=0, db_index=True, help_text="Categorías detectadas (bits)")
+    items = models.JSONField(default=list, help_text="Productos serializados en orden de recomendación")
+    dirty = models.BooleanField(default=True, db_index=True)
+    computed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"Recomendaciones de {self.user.username}"
+
+    @property
+    def detected_categories(self) -> list[str]:
+        return mask_to_categories(self.detected_mask)
+
+
+class InterestTerm(models.Model):
+    """Índice invertido término -> usuario ("cat:Comida", "kw:pan") de intereses y posts vinculados"""
+    term = models.CharField(max_length=150)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interest_terms')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["term", "user"], name="interest_term_user_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.term} -> {self.user_id}"
+
+
+class IngestionRun(models.Model):
+    """Una ejecución de fetch_social o un ciclo de run_ingestion, con sus totales"""
+    command = models.CharField(max_length=30)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(db_index=True)
+    requests = models.PositiveIntegerField(default=0)
+    throttled = models.PositiveIntegerField(default=0, help_text="Respuestas 429")
+    errors = models.PositiveIntegerField(default=0, help_text="Errores de conexión o HTTP distintos de 429")
+    fetched = models.PositiveIntegerField(default=0)
+    matched = models.PositiveIntegerField(default=0)
+    inserted = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    duplicates = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-finished_at"]
+
+    def __str__(self) -> str:
+        return f"{self.command} {self.finished_at:%Y-%m-%d %H:%M}"
+
+    @property
+    def duration(self) -> timedelta:
+        return self.finished_at - self.started_at
+
+
+class SourceFetchMetric(models.Model):
+    """Peticiones, latencias, cuota y posts de una fuente dentro de una ejecución"""
+    run = models.ForeignKey(IngestionRun, on_delete=models.CASCADE, related_name="sources")
+    platform = models.CharField(max_length=20)
+    source_key = models.CharField(max_length=255, help_text="Igual que en SourceCursor")
+    requests = models.PositiveIntegerField(default=0)
+    throttled = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    latency_sum = models.FloatField(default=0.0, help_text="Segundos sumados de todas las peticiones")
+    latency_buckets = models.JSONField(
+        default=list, help_text="Peticiones por tramo de latencia (límites en metrics.LATENCY_BUCKETS, el último es +Inf)"
+    )
+    fetched = models.PositiveIntegerField(default=0)
+    matched = models.PositiveIntegerField(default=0)
+    inserted = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    duplicates = models.PositiveIntegerField(default=0)
+    rate_limit = models.PositiveIntegerField(null=True, blank=True)
+    rate_remaining = models.PositiveIntegerField(null=True, blank=True)
+    rate_reset_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["platform", "source_key"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.platform}:{self.source_key} ({self.requests} peticiones)"
@@ -0,0 +1,24 @@
+"""Meses calendario (AAAAMM, en UTC) para la retención de ``SocialPost``.
+
+La retención (``prune_social_posts``) conserva los últimos meses completos:
+todo lo publicado antes del inicio del mes más viejo que se conserva se
+borra por rango de ``published_at``, con el índice de esa columna.
+"""
+from datetime import date, datetime, timezone as dt_timezone
+
+
+def month_key(value: datetime | date) -> int:
+    """AAAAMM del instante (en UTC si trae zona horaria)"""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(dt_timezone.utc)
+    return value.year * 100 + value.month
+
+
+def shift_month(key: int, months: int) -> int:
+    index = (key // 100) * 12 + (key % 100 - 1) + months
+    return (index // 12) * 100 + index % 12 + 1
+
+
+def month_start(key: int) -> datetime:
+    """Primer instante (UTC) del mes AAAAMM"""
+    return datetime(key // 100, key % 100, 1, tzinfo=dt_timezone.utc)
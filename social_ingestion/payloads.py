@@ -0,0 +1,119 @@
+"""Almacenamiento comprimido y archivo de los payloads originales de los posts.
+
+El JSON que devuelve cada API se guarda comprimido con zlib en
+``SocialPostPayload``, una tabla aparte que solo se lee al pedir
+``SocialPost.raw_payload``; listar posts no lo trae. ``archive_payloads``
+mueve los payloads viejos a archivos JSONL gzip particionados por día de
+publicación bajo ``SOCIAL_ARCHIVE_DIR`` (``AAAA/MM/DD.jsonl.gz``) y
+``iter_archived_payloads`` los relee en streaming, partición por partición.
+"""
+import gzip
+import json
+import os
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from django.conf import settings
+
+COMPRESSION_LEVEL = 6
+
+
+def compress_payload(payload: dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_payload(data: bytes | memoryview) -> dict[str, Any]:
+    return json.loads(zlib.decompress(bytes(data)).decode("utf-8"))
+
+
+def archive_root(root: str | os.PathLike | None = None) -> Path:
+    return Path(root or getattr(settings, "SOCIAL_ARCHIVE_DIR", Path(settings.BASE_DIR) / "archive" / "social"))
+
+
+def partition_day(published_at: datetime) -> date:
+    """Día (UTC) de la partición donde se archiva un post"""
+    return published_at.astimezone(dt_timezone.utc).date()
+
+
+def partition_path(day: date, root: str | os.PathLike | None = None) -> Path:
+    return archive_root(root) / f"{day:%Y}" / f"{day:%m}" / f"{day:%d}.jsonl.gz"
+
+
+def append_partition(day: date, records: list[dict[str, Any]], root: str | os.PathLike | None = None) -> Path:
+    """Agrega registros a la partición del día como un miembro gzip nuevo y sincroniza a disco"""
+    path = partition_path(day, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for record in records:
+                gz.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    return path
+
+
+def _partition_day(path: Path) -> date | None:
+    try:
+        return date(int(path.parent.parent.name), int(path.parent.name), int(path.name.split(".")[0]))
+    except ValueError:
+        return None
+
+
+def iter_archived_payloads(start: date | None = None, end: date | None = None,
+                           root: str | os.PathLike | None = None) -> Iterator[dict[str, Any]]:
+    """Registros archivados ({platform, post_id, published_at, payload}) de start a end inclusive.
+
+    Solo abre las particiones del rango y lee línea a línea: la memoria no
+    depende del tamaño del archivo.
+    """
+    base = archive_root(root)
+    if not base.exists():
+        return
+    days = sorted(
+        (day, path) for path in base.glob("*/*/*.jsonl.gz")
+        if (day := _partition_day(path)) is not None
+        and (start is None or day >= start) and (end is None or day <= end)
+    )
+    for _, path in days:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def find_archived_payload(post_id: str, published_at: datetime,
+                          root: str | os.PathLike | None = None) -> dict[str, Any] | None:
+    """Payload de un post ya archivado (lee solo la partición de su día)"""
+    day = partition_day(published_at)
+    for record in iter_archived_payloads(day, day, root):
+        if record.get("post_id") == post_id:
+            return record.get("payload")
+    return None
+
+
+def archive_payload_rows(payloads, root: str | os.PathLike | None = None, batch_size: int = 1000) -> tuple[int, set[Path]]:
+    """Archiva y borra por lotes los ``SocialPostPayload`` del queryset; retorna (cantidad, particiones)"""
+    archived, partitions = 0, set()
+    while True:
+        rows = list(
+            payloads.order_by("post__published_at")
+            .values_list("post_id", "post__platform", "post__published_at", "data")[:batch_size]
+        )
+        if not rows:
+            return archived, partitions
+        by_day = defaultdict(list)
+        for post_id, platform, published_at, data in rows:
+            by_day[partition_day(published_at)].append({
+                "platform": platform,
+                "post_id": post_id,
+                "published_at": published_at.isoformat(),
+                "payload": decompress_payload(data),
+            })
+        # Borrar de la BD solo después de que el archivo quedó en disco
+        for day, records in by_day.items():
+            partitions.add(append_partition(day, records, root))
+        payloads.model.objects.filter(post_id__in=[row[0] for row in rows]).delete()
+        archived += len(rows)
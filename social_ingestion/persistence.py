@@ -0,0 +1,190 @@
+"""Etapa de persistencia por lotes para publicaciones obtenidas de redes sociales.
+
+Clasifica un lote completo con el mismo autómata, consulta con un único
+``IN`` qué ``post_id`` ya existen e inserta los nuevos con ``bulk_create``
+dentro de una transacción. El costo crece con el número de lotes y no con
+el número de publicaciones. Antes de insertar, los casi duplicados (SimHash,
+ver ``dedup``) de posts recientes o del mismo lote se colapsan en el
+original, que solo incrementa ``duplicate_count``; su ``post_id`` queda en
+``SocialPostAlias`` para reconocerlo como existente si vuelve a llegar.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Iterable
+
+from django.db import transaction
+from django.db.models import F
+
+from social_ingestion import classify_many
+from . import dedup
+from .categories import categories_to_mask
+from .models import SocialPost, SocialPostAlias, SocialPostPayload
+from .interest_index import index_posts
+from .recommender import mark_dirty
+
+# Tamaño de los IN y de los INSERT (por debajo del límite de variables de SQLite)
+BATCH_SIZE = 500
+
+
+@dataclass
+class PersistResult:
+    fetched: int = 0
+    matched: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+
+    def __iadd__(self, other: "PersistResult") -> "PersistResult":
+        self.fetched += other.fetched
+        self.matched += other.matched
+        self.inserted += other.inserted
+        self.skipped += other.skipped
+        self.duplicates += other.duplicates
+        return self
+
+
+def classify_posts(posts: list[dict[str, Any]], save_all: bool = False) -> list[tuple[dict[str, Any], list[str]]]:
+    """Empareja cada post con sus categorías y descarta los que no coinciden"""
+    results = classify_many(post.get("text", "") for post in posts)
+    return [
+        (post, categories)
+        for post, categories in zip(posts, results)
+        if categories or save_all
+    ]
+
+
+def _payload(post: dict[str, Any]) -> dict[str, Any]:
+    payload = dict(post)
+    if isinstance(payload.get("published_at"), datetime):
+        payload["published_at"] = payload["published_at"].isoformat()
+    return payload
+
+
+def collapse_duplicates(posts: list[SocialPost]) -> tuple[list[SocialPost], dict[str, str]]:
+    """Retorna (posts a insertar, {post_id colapsado: post_id original}).
+
+    Los casi duplicados suman a ``duplicate_count`` del original. Solo se
+    comparan posts del mismo autor: el mismo texto de dos cuentas distintas
+    son dos publicaciones.
+
+    Los candidatos de la BD salen de igualdades por banda dentro de la ventana
+    reciente (una consulta por grupo de posts); la distancia exacta se
+    compara en memoria.
+    """
+    for post in posts:
+        for name, value in dedup.fingerprint_fields(post.text).items():
+            setattr(post, name, value)
+    fingerprinted = [p for p in posts if p.simhash is not None]
+    if not fingerprinted:
+        return posts, {}
+
+    # Buckets por (autor, banda, valor) -> [(clave, huella)]; la clave es (id, post_id) en BD o el post del lote
+    buckets: dict[tuple[str, int, int], list[tuple[Any, int]]] = {}
+    recent = SocialPost.objects.recent(dedup.window_days())
+    step = BATCH_SIZE // dedup.BANDS
+    for start in range(0, len(fingerprinted), step):
+        chunk = fingerprinted[start:start + step]
+        for row in (
+            recent.filter(dedup.band_query(p.simhash for p in chunk))
+            .order_by().values_list("id", "post_id", "author", "simhash", *dedup.BAND_FIELDS)
+        ):
+            author = row[2].lower()
+            for i, band in enumerate(row[4:]):
+                buckets.setdefault((author, i, band), []).append(((row[0], row[1]), row[3]))
+
+    kept: list[SocialPost] = []
+    aliases: dict[str, str] = {}
+    collapsed: Counter = Counter()
+    for post in posts:
+        if post.simhash is None:
+            kept.append(post)
+            continue
+        author = post.author.lower()
+        post_bands = [(author, i, getattr(post, name)) for i, name in enumerate(dedup.BAND_FIELDS)]
+        candidates = [c for key in post_bands for c in buckets.get(key, [])]
+        original = dedup.nearest(post.simhash, candidates)
+        if original is None:
+            kept.append(post)
+            for key in post_bands:
+                buckets.setdefault(key, []).append((post, post.simhash))
+        elif isinstance(original, SocialPost):
+            original.duplicate_count += 1
+            aliases[post.post_id] = original.post_id
+        else:
+            collapsed[original[0]] += 1
+            aliases[post.post_id] = original[1]
+
+    # Un UPDATE por cada cantidad distinta de copias (normalmente 1)
+    by_count: dict[int, list[int]] = {}
+    for post_id, count in collapsed.items():
+        by_count.setdefault(count, []).append(post_id)
+    for count, ids in by_count.items():
+        SocialPost.objects.filter(id__in=ids).update(duplicate_count=F("duplicate_count") + count)
+    return kept, aliases
+
+
+def persist_posts(
+    platform: str,
+    classified: Iterable[tuple[dict[str, Any], list[str]]],
+    author: str | None = None,
+    default_author: str = "unknown",
+) -> PersistResult:
+    """Inserta en bloque los posts nuevos y omite los que ya existen.
+
+    ``author`` fuerza el autor de todos los posts; si no se indica se usa el
+    del post o ``default_author``.
+    """
+    result = PersistResult()
+    pending: dict[str, SocialPost] = {}
+    payloads: dict[str, dict[str, Any]] = {}
+    for post, categories in classified:
+        post_id = str(post["id"])
+        if post_id in pending:
+            result.skipped += 1
+            continue
+        pending[post_id] = SocialPost(
+            platform=platform,
+            post_id=post_id,
+            author=author or post.get("author") or default_author,
+            text=post.get("text", ""),
+            published_at=post.get("published_at") or datetime.now(dt_timezone.utc),
+            matched_categories=",".join(categories),
+            category_mask=categories_to_mask(categories),
+        )
+        payloads[post_id] = _payload(post)
+    if not pending:
+        return result
+
+    with transaction.atomic():
+        ids = list(pending)
+        existing: set[str] = set()
+        for start in range(0, len(ids), BATCH_SIZE):
+            chunk = ids[start:start + BATCH_SIZE]
+            # Un solo query: posts guardados y duplicados ya colapsados antes
+            existing.update(
+                SocialPost.objects.filter(post_id__in=chunk).order_by().values_list("post_id", flat=True)
+                .union(SocialPostAlias.objects.filter(post_id__in=chunk).order_by().values_list("post_id", flat=True))
+            )
+        new_posts = [obj for post_id, obj in pending.items() if post_id not in existing]
+        to_create, aliases = collapse_duplicates(new_posts)
+        SocialPost.objects.bulk_create(to_create, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        if aliases:
+            SocialPostAlias.objects.bulk_create(
+                [SocialPostAlias(post_id=alias, original_id=original) for alias, original in aliases.items()],
+                batch_size=BATCH_SIZE, ignore_conflicts=True,
+            )
+        # El JSON original va comprimido a la tabla aparte; el de los duplicados colapsados se descarta
+        SocialPostPayload.objects.bulk_create(
+            [SocialPostPayload.from_dict(obj.post_id, payloads[obj.post_id]) for obj in to_create],
+            batch_size=BATCH_SIZE, ignore_conflicts=True,
+        )
+
+    # bulk_create no dispara post_save: indexar y marcar aquí las listas de los autores vinculados
+    user_ids = index_posts(to_create)
+    if user_ids:
+        mark_dirty(user_ids)
+    result.inserted += len(to_create)
+    result.skipped += len(existing)
+    result.duplicates += len(new_posts) - len(to_create)
+    return result
@@ -0,0 +1,106 @@
+"""Token bucket compartido para las peticiones a la API de X.
+
+X limita por ventanas fijas (normalmente 15 minutos) e informa el estado en
+los headers ``x-rate-limit-limit``, ``x-rate-limit-remaining`` y
+``x-rate-limit-reset``. El bucket arranca permitiendo ``capacity`` peticiones
+y, en cuanto llega una respuesta, toma los headers como la verdad: quedan
+``remaining`` fichas (menos las peticiones en vuelo) hasta ``reset``, cuando
+se recarga por completo. Si no hay fichas, ``acquire`` no duerme: devuelve
+cuántos segundos faltan para que el llamador reprograme la tarea.
+"""
+import threading
+import time
+from typing import Callable, Mapping
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> tuple[int | None, int | None, float | None]:
+    """Retorna (limit, remaining, reset_epoch) leyendo los headers de X"""
+    def _int(name):
+        value = headers.get(name)
+        try:
+            return int(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    reset = _int("x-rate-limit-reset")
+    return _int("x-rate-limit-limit"), _int("x-rate-limit-remaining"), float(reset) if reset is not None else None
+
+
+class TokenBucket:
+    def __init__(self, capacity: int, clock: Callable[[], float] = time.time):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.reset_at: float | None = None
+        self.in_flight = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.reset_at is not None and now >= self.reset_at:
+            self.tokens = float(self.capacity)
+            self.reset_at = None
+
+    def acquire(self) -> float:
+        """Toma una ficha. Retorna 0 si se pudo o los segundos a esperar si no"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.in_flight += 1
+                return 0.0
+            if self.reset_at is None:
+                # Sin información del servidor: esperar a que termine alguna petición
+                return 1.0
+            return max(self.reset_at - now, 0.0)
+
+    def release(self, headers: Mapping[str, str] | None = None, throttled: bool = False) -> None:
+        """Marca el fin de una petición y sincroniza con los headers de la respuesta"""
+        with self._lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+            limit, remaining, reset = parse_rate_limit_headers(headers or {})
+            if throttled:
+                remaining = 0
+                if reset is None:
+                    reset = self._clock() + 60
+            if remaining is None and reset is None and self.reset_at is None:
+                # Sin headers: el bucket actúa como semáforo de concurrencia
+                self.tokens = min(self.tokens + 1, float(self.capacity))
+            self._sync(limit, remaining, reset)
+
+    def sync(self, limit: int | None, remaining: int | None, reset: float | None) -> None:
+        """Fija el estado conocido de la ventana (p. ej. guardado de una ejecución anterior)"""
+        with self._lock:
+            self._sync(limit, remaining, reset)
+
+    def _sync(self, limit, remaining, reset) -> None:
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            self.tokens = float(max(remaining - self.in_flight, 0))
+        if reset is not None:
+            self.reset_at = reset
+
+    def wait_time(self) -> float:
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if self.tokens >= 1:
+                return 0.0
+            return max(self.reset_at - now, 0.0) if self.reset_at is not None else 1.0
+
+
+class RateLimiter:
+    """Colección de buckets por endpoint"""
+
+    def __init__(self, capacity: int, clock: Callable[[], float] = time.time):
+        self.capacity = capacity
+        self._clock = clock
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key: str) -> TokenBucket:
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.capacity, clock=self._clock)
+            return self._buckets[key]
@@ -0,0 +1,108 @@
+"""Listas de recomendación precalculadas por usuario.
+
+``UserRecommendation`` guarda, para cada usuario, las categorías detectadas y
+los productos recomendados ya serializados, así que la vista los sirve con
+una sola lectura por clave. La fila se marca ``dirty`` cuando el usuario
+recibe un ``SocialPost`` o ``UserInterest`` nuevo, o cuando cambia un
+producto de alguna de sus categorías, y se recalcula en la siguiente lectura
+(o antes, con ``refresh_recommendations``). El orden de la lista sale de
+``scoring``: afinidad con decaimiento temporal, vecinos de los favoritos
+del usuario (``ProductNeighbor``), popularidad y frescura.
+"""
+from typing import Iterable
+
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from products.models import Product, ProductNeighbor
+
+from . import scoring
+from .categories import CATEGORY_BITS, categories_to_mask, masks_with_any
+from .models import SocialAccount, UserRecommendation
+
+MAX_ITEMS = 48
+
+
+def serialize_product(product: Product) -> dict:
+    return {
+        'id': product.id,
+        'name': product.name,
+        'category': product.category,
+        'category_display': product.get_category_display(),
+        'price': float(product.price),
+        'image_url': product.image.url if product.image else None,
+    }
+
+
+def collaborative_scores(user) -> dict[int, float]:
+    """Suma de similitudes de los vecinos de los favoritos del usuario, normalizada a [0, 1]"""
+    scores: dict[int, float] = {}
+    for neighbor_id, score in (
+        ProductNeighbor.objects.filter(product__favorited_by__user=user)
+        .exclude(neighbor__favorited_by__user=user).values_list('neighbor_id', 'score')
+    ):
+        scores[neighbor_id] = scores.get(neighbor_id, 0.0) + score
+    top = max(scores.values(), default=0.0)
+    return {pk: value / top for pk, value in scores.items()} if top else {}
+
+
+def compute_for_user(user) -> UserRecommendation:
+    """Recalcula y guarda la lista del usuario ordenada por puntaje"""
+    index = scoring.get_product_index()
+    now = timezone.now()
+    affinity = scoring.user_affinity(user, index, now)
+    ranked = [product_id for product_id, _ in scoring.rank_products(
+        affinity, index, MAX_ITEMS, now, boost=collaborative_scores(user),
+    )]
+    # El índice de otro proceso puede estar desfasado: solo se sirven productos disponibles
+    found = Product.objects.filter(available=True).in_bulk(ranked)
+    products = [found[pk] for pk in ranked if pk in found]
+    recommendation, _ = UserRecommendation.objects.update_or_create(
+        user=user,
+        defaults={
+            'detected_mask': categories_to_mask(scoring.affinity_categories(affinity, index)),
+            'items': [serialize_product(p) for p in products],
+            'dirty': False,
+            'computed_at': now,
+        },
+    )
+    return recommendation
+
+
+def get_recommendations(user) -> UserRecommendation:
+    """Una lectura por clave; solo recalcula si la lista no existe o está marcada"""
+    recommendation = UserRecommendation.objects.filter(user=user).first()
+    if recommendation is None or recommendation.dirty:
+        recommendation = compute_for_user(user)
+    return recommendation
+
+
+def mark_dirty(user_ids) -> int:
+    """Acepta una lista de ids o un queryset de ``values_list('user_id')`` (un solo UPDATE con subconsulta)"""
+    return UserRecommendation.objects.filter(user_id__in=user_ids, dirty=False).update(dirty=True)
+
+
+def mark_dirty_for_authors(authors: Iterable[str]) -> int:
+    """Marca a los usuarios cuyas cuentas vinculadas publicaron estos posts"""
+    names = {a.lower() for a in authors if a}
+    if not names:
+        return 0
+    user_ids = (
+        SocialAccount.objects.annotate(username_lower=Lower('username'))
+        .filter(username_lower__in=names).values_list('user_id', flat=True)
+    )
+    return mark_dirty(user_ids)
+
+
+def mark_dirty_for_categories(categories: Iterable[str | None]) -> int:
+    """Marca a los usuarios con alguna de estas categorías detectadas (búsqueda indexada por máscara)"""
+    bits = 0
+    for category in categories:
+        bits |= CATEGORY_BITS.get(category or '', 0)
+    if not bits:
+        return 0
+    return UserRecommendation.objects.filter(detected_mask__in=masks_with_any(bits), dirty=False).update(dirty=True)
+
+
+def mark_all_dirty() -> int:
+    return UserRecommendation.objects.filter(dirty=False).update(dirty=True)
@@ -0,0 +1,290 @@
+"""Grabación y reproducción offline de las APIs de X y Telegram.
+
+Con ``SOCIAL_API_CASSETTE`` apuntando a un archivo, ``XClient`` y las
+llamadas de ``telegram`` agregan cada intercambio real a ese cassette
+(JSONL: una petición y su respuesta por línea). El token del bot y el
+header Authorization no se guardan.
+
+``StubAPIServer`` es un servidor HTTP local que habla el mismo dialecto.
+Primero reproduce los cassettes cargados, buscando coincidencia exacta de
+método, ruta y query, o si no solo de método y ruta, y rotando entre las
+grabaciones. Si no hay grabación, genera timelines de X y updates de
+Telegram sintéticos al volumen configurado, con headers de rate limit,
+ventanas que se agotan y 429 aleatorios. Para usarlo se apuntan
+``X_API_BASE_URL`` y ``TELEGRAM_API_BASE_URL`` al servidor (ver el comando
+``stub_social_api``).
+"""
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterable
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from django.conf import settings
+
+_BOT_PATH_RE = re.compile(r"/bot[^/]+/")
+_TIMELINE_RE = re.compile(r"^/2/users/([^/]+)/tweets$")
+_USER_BY_NAME_RE = re.compile(r"^/2/users/by/username/([^/]+)$")
+_BOT_METHOD_RE = re.compile(r"^/bot[^/]+/(\w+)$")
+# Headers de respuesta que vale la pena conservar en un cassette
+_KEPT_HEADERS = {"content-type", "retry-after"}
+
+_recorders: dict[str, "CassetteRecorder"] = {}
+_recorders_lock = threading.Lock()
+
+
+def redact_path(path: str) -> str:
+    return _BOT_PATH_RE.sub("/bot{TOKEN}/", path)
+
+
+class CassetteRecorder:
+    """Hook de respuesta de ``requests`` que agrega cada intercambio al cassette"""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def record(self, response: requests.Response, *args, **kwargs) -> requests.Response:
+        url = urlsplit(response.request.url)
+        try:
+            body: Any = response.json()
+        except ValueError:
+            body = response.text
+        entry = {
+            "request": {
+                "method": response.request.method,
+                "path": redact_path(url.path),
+                "query": dict(parse_qsl(url.query)),
+            },
+            "response": {
+                "status": response.status_code,
+                "headers": {
+                    k: v for k, v in response.headers.items()
+                    if k.lower() in _KEPT_HEADERS or k.lower().startswith("x-rate-limit")
+                },
+                "body": body,
+            },
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+        return response
+
+
+def attach_recorder(session: requests.Session) -> requests.Session:
+    """Si ``SOCIAL_API_CASSETTE`` está definido, graba las respuestas de la sesión"""
+    path = getattr(settings, "SOCIAL_API_CASSETTE", "")
+    if path:
+        with _recorders_lock:
+            recorder = _recorders.setdefault(path, CassetteRecorder(path))
+        session.hooks["response"].append(recorder.record)
+    return session
+
+
+def load_cassette(path: str | Path) -> list[dict[str, Any]]:
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+@dataclass
+class SyntheticConfig:
+    """Volumen y comportamiento de las respuestas generadas"""
+    tweets_per_page: int = 10
+    pages: int = 3
+    # Tweets nuevos por minuto y cuenta, a partir del arranque del servidor
+    tweets_per_minute: float = 0.0
+    # Peticiones por ventana y endpoint antes de responder 429
+    rate_limit: int = 900
+    window: int = 900
+    # Fracción de respuestas 429 aleatorias (además de las de ventana agotada)
+    error_rate: float = 0.0
+    updates_per_poll: int = 5
+    telegram_chat_id: str = "-1001"
+    seed: int = 0
+
+
+_VERBS = ("vendo", "ofrezco", "busco", "necesito", "regalo", "cambio", "quiero", "promo")
+_ITEMS = ("pan", "galletas", "camisa", "zapatos", "celular", "laptop", "libro", "novela", "café", "audífonos", "mesa")
+_EXTRAS = ("nuevo", "usado", "barato", "original", "en el centro", "a domicilio", "hoy", "con garantía",
+           "para regalo", "talla m", "edición especial", "sin uso", "oferta", "al por mayor")
+_ID_BASE = 10 ** 15
+
+
+def synthetic_user_id(username: str) -> str:
+    return str(10 ** 9 + zlib.crc32(username.lower().encode()) % 10 ** 9)
+
+
+class StubAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], cassettes: Iterable[dict[str, Any]] = (),
+                 config: SyntheticConfig | None = None):
+        super().__init__(address, StubAPIHandler)
+        self.config = config or SyntheticConfig()
+        self.random = random.Random(self.config.seed)
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.windows: dict[str, tuple[float, int]] = {}
+        self.requests_served = 0
+        self.exact: dict[tuple, deque] = {}
+        self.by_path: dict[tuple, deque] = {}
+        for entry in cassettes:
+            request = entry["request"]
+            query = tuple(sorted((request.get("query") or {}).items()))
+            self.exact.setdefault((request["method"], request["path"], query), deque()).append(entry["response"])
+            self.by_path.setdefault((request["method"], request["path"]), deque()).append(entry["response"])
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def respond(self, method: str, path: str, query: dict[str, str]) -> tuple[int, dict[str, str], Any]:
+        with self.lock:
+            self.requests_served += 1
+            path = redact_path(path)
+            recorded = (
+                self.exact.get((method, path, tuple(sorted(query.items()))))
+                or self.by_path.get((method, path))
+            )
+            if recorded:
+                response = recorded[0]
+                recorded.rotate(-1)
+                return response["status"], dict(response.get("headers") or {}), response.get("body")
+            return self._synthetic(method, path, query)
+
+    # --- respuestas sintéticas ---
+
+    def _rate_headers(self, endpoint: str) -> tuple[bool, dict[str, str]]:
+        """Consume una petición de la ventana del endpoint; retorna (permitida, headers)"""
+        now = time.time()
+        start, used = self.windows.get(endpoint, (now, 0))
+        if now - start >= self.config.window:
+            start, used = now, 0
+        allowed = used < self.config.rate_limit and self.random.random() >= self.config.error_rate
+        if used < self.config.rate_limit:
+            used += 1
+        self.windows[endpoint] = (start, used)
+        return allowed, {
+            "x-rate-limit-limit": str(self.config.rate_limit),
+            "x-rate-limit-remaining": str(self.config.rate_limit - used),
+            "x-rate-limit-reset": str(int(start + self.config.window)),
+        }
+
+    def _synthetic(self, method: str, path: str, query: dict[str, str]) -> tuple[int, dict[str, str], Any]:
+        if match := _TIMELINE_RE.match(path):
+            allowed, headers = self._rate_headers("users/:id/tweets")
+            if not allowed:
+                return 429, headers, {"title": "Too Many Requests", "status": 429}
+            return 200, headers, self._timeline(match.group(1), query)
+        if path == "/2/users/by":
+            _, headers = self._rate_headers("users/by")
+            names = [n for n in query.get("usernames", "").split(",") if n]
+            return 200, headers, {"data": [{"id": synthetic_user_id(n), "username": n} for n in names]}
+        if match := _USER_BY_NAME_RE.match(path):
+            _, headers = self._rate_headers("users/by/username")
+            name = match.group(1)
+            return 200, headers, {"data": {"id": synthetic_user_id(name), "username": name}}
+        if match := _BOT_METHOD_RE.match(path):
+            return self._telegram(match.group(1), query)
+        return 404, {}, {"title": "Not Found", "status": 404}
+
+    def _tweet_text(self, tweet_id: int) -> str:
+        rng = random.Random(tweet_id)
+        return " ".join([rng.choice(_VERBS), rng.choice(_ITEMS), *rng.sample(_EXTRAS, 3), f"#{tweet_id % 100000}"])
+
+    def _timeline(self, user_id: str, query: dict[str, str]) -> dict[str, Any]:
+        config = self.config
+        per_page = min(int(query.get("max_results") or config.tweets_per_page), config.tweets_per_page)
+        elapsed_minutes = (time.time() - self.started) / 60
+        base = _ID_BASE + (zlib.crc32(user_id.encode()) % 1000) * 10 ** 9
+        newest = base + config.tweets_per_page * config.pages + int(elapsed_minutes * config.tweets_per_minute)
+        oldest = base + 1
+        since_id = int(query.get("since_id") or 0)
+        if query.get("until_id"):
+            newest = min(newest, int(query["until_id"]) - 1)
+        page = int(query.get("pagination_token", "p0")[1:] or 0)
+        first = newest - page * per_page
+        ids = [i for i in range(first, max(first - per_page, oldest - 1), -1) if i > since_id]
+        if not ids:
+            return {"meta": {"result_count": 0}}
+        now = datetime.now(dt_timezone.utc)
+        data = [
+            {
+                "id": str(i),
+                "text": self._tweet_text(i),
+                "created_at": (now - timedelta(minutes=newest - i)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            }
+            for i in ids
+        ]
+        meta: dict[str, Any] = {"result_count": len(data), "newest_id": data[0]["id"], "oldest_id": data[-1]["id"]}
+        if page + 1 < config.pages and ids[-1] - 1 > max(since_id, oldest - 1):
+            meta["next_token"] = f"p{page + 1}"
+        return {"data": data, "meta": meta}
+
+    def _telegram(self, method: str, query: dict[str, str]) -> tuple[int, dict[str, str], Any]:
+        if method != "getUpdates":
+            return 200, {}, {"ok": True, "result": True}
+        if self.random.random() < self.config.error_rate:
+            return 429, {"retry-after": "5"}, {
+                "ok": False, "error_code": 429, "description": "Too Many Requests: retry after 5",
+                "parameters": {"retry_after": 5},
+            }
+        offset = int(query.get("offset") or 1)
+        count = min(int(query.get("limit") or 100), self.config.updates_per_poll)
+        date = int(time.time())
+        result = [
+            {
+                "update_id": update_id,
+                "channel_post": {
+                    "message_id": update_id,
+                    "date": date,
+                    "text": self._tweet_text(update_id),
+                    "chat": {"id": int(self.config.telegram_chat_id), "type": "channel"},
+                },
+            }
+            for update_id in range(offset, offset + count)
+        ]
+        return 200, {}, {"ok": True, "result": result}
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    server: StubAPIServer
+
+    def _handle(self, method: str) -> None:
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                query.update(parse_qsl(self.rfile.read(length).decode("utf-8")))
+        status, headers, body = self.server.respond(method, url.path, query)
+        payload = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        headers.setdefault("Content-Type", "application/json")
+        for name, value in headers.items():
+            if name.lower() != "content-length":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, *args):
+        pass
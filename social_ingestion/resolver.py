@@ -0,0 +1,84 @@
+"""Resolución de usernames de X a ids numéricos, por lotes y con caché en BD.
+
+Los usernames se buscan primero en ``XUserCache``; los que faltan o
+vencieron (``X_USER_CACHE_TTL_DAYS``) se piden a ``users/by?usernames=`` de a
+``LOOKUP_BATCH_SIZE`` por petición. También se guardan los que no existen
+para no gastar cuota en ellos en cada ejecución.
+"""
+from datetime import timedelta
+from typing import Iterable
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from .clients import XClient
+from .models import SocialAccount, XUserCache
+
+# Máximo de usernames que acepta users/by en una petición
+LOOKUP_BATCH_SIZE = 100
+
+
+def normalize_username(username: str | None) -> str:
+    return (username or "").strip().lstrip("@").lower()
+
+
+def _ttl() -> timedelta:
+    return timedelta(days=int(getattr(settings, "X_USER_CACHE_TTL_DAYS", 7)))
+
+
+def cached_user_ids(usernames: Iterable[str]) -> dict[str, str]:
+    """Ids vigentes en caché (sin llamar a la API); los inexistentes mapean a ''"""
+    names = {normalize_username(u) for u in usernames} - {""}
+    if not names:
+        return {}
+    fresh_after = timezone.now() - _ttl()
+    return dict(
+        XUserCache.objects.filter(username__in=names, resolved_at__gte=fresh_after)
+        .values_list("username", "user_id")
+    )
+
+
+def resolve_usernames(usernames: Iterable[str], client: XClient) -> dict[str, str]:
+    """Retorna {username_minúsculas: id} de los que existen; la API solo se consulta por los que faltan"""
+    names = {normalize_username(u) for u in usernames} - {""}
+    resolved = cached_user_ids(names)
+    pending = sorted(names - set(resolved))
+
+    now = timezone.now()
+    rows: list[XUserCache] = []
+    for start in range(0, len(pending), LOOKUP_BATCH_SIZE):
+        batch = pending[start:start + LOOKUP_BATCH_SIZE]
+        try:
+            found, missing, response = client.users_by_usernames(batch)
+        except requests.exceptions.RequestException:
+            break
+        if response.status_code != 200:
+            # 429 u otro error: no cachear nada de este lote y reintentar en la próxima ejecución
+            break
+        for name in batch:
+            if name in found or name in missing:
+                rows.append(XUserCache(username=name, user_id=found.get(name, ""), resolved_at=now))
+        resolved.update(found)
+
+    if rows:
+        XUserCache.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=["username"], update_fields=["user_id", "resolved_at"],
+        )
+    return {name: user_id for name, user_id in resolved.items() if user_id}
+
+
+def backfill_external_ids(accounts: Iterable[SocialAccount], client: XClient) -> int:
+    """Completa ``external_user_id`` de las cuentas que no lo tienen con un solo bulk_update"""
+    missing = [a for a in accounts if not (a.external_user_id or "").strip()]
+    if not missing:
+        return 0
+    ids = resolve_usernames((a.username for a in missing), client)
+    updated = []
+    for account in missing:
+        user_id = ids.get(normalize_username(account.username))
+        if user_id:
+            account.external_user_id = user_id
+            updated.append(account)
+    SocialAccount.objects.bulk_update(updated, ["external_user_id"])
+    return len(updated)
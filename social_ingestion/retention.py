@@ -0,0 +1,50 @@
+"""Retención de ``SocialPost`` por meses calendario.
+
+Se borra todo lo publicado antes del inicio del mes más viejo que se
+conserva: primero los payloads (archivados a disco si se pide) y después los
+posts, por lotes de ids tomados del índice de ``published_at``. Nunca se
+recorre la tabla completa.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import SocialPost, SocialPostPayload
+from .partitions import month_key, month_start, shift_month
+from .payloads import archive_payload_rows
+
+
+def retention_cutoff(keep_months: int, now=None) -> datetime:
+    """Inicio del mes más viejo de los ``keep_months`` que se conservan (incluido el actual)"""
+    return month_start(shift_month(month_key(now or timezone.now()), -(keep_months - 1)))
+
+
+def expired_month_counts(cutoff: datetime) -> dict[int, int]:
+    """{AAAAMM: cantidad de posts} de los meses anteriores a ``cutoff``"""
+    rows = (
+        SocialPost.objects.filter(published_at__lt=cutoff).order_by()
+        .annotate(month=TruncMonth("published_at", tzinfo=dt_timezone.utc))
+        .values_list("month").annotate(total=Count("id"))
+    )
+    return {month_key(month): total for month, total in rows}
+
+
+def drop_before(cutoff: datetime, archive: bool = False, root=None, batch_size: int = 5000) -> int:
+    """Elimina los posts publicados antes de ``cutoff``; con ``archive`` antes mueve sus payloads a disco"""
+    payloads = SocialPostPayload.objects.filter(post__published_at__lt=cutoff)
+    if archive:
+        archive_payload_rows(payloads, root)
+    else:
+        payloads.delete()
+    deleted = 0
+    while True:
+        ids = list(
+            SocialPost.objects.filter(published_at__lt=cutoff).order_by("published_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        SocialPost.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
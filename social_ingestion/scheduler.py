@@ -0,0 +1,109 @@
+"""Planificación adaptativa de consultas para el daemon ``run_ingestion``.
+
+Cada fuente guarda en su ``SourceCursor`` un promedio móvil exponencial
+(EWMA) de publicaciones nuevas por hora. El intervalo hasta la próxima
+consulta es el tiempo esperado para acumular ``INGESTION_TARGET_POSTS``
+publicaciones, acotado entre ``INGESTION_MIN_INTERVAL`` e
+``INGESTION_MAX_INTERVAL``: las fuentes activas se consultan más seguido y
+las inactivas se espacian. Además nunca se consulta más rápido de lo que
+permite la cuota restante de la ventana, repartida entre las fuentes que la
+comparten.
+"""
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from django.conf import settings
+
+from .models import SourceCursor
+
+
+def _setting(name: str, default: float) -> float:
+    return float(getattr(settings, name, default))
+
+
+def update_post_rate(previous: float, new_posts: int, elapsed_seconds: float, alpha: float | None = None) -> float:
+    """Nuevo promedio de publicaciones/hora tras observar ``new_posts`` en ``elapsed_seconds``"""
+    if elapsed_seconds <= 0:
+        return previous
+    alpha = _setting("INGESTION_EWMA_ALPHA", 0.3) if alpha is None else alpha
+    observed = new_posts * 3600.0 / elapsed_seconds
+    return alpha * observed + (1 - alpha) * previous
+
+
+def next_interval(cursor: SourceCursor, now: datetime, sharing_sources: int = 1) -> float:
+    """Segundos hasta la próxima consulta de la fuente"""
+    min_interval = _setting("INGESTION_MIN_INTERVAL", 60)
+    max_interval = _setting("INGESTION_MAX_INTERVAL", 3600)
+    target_posts = _setting("INGESTION_TARGET_POSTS", 5)
+
+    if cursor.post_rate > 0:
+        interval = target_posts * 3600.0 / cursor.post_rate
+    else:
+        interval = max_interval
+    interval = min(max(interval, min_interval), max_interval)
+
+    if cursor.rate_reset_at and cursor.rate_reset_at > now and cursor.rate_remaining is not None:
+        window = (cursor.rate_reset_at - now).total_seconds()
+        if cursor.rate_remaining == 0:
+            # Sin cuota: esperar al reset aunque supere el máximo
+            return max(interval, window)
+        # Repartir las peticiones restantes entre todas las fuentes de la ventana
+        interval = max(interval, window * sharing_sources / cursor.rate_remaining)
+    return interval
+
+
+def record_fetch(cursor: SourceCursor, now: datetime, new_posts: int, previous_fetch_at: datetime | None,
+                 sharing_sources: int = 1) -> None:
+    """Actualiza el promedio de la fuente y programa su próxima consulta"""
+    if previous_fetch_at is not None:
+        elapsed = (now - previous_fetch_at).total_seconds()
+        cursor.post_rate = update_post_rate(cursor.post_rate, new_posts, elapsed)
+    cursor.next_fetch_at = now + timedelta(seconds=next_interval(cursor, now, sharing_sources))
+
+
+@dataclass(order=True)
+class _Entry:
+    due_at: datetime
+    order: int
+    key: tuple[str, str] = field(compare=False)
+
+
+class SourceQueue:
+    """Cola de prioridad de fuentes ordenada por su próxima consulta"""
+
+    def __init__(self):
+        self._heap: list[_Entry] = []
+        self._order = 0
+        # Entrada vigente de cada fuente; las viejas se descartan al llegar al tope
+        self._live: dict[tuple[str, str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._live
+
+    def schedule(self, key: tuple[str, str], due_at: datetime) -> None:
+        self._order += 1
+        self._live[key] = self._order
+        heapq.heappush(self._heap, _Entry(due_at, self._order, key))
+
+    def discard(self, key: tuple[str, str]) -> None:
+        self._live.pop(key, None)
+
+    def peek(self) -> tuple[tuple[str, str], datetime] | None:
+        while self._heap and self._live.get(self._heap[0].key) != self._heap[0].order:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return self._heap[0].key, self._heap[0].due_at
+
+    def pop_due(self, now: datetime) -> tuple[str, str] | None:
+        """Saca la fuente más atrasada si ya le toca"""
+        head = self.peek()
+        if head is None or head[1] > now:
+            return None
+        heapq.heappop(self._heap)
+        del self._live[head[0]]
+        return head[0]
@@ -0,0 +1,267 @@
+"""Puntuación de productos por afinidad con la actividad social del usuario.
+
+El espacio de características tiene una dimensión por categoría y una por
+palabra clave de la taxonomía vigente. Cada producto disponible se
+representa con un vector normalizado (su categoría más las palabras clave
+de su nombre y descripción) que se calcula una vez por proceso y se guarda
+en una matriz ``float32``. El vector del usuario suma las categorías y
+palabras clave de sus intereses y de sus posts dentro de
+``RECOMMENDATION_HISTORY_DAYS``, con un peso que decae a la mitad cada
+``RECOMMENDATION_HALF_LIFE_DAYS``.
+
+El puntaje es ``matriz @ usuario`` (más los vecinos ítem-ítem de sus
+favoritos, si se pasan como ``boost``) con términos de popularidad
+(favoritos y comentarios) y frescura, todo vectorizado; solo compiten los productos con
+afinidad positiva y el top-k sale de ``argpartition`` sin ordenar todo.
+
+Guardar o borrar un producto no reconstruye el índice: ``update_product`` y
+``remove_product`` reescriben o enmascaran (vector en cero) solo su fila en
+el índice del proceso. Los demás procesos lo ven al vencer
+``RECOMMENDATION_INDEX_TTL``.
+"""
+import dataclasses
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from products.models import Comment, Favorite, Product
+
+from .categories import CATEGORY_BITS, CATEGORY_NAMES
+from .matcher import KeywordMatcher, tokenize
+from .models import SocialAccount, SocialPost, UserInterest
+from .taxonomy import get_taxonomy_matcher
+
+_lock = threading.Lock()
+_state: dict = {"index": None, "built_at": 0.0}
+
+
+def _setting(name: str, default: float) -> float:
+    return float(getattr(settings, name, default))
+
+
+@dataclass
+class ProductIndex:
+    """Vectores precalculados de los productos disponibles"""
+    matcher: KeywordMatcher
+    features: dict[str, int]
+    product_ids: np.ndarray
+    vectors: np.ndarray
+    popularity: np.ndarray
+    published: np.ndarray
+    category_dims: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def dimensions(self) -> int:
+        return len(self.features)
+
+
+def _feature_space(matcher: KeywordMatcher) -> tuple[dict[str, int], dict[str, int]]:
+    category_dims = {name: i for i, name in enumerate(CATEGORY_NAMES)}
+    features = {f"cat:{name}": i for name, i in category_dims.items()}
+    for keyword in sorted({" ".join(tokenize(k)) for k in matcher.keyword_map} - {""}):
+        features[f"kw:{keyword}"] = len(features)
+    return features, category_dims
+
+
+def _add_text_features(row: np.ndarray, features: dict[str, int], matcher: KeywordMatcher, text: str, weight: float) -> None:
+    for keyword, _ in matcher.find(text):
+        dim = features.get(f"kw:{keyword}")
+        if dim is not None:
+            row[dim] += weight
+
+
+def _add_product_features(row: np.ndarray, features: dict[str, int], category_dims: dict[str, int],
+                          matcher: KeywordMatcher, name: str, description: str, category: str) -> None:
+    if category in category_dims:
+        row[category_dims[category]] = 1.0
+    _add_text_features(row, features, matcher, name, 1.0)
+    _add_text_features(row, features, matcher, description, 0.5)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def build_product_index(matcher: KeywordMatcher | None = None) -> ProductIndex:
+    matcher = matcher or get_taxonomy_matcher()
+    features, category_dims = _feature_space(matcher)
+    rows = list(
+        Product.objects.filter(available=True)
+        .order_by("id")
+        .values_list("id", "name", "description", "category", "published_at")
+    )
+    vectors = np.zeros((len(rows), len(features)), dtype=np.float32)
+    published = np.zeros(len(rows), dtype=np.float64)
+    for i, (_, name, description, category, published_at) in enumerate(rows):
+        _add_product_features(vectors[i], features, category_dims, matcher, name, description, category)
+        published[i] = published_at.timestamp() if published_at else 0.0
+
+    product_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    # Popularidad: favoritos + comentarios, en escala logarítmica y normalizada a [0, 1]
+    counts: dict[int, int] = {}
+    for model in (Favorite, Comment):
+        for product_id, total in model.objects.values_list("product_id").annotate(total=Count("id")):
+            counts[product_id] = counts.get(product_id, 0) + total
+    popularity = np.log1p(np.array([counts.get(int(pid), 0) for pid in product_ids], dtype=np.float32))
+    if popularity.size and popularity.max() > 0:
+        popularity /= popularity.max()
+
+    return ProductIndex(
+        matcher=matcher,
+        features=features,
+        product_ids=product_ids,
+        vectors=_normalize_rows(vectors),
+        popularity=popularity,
+        published=published,
+        category_dims=category_dims,
+    )
+
+
+def get_product_index() -> ProductIndex:
+    """Índice del proceso; se reconstruye si cambió la taxonomía o venció el TTL"""
+    matcher = get_taxonomy_matcher()
+    index = _state["index"]
+    ttl = _setting("RECOMMENDATION_INDEX_TTL", 300)
+    if index is not None and index.matcher is matcher and time.monotonic() - _state["built_at"] < ttl:
+        return index
+    with _lock:
+        index = build_product_index(matcher)
+        _state.update(index=index, built_at=time.monotonic())
+    return index
+
+
+def invalidate_product_index() -> None:
+    with _lock:
+        _state.update(index=None, built_at=0.0)
+
+
+def _position(index: ProductIndex, product_id: int) -> int | None:
+    """Fila del producto (product_ids está ordenado) o None si no está en el índice"""
+    pos = int(np.searchsorted(index.product_ids, product_id))
+    if pos < index.product_ids.size and index.product_ids[pos] == product_id:
+        return pos
+    return None
+
+
+def update_product(product: Product) -> None:
+    """Refleja un producto guardado en el índice del proceso sin reconstruirlo.
+
+    Si existe se reescribe su fila; si dejó de estar disponible se
+    enmascara; si es nuevo se inserta en su posición ordenada (con
+    popularidad 0 hasta la próxima reconstrucción).
+    """
+    with _lock:
+        index = _state["index"]
+        if index is None:
+            return
+        pos = _position(index, product.pk)
+        if not product.available:
+            if pos is not None:
+                index.vectors[pos] = 0.0
+            return
+        row = np.zeros(index.dimensions, dtype=np.float32)
+        _add_product_features(row, index.features, index.category_dims, index.matcher,
+                              product.name, product.description, product.category)
+        row = _normalize_rows(row[np.newaxis])[0]
+        published = product.published_at.timestamp() if product.published_at else 0.0
+        if pos is not None:
+            index.vectors[pos] = row
+            index.published[pos] = published
+            return
+        # Las búsquedas en curso siguen usando los arreglos anteriores
+        pos = int(np.searchsorted(index.product_ids, product.pk))
+        _state["index"] = dataclasses.replace(
+            index,
+            product_ids=np.insert(index.product_ids, pos, product.pk),
+            vectors=np.insert(index.vectors, pos, row, axis=0),
+            popularity=np.insert(index.popularity, pos, 0.0),
+            published=np.insert(index.published, pos, published),
+        )
+
+
+def remove_product(product_id: int) -> None:
+    """Enmascara un producto borrado; la fila desaparece en la próxima reconstrucción"""
+    with _lock:
+        index = _state["index"]
+        if index is None:
+            return
+        pos = _position(index, product_id)
+        if pos is not None:
+            index.vectors[pos] = 0.0
+
+
+def user_affinity(user, index: ProductIndex, now: datetime | None = None) -> np.ndarray:
+    """Vector de afinidad del usuario con decaimiento temporal sobre sus posts e intereses"""
+    now = now or timezone.now()
+    half_life = _setting("RECOMMENDATION_HALF_LIFE_DAYS", 30) * 86400
+    # Más allá de este horizonte el peso es despreciable; solo se lee ese rango de published_at
+    history_days = _setting("RECOMMENDATION_HISTORY_DAYS", 240)
+    affinity = np.zeros(index.dimensions, dtype=np.float32)
+    sources = [UserInterest.objects.filter(user=user).values_list("text", "category_mask", "created_at")]
+    account = SocialAccount.objects.filter(user=user).only("username").first()
+    if account:
+        sources.append(
+            SocialPost.objects.recent(history_days, now).filter(author__iexact=account.username)
+            .values_list("text", "category_mask", "published_at")
+        )
+    for rows in sources:
+        for text, mask, created in rows.iterator(chunk_size=2000):
+            weight = 0.5 ** (max((now - created).total_seconds(), 0.0) / half_life)
+            for name, bit in CATEGORY_BITS.items():
+                if mask & bit:
+                    affinity[index.category_dims[name]] += weight
+            _add_text_features(affinity, index.features, index.matcher, text, weight)
+    norm = float(np.linalg.norm(affinity))
+    return affinity / norm if norm else affinity
+
+
+def affinity_categories(affinity: np.ndarray, index: ProductIndex) -> list[str]:
+    return [name for name, dim in index.category_dims.items() if affinity[dim] > 0]
+
+
+def rank_products(affinity: np.ndarray, index: ProductIndex, k: int, now: datetime | None = None,
+                  boost: dict[int, float] | None = None) -> list[tuple[int, float]]:
+    """Top-k (product_id, puntaje) por afinidad, popularidad, frescura y ``boost`` opcional por producto"""
+    if not index.product_ids.size or not (affinity.any() or boost):
+        return []
+    now_ts = (now or timezone.now()).timestamp()
+    fresh_half_life = _setting("RECOMMENDATION_FRESHNESS_HALF_LIFE_DAYS", 14) * 86400
+
+    relevance = index.vectors @ affinity
+    if boost:
+        # product_ids está ordenado por id: searchsorted ubica cada producto sin recorrer la lista
+        keys = np.fromiter(boost.keys(), dtype=np.int64, count=len(boost))
+        positions = np.minimum(np.searchsorted(index.product_ids, keys), index.product_ids.size - 1)
+        # Solo productos vigentes: los enmascarados (vector en cero) no reciben vecinos
+        found = (index.product_ids[positions] == keys) & index.vectors[positions].any(axis=1)
+        extra = np.zeros_like(relevance)
+        extra[positions[found]] = np.fromiter(boost.values(), dtype=np.float32, count=len(boost))[found]
+        relevance = relevance + _setting("RECOMMENDATION_COLLABORATIVE_WEIGHT", 0.5) * extra
+    age = np.maximum(now_ts - index.published, 0.0)
+    freshness = np.exp2(-age / fresh_half_life).astype(np.float32)
+    scores = (
+        relevance
+        + _setting("RECOMMENDATION_POPULARITY_WEIGHT", 0.2) * index.popularity
+        + _setting("RECOMMENDATION_FRESHNESS_WEIGHT", 0.1) * freshness
+    )
+    scores[relevance <= 0] = -math.inf
+
+    candidates = int(np.count_nonzero(relevance > 0))
+    k = min(k, candidates)
+    if k <= 0:
+        return []
+    if k < scores.size:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(scores.size)
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [(int(index.product_ids[i]), float(scores[i])) for i in top]
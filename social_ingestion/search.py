@@ -0,0 +1,176 @@
+"""Búsqueda de texto completo sobre ``SocialPost`` y ``UserInterest``.
+
+En SQLite cada tabla tiene un índice FTS5 de contenido externo
+(``<tabla>_fts``) con el tokenizador ``unicode61 remove_diacritics 2``, de
+modo que 'cafe' encuentra 'Café'. Los triggers lo mantienen al insertar,
+editar o borrar filas. Cada palabra de la consulta se busca como prefijo
+('cami' -> 'camisa') y todas deben aparecer. Las palabras con ``@`` o
+``autor:`` filtran por autor exacto.
+
+En PostgreSQL cada tabla tiene un índice GIN sobre la expresión
+``to_tsvector('simple', social_unaccent(columnas))`` (``social_unaccent`` es
+``unaccent`` declarada IMMUTABLE para poder indexarla) y la consulta repite
+esa misma expresión con un ``to_tsquery`` de prefijos, así que el
+planificador usa el índice. No hay tabla aparte ni triggers que mantener.
+
+En otros motores no hay índice y se usa ``icontains`` por palabra, con el
+mismo formato de consulta.
+
+Si una migración reconstruye la tabla en SQLite (cambios de columnas), los
+triggers se pierden con la tabla vieja. ``rebuild_search_index`` los vuelve
+a crear y repuebla el índice.
+"""
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from .matcher import tokenize
+
+# Tabla -> columnas indexadas
+FTS_TABLES = {
+    "social_ingestion_socialpost": ("text", "author"),
+    "social_ingestion_userinterest": ("text",),
+}
+TOKENIZER = "unicode61 remove_diacritics 2"
+PG_UNACCENT = "social_unaccent"
+_AUTHOR_PREFIXES = ("@", "autor:", "from:")
+
+
+@dataclass
+class ParsedQuery:
+    terms: list[str] = field(default_factory=list)
+    authors: list[str] = field(default_factory=list)
+    # Palabras originales sin los filtros de autor (para buscar en otros campos)
+    text: str = ""
+
+
+def parse_query(query: str | None) -> ParsedQuery:
+    """'camisa @Ana roja' -> términos ['camisa', 'roja'] y autores ['Ana']"""
+    parsed = ParsedQuery()
+    words = []
+    for word in (query or "").split():
+        prefix = next((p for p in _AUTHOR_PREFIXES if word.lower().startswith(p)), None)
+        if prefix and len(word) > len(prefix):
+            parsed.authors.append(word[len(prefix):])
+        else:
+            parsed.terms.extend(tokenize(word))
+            words.append(word)
+    parsed.text = " ".join(words)
+    return parsed
+
+
+def match_expression(terms: list[str]) -> str:
+    """Expresión MATCH de FTS5: cada término entre comillas y como prefijo, todos requeridos"""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def tsquery_expression(terms: list[str]) -> str:
+    """Consulta de to_tsquery: cada término como prefijo, todos requeridos"""
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def pg_document(table: str) -> str:
+    """Expresión tsvector de la tabla; debe ser idéntica en el índice y en la consulta"""
+    columns = " || ' ' || ".join(f"coalesce({c}, '')" for c in FTS_TABLES[table])
+    return f"to_tsvector('simple'::regconfig, {PG_UNACCENT}({columns}))"
+
+
+def uses_fts(conn=None) -> bool:
+    return (conn or connection).vendor in ("sqlite", "postgresql")
+
+
+def _filter_text(queryset: QuerySet, table: str, terms: list[str]) -> QuerySet:
+    if not terms:
+        return queryset
+    if connection.vendor == "sqlite":
+        fts = f"{table}_fts"
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", (match_expression(terms),)
+        ))
+    if connection.vendor == "postgresql":
+        # Los términos ya vienen sin tildes y en minúsculas (tokenize)
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT id FROM {table} WHERE {pg_document(table)} @@ to_tsquery('simple'::regconfig, %s)",
+            (tsquery_expression(terms),),
+        ))
+    condition = Q()
+    for term in terms:
+        condition &= Q(text__icontains=term)
+    return queryset.filter(condition)
+
+
+def search_posts(queryset: QuerySet, query: str | None) -> QuerySet:
+    parsed = parse_query(query)
+    if parsed.authors:
+        authors = Q()
+        for author in parsed.authors:
+            authors |= Q(author__iexact=author)
+        queryset = queryset.filter(authors)
+    return _filter_text(queryset, "social_ingestion_socialpost", parsed.terms)
+
+
+def search_interests(queryset: QuerySet, query: str | None) -> QuerySet:
+    return _filter_text(queryset, "social_ingestion_userinterest", parse_query(query).terms)
+
+
+def install_fts(schema_editor) -> None:
+    """Crea (si faltan) los índices de texto completo; no hace nada fuera de SQLite y PostgreSQL.
+
+    En SQLite crea las tablas FTS5 y sus triggers y las repuebla; en
+    PostgreSQL la extensión ``unaccent``, su versión IMMUTABLE y los índices GIN.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _install_pg(schema_editor)
+        return
+    if vendor != "sqlite":
+        return
+    for table, columns in FTS_TABLES.items():
+        fts = f"{table}_fts"
+        cols = ", ".join(columns)
+        new = ", ".join(f"new.{c}" for c in columns)
+        old = ", ".join(f"old.{c}" for c in columns)
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', "
+            f"content_rowid='id', tokenize='{TOKENIZER}')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+        for statement in statements:
+            schema_editor.execute(statement)
+
+
+def _install_pg(schema_editor) -> None:
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    schema_editor.execute(
+        f"CREATE OR REPLACE FUNCTION {PG_UNACCENT}(text) RETURNS text "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+        "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+    )
+    for table in FTS_TABLES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_fts_idx ON {table} USING GIN (({pg_document(table)}))"
+        )
+
+
+def uninstall_fts(schema_editor) -> None:
+    if schema_editor.connection.vendor == "postgresql":
+        for table in FTS_TABLES:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_fts_idx")
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {PG_UNACCENT}(text)")
+        return
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table in FTS_TABLES:
+        fts = f"{table}_fts"
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
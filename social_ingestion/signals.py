@@ -0,0 +1,76 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from products.models import Favorite, Product, ProductNeighbor
+from products.services.similarity import neighbors_rebuilt
+
+from . import interest_index, scoring
+from .models import CategoryKeyword, SocialAccount, SocialPost, UserInterest
+from .recommender import mark_all_dirty, mark_dirty, mark_dirty_for_categories
+from .taxonomy import bump_version
+
+
+@receiver(post_save, sender=CategoryKeyword)
+@receiver(post_delete, sender=CategoryKeyword)
+def taxonomy_changed(sender, instance, **kwargs):
+    bump_version()
+
+
+@receiver(post_save, sender=UserInterest)
+@receiver(post_delete, sender=UserInterest)
+def interest_changed(sender, instance, **kwargs):
+    if kwargs.get('created'):
+        interest_index.index_interest(instance)
+    else:
+        # Edición o borrado: el término puede seguir aportado por otro interés del usuario
+        interest_index.index_user(instance.user_id)
+    mark_dirty([instance.user_id])
+
+
+@receiver(post_save, sender=SocialAccount)
+def social_account_saved(sender, instance, **kwargs):
+    interest_index.index_user(instance.user_id)
+    mark_dirty([instance.user_id])
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def favorite_changed(sender, instance, **kwargs):
+    mark_dirty([instance.user_id])
+
+
+@receiver(neighbors_rebuilt, sender=ProductNeighbor)
+def product_neighbors_rebuilt(sender, **kwargs):
+    mark_all_dirty()
+
+
+@receiver(post_save, sender=SocialPost)
+def social_post_saved(sender, instance, created, **kwargs):
+    # Los lotes de bulk_create se indexan y marcan en persistence.persist_posts
+    if created:
+        user_ids = interest_index.index_posts([instance])
+        if user_ids:
+            mark_dirty(user_ids)
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_category(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_category = (
+            Product.objects.filter(pk=instance.pk).values_list('category', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, instance, **kwargs):
+    # Solo la fila del producto; el resto del índice se reutiliza
+    if kwargs['signal'] is post_delete:
+        scoring.remove_product(instance.pk)
+    else:
+        scoring.update_product(instance)
+    if kwargs.get('created'):
+        # Producto nuevo: solo los usuarios con algún término en común, vía el índice invertido
+        interest_index.match_new_product(instance)
+    else:
+        mark_dirty_for_categories([instance.category, getattr(instance, '_previous_category', None)])
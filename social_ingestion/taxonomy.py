@@ -0,0 +1,172 @@
+"""Taxonomía de palabras clave administrada desde la base de datos.
+
+Cada proceso guarda un ``KeywordMatcher`` compilado junto con la versión de
+la taxonomía con la que se construyó. La versión se consulta como máximo una
+vez cada ``TAXONOMY_CHECK_SECONDS`` y el autómata solo se recompila cuando
+cambia. Editar una palabra clave incrementa la versión y encola un
+``ReclassificationJob`` que recorre ``SocialPost`` y ``UserInterest`` por lotes.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import interest_index, recommender
+from .categories import categories_to_mask
+from .matcher import KeywordMatcher, classify_chunk, init_worker
+from .models import CategoryKeyword, ReclassificationJob, SocialPost, TaxonomyVersion, UserInterest
+
+_lock = threading.Lock()
+_state: dict = {"version": None, "matcher": None, "checked_at": 0.0}
+
+
+def _check_interval() -> float:
+    return float(getattr(settings, "TAXONOMY_CHECK_SECONDS", 30))
+
+
+def current_version() -> int:
+    row = TaxonomyVersion.objects.filter(pk=1).values_list("version", flat=True).first()
+    return row or 0
+
+
+def load_keyword_map() -> dict[str, str]:
+    return dict(CategoryKeyword.objects.filter(active=True).values_list("keyword", "category"))
+
+
+def get_taxonomy_matcher() -> KeywordMatcher:
+    """Autómata compilado para la versión vigente de la taxonomía"""
+    from social_ingestion import DEFAULT_KEYWORD_MAP, get_matcher
+
+    now = time.monotonic()
+    matcher = _state["matcher"]
+    if matcher is not None and now - _state["checked_at"] < _check_interval():
+        return matcher
+
+    with _lock:
+        try:
+            version = current_version()
+            if matcher is None or version != _state["version"]:
+                keyword_map = load_keyword_map() if version else {}
+                matcher = KeywordMatcher(keyword_map) if keyword_map else get_matcher(DEFAULT_KEYWORD_MAP)
+                _state["version"] = version
+                _state["matcher"] = matcher
+        except DatabaseError:
+            # Tablas aún no migradas: usar el mapa por defecto
+            matcher = matcher or get_matcher(DEFAULT_KEYWORD_MAP)
+        _state["checked_at"] = now
+    return matcher
+
+
+def reset_matcher() -> None:
+    """Obliga a recompilar el autómata en la próxima clasificación de este proceso"""
+    with _lock:
+        _state.update(version=None, matcher=None, checked_at=0.0)
+
+
+def bump_version() -> int:
+    """Incrementa la versión y encola una reclasificación"""
+    TaxonomyVersion.objects.get_or_create(pk=1)
+    TaxonomyVersion.objects.filter(pk=1).update(version=F("version") + 1, updated_at=timezone.now())
+    version = current_version()
+    # Un trabajo pendiente que aún no empezó sirve para la nueva versión
+    updated = ReclassificationJob.objects.filter(
+        status="pending", last_post_id=0, last_interest_id=0
+    ).update(taxonomy_version=version)
+    if not updated:
+        ReclassificationJob.objects.create(taxonomy_version=version)
+    reset_matcher()
+    return version
+
+
+def _iter_chunks(queryset, last_id: int, chunk_size: int) -> Iterator[list[tuple[int, str, str]]]:
+    """Recorre (id, text, matched_categories) con id > last_id en lotes, sin cargar la tabla en memoria"""
+    rows = queryset.filter(id__gt=last_id).order_by("id").values_list("id", "text", "matched_categories")
+    chunk: list[tuple[int, str, str]] = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _classified_chunks(chunks, matcher: KeywordMatcher, pool: ProcessPoolExecutor | None, workers: int):
+    """Genera (lote, categorías) en orden; con pool mantiene varios lotes en vuelo"""
+    if pool is None:
+        for chunk in chunks:
+            yield chunk, [",".join(c) for c in matcher.classify_many(text for _, text, _ in chunk)]
+        return
+    in_flight: deque = deque()
+    for chunk in chunks:
+        in_flight.append((chunk, pool.submit(classify_chunk, [text for _, text, _ in chunk])))
+        if len(in_flight) >= workers * 2:
+            done, future = in_flight.popleft()
+            yield done, future.result()
+    while in_flight:
+        done, future = in_flight.popleft()
+        yield done, future.result()
+
+
+def run_reclassification_job(job: ReclassificationJob, chunk_size: int = 500, max_chunks: int | None = None,
+                             workers: int = 1) -> bool:
+    """Procesa un trabajo por lotes guardando el avance tras cada uno.
+
+    Retorna True cuando el trabajo terminó. Con ``max_chunks`` se puede
+    limitar el trabajo hecho en una sola llamada y continuar después. Con
+    ``workers`` > 1 la clasificación se reparte en un pool de procesos; las
+    escrituras (``bulk_update`` y checkpoint) siguen en este proceso y en
+    orden de id, así que un corte solo repite el lote en curso.
+    """
+    reset_matcher()
+    matcher = get_taxonomy_matcher()
+    if job.status == "pending":
+        job.status = "running"
+        job.save(update_fields=["status"])
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(matcher.keyword_map,))
+    chunks = 0
+    try:
+        for queryset, date_field, cursor_field, counter_field in (
+            (SocialPost.objects.all(), "published_at", "last_post_id", "posts_updated"),
+            (UserInterest.objects.all(), "created_at", "last_interest_id", "interests_updated"),
+        ):
+            if job.since:
+                queryset = queryset.filter(**{f"{date_field}__gte": job.since})
+            model = queryset.model
+            for chunk, joined in _classified_chunks(
+                _iter_chunks(queryset, getattr(job, cursor_field), chunk_size), matcher, pool, workers
+            ):
+                if max_chunks is not None and chunks >= max_chunks:
+                    return False
+                changed = [
+                    model(id=row_id, matched_categories=categories, category_mask=categories_to_mask(categories))
+                    for (row_id, _, current), categories in zip(chunk, joined)
+                    if categories != current
+                ]
+                with transaction.atomic():
+                    if changed:
+                        model.objects.bulk_update(changed, ["matched_categories", "category_mask"], batch_size=chunk_size)
+                    setattr(job, cursor_field, chunk[-1][0])
+                    setattr(job, counter_field, getattr(job, counter_field) + len(changed))
+                    job.save(update_fields=[cursor_field, counter_field])
+                chunks += 1
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    job.status = "done"
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at"])
+    # Las categorías y palabras clave pudieron cambiar para cualquier usuario
+    interest_index.rebuild_interest_index()
+    recommender.mark_all_dirty()
+    return True
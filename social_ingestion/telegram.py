@@ -0,0 +1,142 @@
+"""Recepción de updates de Telegram por webhook o long polling.
+
+Ambos modos solo encolan los updates en ``TelegramUpdate`` (un INSERT por
+lote, idempotente por ``update_id``). ``process_pending_updates`` los
+clasifica e inserta después en bloque, fuera de la petición HTTP, con la
+misma etapa de persistencia que ``fetch_social``. Los updates ya procesados
+se borran pasados ``TELEGRAM_UPDATE_RETENTION_DAYS``: para entonces Telegram
+ya no reenvía ese ``update_id`` y el post quedó guardado en ``SocialPost``.
+"""
+import json
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Iterable
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SocialSource, TelegramUpdate
+from .persistence import PersistResult, classify_posts, persist_posts
+from .replay import attach_recorder
+
+ALLOWED_UPDATES = ["message", "channel_post"]
+DEFAULT_BASE_URL = "https://api.telegram.org"
+
+_session: requests.Session | None = None
+
+
+def bot_token() -> str:
+    return os.getenv("TELEGRAM_BOT_TOKEN", "")
+
+
+def api_url(token: str, method: str) -> str:
+    base_url = (getattr(settings, "TELEGRAM_API_BASE_URL", "") or DEFAULT_BASE_URL).rstrip("/")
+    return f"{base_url}/bot{token}/{method}"
+
+
+def session() -> requests.Session:
+    """Sesión compartida (reutiliza conexiones y graba en el cassette si está configurado)"""
+    global _session
+    if _session is None:
+        _session = attach_recorder(requests.Session())
+    return _session
+
+
+def parse_updates(updates: Iterable[dict[str, Any]], chat_ids: set[str]) -> tuple[dict[str, list[dict[str, Any]]], int | None]:
+    """Reparte los mensajes de texto por chat. Retorna ({chat_id: posts}, mayor update_id)"""
+    posts_by_chat: dict[str, list[dict[str, Any]]] = {}
+    max_update_id = None
+    for update in updates:
+        update_id = update.get("update_id")
+        if isinstance(update_id, int):
+            max_update_id = update_id if max_update_id is None else max(max_update_id, update_id)
+        message = update.get("message") or update.get("channel_post") or {}
+        # Solo procesar mensajes de texto de chats configurados
+        if "text" not in message:
+            continue
+        chat = message.get("chat", {})
+        chat_id = str(chat.get("id"))
+        if chat_id not in chat_ids:
+            continue
+        posts_by_chat.setdefault(chat_id, []).append({
+            "id": f"{chat_id}:{message.get('message_id', '')}",
+            "author": chat.get("title", chat.get("username", chat_id)),
+            "text": message.get("text", ""),
+            "published_at": datetime.fromtimestamp(message.get("date", 0), tz=dt_timezone.utc),
+        })
+    return posts_by_chat, max_update_id
+
+
+def enqueue_updates(updates: Iterable[dict[str, Any]]) -> int:
+    """Guarda los updates en la cola; los repetidos (reintentos de Telegram) se ignoran"""
+    rows = [
+        TelegramUpdate(update_id=update["update_id"], payload=update)
+        for update in updates
+        if isinstance(update, dict) and isinstance(update.get("update_id"), int)
+    ]
+    TelegramUpdate.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def process_pending_updates(batch_size: int = 500) -> PersistResult:
+    """Clasifica e inserta los updates encolados, por lotes en orden de update_id"""
+    chat_ids = {
+        str(handle)
+        for handle in SocialSource.objects.filter(active=True, platform="telegram").values_list("handle", flat=True)
+        if handle
+    }
+    result = PersistResult()
+    while True:
+        with transaction.atomic():
+            batch = list(
+                TelegramUpdate.objects.filter(processed_at__isnull=True)
+                .order_by("update_id")
+                .values_list("id", "payload")[:batch_size]
+            )
+            if not batch:
+                break
+            posts_by_chat, _ = parse_updates((payload for _, payload in batch), chat_ids)
+            posts = [post for chat_posts in posts_by_chat.values() for post in chat_posts]
+            classified = classify_posts(posts)
+            stored = persist_posts("telegram", classified)
+            stored.fetched, stored.matched = len(posts), len(classified)
+            result += stored
+            TelegramUpdate.objects.filter(id__in=[pk for pk, _ in batch]).update(processed_at=timezone.now())
+        if len(batch) < batch_size:
+            break
+    prune_processed_updates()
+    return result
+
+
+def prune_processed_updates(days: int | None = None) -> int:
+    """Borra los updates procesados hace más de ``days`` días. Retorna cuántos"""
+    if days is None:
+        days = int(getattr(settings, "TELEGRAM_UPDATE_RETENTION_DAYS", 7))
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = TelegramUpdate.objects.filter(processed_at__lt=cutoff).delete()
+    return deleted
+
+
+def get_updates(token: str, offset: int | None = None, timeout: int = 0, limit: int = 100) -> requests.Response:
+    """Llama a getUpdates; con ``timeout`` > 0 Telegram mantiene la conexión abierta (long polling)"""
+    params: dict[str, Any] = {"limit": limit, "timeout": timeout, "allowed_updates": json.dumps(ALLOWED_UPDATES)}
+    if offset is not None:
+        params["offset"] = offset
+    return session().get(api_url(token, "getUpdates"), params=params, timeout=timeout + 15)
+
+
+def set_webhook(token: str, url: str, secret: str) -> dict[str, Any]:
+    """Registra el webhook; Telegram enviará ``secret`` en X-Telegram-Bot-Api-Secret-Token"""
+    response = session().post(
+        api_url(token, "setWebhook"),
+        data={"url": url, "secret_token": secret, "allowed_updates": json.dumps(ALLOWED_UPDATES)},
+        timeout=15,
+    )
+    return response.json()
+
+
+def delete_webhook(token: str) -> dict[str, Any]:
+    """Quita el webhook para volver a usar getUpdates (long polling)"""
+    return session().post(api_url(token, "deleteWebhook"), timeout=15).json()
@@ -1,3 +1,969 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from products.models import Favorite, Product
+from products.services.similarity import rebuild_product_neighbors
+
+from social_ingestion import classify_many, dedup, partitions, recommend_categories_from_text, scoring
+from .categories import categories_to_mask, mask_to_categories, masks_with_any
+from .clients import XClient
+from .resolver import backfill_external_ids, resolve_usernames
+from .matcher import KeywordMatcher
+from .management.commands.fetch_social import Command as FetchSocialCommand, XFetchOutcome
+from .management.commands.run_ingestion import Command as RunIngestionCommand
+from .models import (
+    CategoryKeyword, IngestionRun, InterestTerm, ReclassificationJob, SocialAccount, SocialPost, SocialPostAlias,
+    SocialPostPayload, SocialSource, SourceCursor, TaxonomyVersion, TelegramUpdate, UserInterest, UserRecommendation,
+    XUserCache,
+)
+from .payloads import find_archived_payload, iter_archived_payloads
+from .persistence import classify_posts, persist_posts
+from . import search as search_module
+from .search import install_fts, pg_document, search_interests, search_posts, tsquery_expression
+from .recommender import get_recommendations
+from .ratelimit import TokenBucket
+from .scheduler import SourceQueue, next_interval, record_fetch
+from .taxonomy import get_taxonomy_matcher, reset_matcher, run_reclassification_job
+from .retention import expired_month_counts, retention_cutoff
+from .replay import StubAPIServer, SyntheticConfig, load_cassette
+from .telegram import get_updates, process_pending_updates
+
+
+class KeywordMatcherTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+
+    def test_matches_whole_words_only(self):
+        self.assertEqual(recommend_categories_from_text('Vendo pantalón azul'), ['Ropa'])
+        self.assertEqual(recommend_categories_from_text('la pcera del bloque'), [])
+
+    def test_matches_simple_spanish_plurals(self):
+        self.assertEqual(
+            classify_many(['camisas y camisetas', 'pantalones', 'celulares baratos', 'computadores', 'empanadas']),
+            [['Ropa'], ['Ropa'], ['Tecnología'], ['Tecnología'], ['Comida']],
+        )
+        matcher = KeywordMatcher({'comida rapida': 'Comida', 'pan': 'Comida'})
+        self.assertEqual(matcher.find('comidas rapidas y panes'), [('comida rapida', 'Comida'), ('pan', 'Comida')])
+        # Solo se quita el sufijo si lo que queda es una palabra clave
+        self.assertEqual(matcher.find('panteones'), [])
+
+    def test_accent_insensitive(self):
+        self.assertEqual(recommend_categories_from_text('AUDÍFONOS y CAFÉ'), ['Comida', 'Tecnología'])
+        self.assertEqual(recommend_categories_from_text('audifonos'), ['Tecnología'])
+
+    def test_multi_word_keywords_and_overlaps(self):
+        matcher = KeywordMatcher({'comida rapida': 'Comida', 'rapida': 'Otros', 'libro': 'Libros'})
+        self.assertEqual(
+            matcher.find('Comida rápida y un libro'),
+            [('comida rapida', 'Comida'), ('rapida', 'Otros'), ('libro', 'Libros')],
+        )
+
+    def test_classify_many(self):
+        self.assertEqual(classify_many(['pan fresco', '', 'nada']), [['Comida'], [], []])
+
+
+class KeywordTaxonomyTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+
+    def test_edit_bumps_version_and_hot_reloads_matcher(self):
+        version = TaxonomyVersion.objects.get(pk=1).version
+        self.assertEqual(recommend_categories_from_text('vendo manzanas'), [])
+        CategoryKeyword.objects.create(keyword='manzanas', category='Comida')
+        self.assertEqual(TaxonomyVersion.objects.get(pk=1).version, version + 1)
+        self.assertEqual(recommend_categories_from_text('vendo manzanas'), ['Comida'])
+
+    def test_reclassification_job_runs_in_chunks(self):
+        user = User.objects.create_user(username='u', password='p')
+        for i in range(5):
+            SocialPost.objects.create(platform='x', post_id=str(i), author='a', text='ricas manzanas')
+        UserInterest.objects.create(user=user, text='quiero manzanas')
+        CategoryKeyword.objects.create(keyword='manzanas', category='Comida')
+        CategoryKeyword.objects.filter(keyword='pan').delete()
+        job = ReclassificationJob.objects.get(status='pending')
+
+        self.assertFalse(run_reclassification_job(job, chunk_size=2, max_chunks=2))
+        self.assertEqual(job.last_post_id, SocialPost.objects.order_by('id')[3].id)
+        self.assertTrue(run_reclassification_job(job, chunk_size=2))
+        self.assertEqual(job.posts_updated, 5)
+        self.assertEqual(job.interests_updated, 1)
+        self.assertEqual(set(SocialPost.objects.values_list('matched_categories', flat=True)), {'Comida'})
+
+    def test_reclassify_command_uses_process_pool_and_since(self):
+        old = timezone.now() - timedelta(days=30)
+        for i in range(6):
+            SocialPost.objects.create(platform='x', post_id=str(i), author='a', text='vendo audífonos',
+                                      published_at=old if i < 2 else timezone.now())
+
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        call_command('reclassify', '--workers', '2', '--chunk-size', '2', '--since', since, stdout=io.StringIO())
+
+        job = ReclassificationJob.objects.get(since__isnull=False)
+        self.assertEqual((job.status, job.posts_updated), ('done', 4))
+        self.assertEqual(
+            list(SocialPost.objects.order_by('id').values_list('matched_categories', flat=True)),
+            ['', ''] + ['Tecnología'] * 4,
+        )
+
+
+
+class CategoryMaskTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+
+    def test_mask_roundtrip_and_lookup_values(self):
+        mask = categories_to_mask('Tecnología, Comida,Desconocida')
+        self.assertEqual(mask_to_categories(mask), ['Comida', 'Tecnología'])
+        self.assertIn(mask, masks_with_any(categories_to_mask(['Comida'])))
+        self.assertNotIn(mask, masks_with_any(categories_to_mask(['Ropa'])))
+
+    def test_recommendations_filter_by_mask(self):
+        user = User.objects.create_user(username='ana', password='p')
+        SocialAccount.objects.create(user=user, username='ana')
+        persist_posts('x', classify_posts([
+            {'id': '1', 'text': 'vendo pan y audífonos'},
+            {'id': '2', 'text': 'busco camisa'},
+        ]), author='ana')
+        UserInterest.objects.create(user=user, text='libros', matched_categories='Libros')
+        self.assertEqual(UserInterest.objects.get().category_mask, categories_to_mask('Libros'))
+
+        self.client.force_login(user)
+        response = self.client.get(reverse('recommendations'))
+        self.assertCountEqual(response.context['detected_categories'], ['Comida', 'Libros', 'Ropa', 'Tecnología'])
+        response = self.client.get(reverse('recommendations'), {'category': 'Tecnología'})
+        self.assertEqual([p.post_id for p in response.context['page_obj']], ['1'])
+        self.assertEqual(response.context['page_obj'][0].categories_list, ['Comida', 'Tecnología'])
+
+
+class UserRecommendationTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+        self.user = User.objects.create_user(username='ana', password='p')
+        self.seller = User.objects.create_user(username='vende', password='p')
+        SocialAccount.objects.create(user=self.user, username='Ana')
+        self.client.force_login(self.user)
+
+    def _product(self, name, category):
+        return Product.objects.create(
+            name=name, category=category, description='d', price=10, seller=self.seller, image='products/test.jpg',
+        )
+
+    def test_list_is_materialized_and_invalidated(self):
+        pan = self._product('Pan', 'Comida')
+        self._product('Libro', 'Libros')
+        persist_posts('x', classify_posts([{'id': '1', 'text': 'vendo pan'}]), author='ana')
+
+        response = self.client.get(reverse('recommendations'))
+        self.assertEqual([p['id'] for p in response.context['products']], [pan.id])
+        self.assertFalse(UserRecommendation.objects.get(user=self.user).dirty)
+
+        # Sin cambios: una sola lectura por clave
+        with self.assertNumQueries(1):
+            self.assertEqual(get_recommendations(self.user).items[0]['name'], 'Pan')
+
+        # Un producto nuevo de la categoría marca la lista
+        galletas = self._product('Galletas', 'Comida')
+        self.assertTrue(UserRecommendation.objects.get(user=self.user).dirty)
+        response = self.client.get(reverse('recommendations'))
+        # "pan" coincide también por palabra clave, así que supera a Galletas
+        self.assertEqual([p['id'] for p in response.context['products']], [pan.id, galletas.id])
+
+        # Un interés nuevo también
+        UserInterest.objects.create(user=self.user, text='libros', matched_categories='Libros')
+        self.assertTrue(UserRecommendation.objects.get(user=self.user).dirty)
+        call_command('refresh_recommendations', stdout=io.StringIO())
+        self.assertEqual(len(UserRecommendation.objects.get(user=self.user).items), 3)
+
+    def test_other_categories_do_not_invalidate(self):
+        persist_posts('x', classify_posts([{'id': '1', 'text': 'vendo pan'}]), author='ana')
+        self.client.get(reverse('recommendations'))
+        self._product('Camisa', 'Ropa')
+        self.assertFalse(UserRecommendation.objects.get(user=self.user).dirty)
+
+
+class ScoringTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+        scoring.invalidate_product_index()
+        self.user = User.objects.create_user(username='ana', password='p')
+        self.seller = User.objects.create_user(username='vende', password='p')
+        SocialAccount.objects.create(user=self.user, username='Ana')
+
+    def _product(self, name, category):
+        return Product.objects.create(
+            name=name, category=category, description='d', price=10, seller=self.seller, image='products/test.jpg',
+        )
+
+    def test_recent_activity_outweighs_old(self):
+        self._product('Camisa', 'Ropa')
+        self._product('Laptop', 'Tecnología')
+        now = timezone.now()
+        old = UserInterest.objects.create(user=self.user, text='camisa', matched_categories='Ropa')
+        UserInterest.objects.filter(pk=old.pk).update(created_at=now - timedelta(days=120))
+        UserInterest.objects.create(user=self.user, text='laptop', matched_categories='Tecnología')
+
+        index = scoring.get_product_index()
+        affinity = scoring.user_affinity(self.user, index, now)
+        ranked = [Product.objects.get(pk=pk).name for pk, _ in scoring.rank_products(affinity, index, 10, now)]
+        self.assertEqual(ranked, ['Laptop', 'Camisa'])
+        self.assertEqual(scoring.affinity_categories(affinity, index), ['Ropa', 'Tecnología'])
+
+    def test_popularity_breaks_ties_and_unrelated_products_are_excluded(self):
+        self._product('Camisa', 'Ropa')
+        popular = self._product('Camisa', 'Ropa')
+        self._product('Libro', 'Libros')
+        Favorite.objects.create(user=self.user, product=popular)
+        UserInterest.objects.create(user=self.user, text='camisa', matched_categories='Ropa')
+
+        index = scoring.get_product_index()
+        ranked = scoring.rank_products(scoring.user_affinity(self.user, index), index, 10)
+        self.assertEqual(len(ranked), 2)
+        self.assertEqual(ranked[0][0], popular.id)
+
+    def test_neighbors_of_favorites_are_blended(self):
+        pan = self._product('Pan', 'Comida')
+        queso = self._product('Queso', 'Comida')
+        self._product('Camisa', 'Ropa')
+        other = User.objects.create_user(username='beto', password='p')
+        Favorite.objects.create(user=other, product=pan)
+        Favorite.objects.create(user=other, product=queso)
+        Favorite.objects.create(user=self.user, product=pan)
+        rebuild_product_neighbors()
+
+        items = get_recommendations(self.user).items
+        self.assertEqual([p['name'] for p in items], ['Queso'])
+
+    def test_unavailable_neighbors_are_not_recommended(self):
+        pan = self._product('Pan', 'Comida')
+        queso = self._product('Queso', 'Comida')
+        other = User.objects.create_user(username='beto', password='p')
+        Favorite.objects.create(user=other, product=pan)
+        Favorite.objects.create(user=other, product=queso)
+        Favorite.objects.create(user=self.user, product=pan)
+        rebuild_product_neighbors()
+        index = scoring.get_product_index()
+
+        Product.objects.filter(pk=queso.pk).update(available=False)  # sin señales: el índice no se entera
+        self.assertEqual(get_recommendations(self.user).items, [])
+
+        scoring.remove_product(queso.pk)
+        boost = {queso.pk: 1.0}
+        self.assertEqual(scoring.rank_products(np.zeros(index.dimensions, dtype=np.float32), index, 10, boost=boost), [])
+
+    def test_product_changes_update_index_in_place(self):
+        self._product('Camisa', 'Ropa')
+        laptop = self._product('Laptop', 'Tecnología')
+        UserInterest.objects.create(user=self.user, text='camisa laptop', matched_categories='Ropa,Tecnología')
+        index = scoring.get_product_index()
+
+        with mock.patch.object(scoring, 'build_product_index', side_effect=AssertionError('sin reconstruir')):
+            nueva = self._product('Camisa nueva', 'Ropa')
+            index = scoring.get_product_index()
+            self.assertEqual(index.product_ids.tolist(), sorted(index.product_ids.tolist()))
+            affinity = scoring.user_affinity(self.user, index)
+            self.assertIn(nueva.id, [pk for pk, _ in scoring.rank_products(affinity, index, 10)])
+
+            laptop.available = False
+            laptop.save()
+            nueva.delete()
+            ranked = [pk for pk, _ in scoring.rank_products(affinity, scoring.get_product_index(), 10)]
+        self.assertEqual(len(ranked), 1)
+        self.assertNotIn(laptop.id, ranked)
+
+    def test_top_k_over_large_matrix(self):
+        rng = np.random.default_rng(0)
+        size, dims = 100_000, 64
+        index = scoring.ProductIndex(
+            matcher=get_taxonomy_matcher(),
+            features={str(i): i for i in range(dims)},
+            product_ids=np.arange(size, dtype=np.int64),
+            vectors=scoring._normalize_rows(rng.random((size, dims), dtype=np.float32)),
+            popularity=rng.random(size, dtype=np.float32),
+            published=np.full(size, timezone.now().timestamp()),
+        )
+        affinity = rng.random(dims, dtype=np.float32)
+        ranked = scoring.rank_products(affinity / np.linalg.norm(affinity), index, 48)
+        self.assertEqual(len(ranked), 48)
+        scores = [score for _, score in ranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+
+class InterestIndexTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+        self.seller = User.objects.create_user(username='vende', password='p')
+        self.ana = User.objects.create_user(username='ana', password='p')
+        self.beto = User.objects.create_user(username='beto', password='p')
+        SocialAccount.objects.create(user=self.beto, username='Beto')
+        for user in (self.ana, self.beto):
+            UserRecommendation.objects.create(user=user, dirty=False)
+
+    def test_terms_follow_interests_and_posts(self):
+        interest = UserInterest.objects.create(user=self.ana, text='quiero un celular', matched_categories='Tecnología')
+        persist_posts('x', classify_posts([{'id': '1', 'text': 'vendo pan'}]), author='beto')
+        terms = set(InterestTerm.objects.values_list('user__username', 'term'))
+        self.assertTrue({('ana', 'cat:Tecnología'), ('ana', 'kw:celular'), ('beto', 'kw:pan')} <= terms)
+
+        interest.delete()
+        self.assertFalse(InterestTerm.objects.filter(user=self.ana).exists())
+
+    def test_new_product_marks_only_interested_users(self):
+        UserInterest.objects.create(user=self.ana, text='quiero un celular', matched_categories='Tecnología')
+        persist_posts('x', classify_posts([{'id': '1', 'text': 'vendo pan'}]), author='beto')
+        UserRecommendation.objects.update(dirty=False)
+
+        product = Product(name='Pan integral', category='Comida', description='d', price=3,
+                          seller=self.seller, image='products/test.jpg')
+        with self.assertNumQueries(3):  # validación, INSERT y un UPDATE con la subconsulta de términos
+            product.save()
+        self.assertEqual(
+            set(UserRecommendation.objects.filter(dirty=True).values_list('user__username', flat=True)), {'beto'},
+        )
+
+
+class NearDuplicateTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+
+    def test_fingerprint_bands_find_near_copies(self):
+        promo = 'vendo pan artesanal recién horneado en el centro, pedidos por interno'
+        a, b = dedup.simhash(promo), dedup.simhash(promo + '!!')
+        self.assertEqual(a, b)  # la puntuación no cuenta
+        near = dedup.simhash(promo.replace('centro', 'barrio centro'))
+        far = dedup.simhash('busco camisa de algodón talla m para el viernes')
+        self.assertLess(dedup.hamming(a, near), dedup.hamming(a, far))
+        self.assertGreater(dedup.hamming(a, far), dedup.max_distance())
+
+    def test_reposts_are_collapsed_into_the_original(self):
+        promo = 'vendo pan artesanal recién horneado, pedidos por interno'
+        persist_posts('x', classify_posts([{'id': '1', 'text': promo}]), author='panaderia')
+        result = persist_posts('telegram', classify_posts([
+            {'id': 'tg-1', 'text': promo.upper()},
+            {'id': 'tg-2', 'text': f'{promo}!!'},
+            {'id': 'tg-3', 'text': 'busco camisa nueva'},
+        ]), author='Panaderia')
+        self.assertEqual((result.inserted, result.duplicates), (1, 2))
+        original = SocialPost.objects.get(post_id='1')
+        self.assertEqual(original.duplicate_count, 2)
+        self.assertEqual(SocialPost.objects.count(), 2)
+        self.assertEqual(
+            dict(SocialPostAlias.objects.values_list('post_id', 'original_id')), {'tg-1': '1', 'tg-2': '1'},
+        )
+
+    def test_same_text_from_different_authors_is_kept(self):
+        promo = 'vendo pan artesanal recién horneado, pedidos por interno'
+        persist_posts('x', classify_posts([{'id': '1', 'text': promo}]), author='panaderia')
+        result = persist_posts('x', classify_posts([
+            {'id': '2', 'text': promo, 'author': 'otra'},
+            {'id': '3', 'text': promo, 'author': 'tercera'},
+        ]))
+        self.assertEqual((result.inserted, result.duplicates), (2, 0))
+        self.assertEqual(SocialPost.objects.filter(duplicate_count=0).count(), 3)
+        self.assertFalse(SocialPostAlias.objects.exists())
+
+    def test_reingesting_the_same_batch_does_not_recount_duplicates(self):
+        promo = 'vendo pan artesanal recién horneado, pedidos por interno'
+        batch = [{'id': '1', 'text': promo}, {'id': '2', 'text': f'{promo}!!'}, {'id': '3', 'text': promo.upper()}]
+        first = persist_posts('x', classify_posts(batch), author='panaderia')
+        self.assertEqual((first.inserted, first.duplicates), (1, 2))
+
+        again = persist_posts('x', classify_posts(batch), author='panaderia')
+        self.assertEqual((again.inserted, again.duplicates, again.skipped), (0, 0, 3))
+        self.assertEqual(SocialPost.objects.get(post_id='1').duplicate_count, 2)
+
+    def test_old_posts_are_outside_the_window(self):
+        persist_posts('x', classify_posts([{'id': '1', 'text': 'vendo pan casero'}]), author='a')
+        SocialPost.objects.update(published_at=timezone.now() - timedelta(days=30))
+        result = persist_posts('x', classify_posts([{'id': '2', 'text': 'vendo pan casero'}]), author='a')
+        self.assertEqual((result.inserted, result.duplicates), (1, 0))
+
+
+class PayloadStorageTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+
+    def test_payload_is_compressed_and_loaded_lazily(self):
+        persist_posts('x', classify_posts([{'id': '1', 'text': 'vendo pan', 'extra': 'x' * 500}]), author='a')
+        stored = SocialPostPayload.objects.get(post_id='1')
+        self.assertLess(len(stored.data), 200)
+        post = SocialPost.objects.get(post_id='1')
+        with self.assertNumQueries(1):
+            self.assertEqual(post.raw_payload['extra'], 'x' * 500)
+
+    def test_archive_moves_old_payloads_to_daily_partitions(self):
+        persist_posts('x', classify_posts([
+            {'id': '1', 'text': 'vendo pan', 'published_at': datetime(2025, 1, 2, 10, tzinfo=dt_timezone.utc)},
+            {'id': '2', 'text': 'busco camisa', 'published_at': datetime(2025, 1, 3, 10, tzinfo=dt_timezone.utc)},
+            {'id': '3', 'text': 'quiero un celular'},
+        ]), author='a')
+        with tempfile.TemporaryDirectory() as root:
+            call_command('archive_payloads', '--older-than-days', '30', '--dir', root, '--batch-size', '1',
+                         stdout=io.StringIO())
+            self.assertEqual(list(SocialPostPayload.objects.values_list('post_id', flat=True)), ['3'])
+            self.assertTrue(os.path.exists(os.path.join(root, '2025', '01', '02.jsonl.gz')))
+            records = list(iter_archived_payloads(root=root))
+            self.assertEqual([r['post_id'] for r in records], ['1', '2'])
+            self.assertEqual(records[0]['payload']['text'], 'vendo pan')
+            self.assertEqual([r['post_id'] for r in iter_archived_payloads(start=date(2025, 1, 3), root=root)], ['2'])
+            post = SocialPost.objects.get(post_id='1')
+            self.assertIsNone(post.raw_payload)
+            self.assertEqual(find_archived_payload('1', post.published_at, root=root)['text'], 'vendo pan')
+
+
+class PartitionRetentionTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+
+    def _post(self, post_id, published_at):
+        return SocialPost.objects.create(platform='x', post_id=post_id, author='a', text=f'pan {post_id}',
+                                         published_at=published_at, matched_categories='Comida')
+
+    def test_month_helpers_and_recent_window(self):
+        self.assertEqual(partitions.shift_month(202501, -1), 202412)
+        now = datetime(2025, 3, 10, tzinfo=dt_timezone.utc)
+        self.assertEqual(retention_cutoff(3, now), datetime(2025, 1, 1, tzinfo=dt_timezone.utc))
+        self._post('old', datetime(2025, 1, 5, tzinfo=dt_timezone.utc))
+        self._post('older', datetime(2024, 12, 31, 23, tzinfo=dt_timezone.utc))
+        self._post('new', datetime(2025, 3, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(expired_month_counts(retention_cutoff(3, now)), {202412: 1})
+        self.assertEqual(list(SocialPost.objects.recent(30, now).values_list('post_id', flat=True)), ['new'])
+
+    def test_prune_drops_expired_months_and_archives_payloads(self):
+        now = timezone.now()
+        old = now - timedelta(days=400)
+        persist_posts('x', classify_posts([
+            {'id': '1', 'text': 'vendo pan', 'published_at': old},
+            {'id': '2', 'text': 'busco camisa'},
+        ]), author='a')
+        with tempfile.TemporaryDirectory() as root:
+            out = io.StringIO()
+            call_command('prune_social_posts', '--keep-months', '12', '--archive', '--dir', root, stdout=out)
+            self.assertEqual(list(SocialPost.objects.values_list('post_id', flat=True)), ['2'])
+            self.assertEqual([r['post_id'] for r in iter_archived_payloads(root=root)], ['1'])
+        self.assertEqual(list(SocialPostPayload.objects.values_list('post_id', flat=True)), ['2'])
+        self.assertIn('1 post(s) eliminados de 1 mes(es)', out.getvalue())
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+        for post_id, author, text in (
+            ('1', 'Ana', 'Vendo café orgánico de la sierra'),
+            ('2', 'beto', 'Camisas de algodón en promoción'),
+            ('3', 'ana', 'Busco camiseta talla M'),
+        ):
+            SocialPost.objects.create(platform='x', post_id=post_id, author=author, text=text)
+
+    def _ids(self, query):
+        return sorted(search_posts(SocialPost.objects.all(), query).values_list('post_id', flat=True))
+
+    def test_prefix_accent_folding_and_author_filter(self):
+        self.assertEqual(self._ids('cafe'), ['1'])
+        self.assertEqual(self._ids('cami'), ['2', '3'])
+        self.assertEqual(self._ids('cami @ANA'), ['3'])
+        self.assertEqual(self._ids('autor:beto'), ['2'])
+        self.assertEqual(self._ids('café "sierra'), ['1'])  # las comillas no rompen la consulta
+
+    def test_index_follows_updates_and_deletes(self):
+        post = SocialPost.objects.get(post_id='1')
+        post.text = 'Vendo pan artesanal'
+        post.save()
+        self.assertEqual(self._ids('cafe'), [])
+        self.assertEqual(self._ids('artesa'), ['1'])
+        post.delete()
+        self.assertEqual(self._ids('artesa'), [])
+
+    def test_postgres_query_matches_the_indexed_expression(self):
+        editor = mock.Mock(connection=mock.Mock(vendor='postgresql'))
+        install_fts(editor)
+        statements = [c.args[0] for c in editor.execute.call_args_list]
+        document = pg_document('social_ingestion_socialpost')
+        self.assertIn(f'USING GIN (({document}))', statements[-2])
+        self.assertEqual(tsquery_expression(['cafe', 'cami']), 'cafe:* & cami:*')
+
+        with mock.patch.object(search_module.connection, 'vendor', 'postgresql'):
+            sql, params = search_posts(SocialPost.objects.all(), 'Café cami').query.sql_with_params()
+        self.assertIn(f'{document} @@ to_tsquery', sql)
+        self.assertIn('cafe:* & cami:*', params)
+
+    def test_interests_search(self):
+        user = User.objects.create_user(username='u', password='p')
+        UserInterest.objects.create(user=user, text='Me gustan los plátanos', matched_categories='Comida')
+        self.assertEqual(search_interests(UserInterest.objects.all(), 'platano').count(), 1)
+
+
+class PersistPostsTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+
+    def test_bulk_insert_skips_existing_posts(self):
+        SocialPost.objects.create(platform='x', post_id='1', author='a', text='pan')
+        posts = [
+            {'id': '1', 'author': 'a', 'text': 'pan'},
+            {'id': '2', 'author': 'a', 'text': 'camisa nueva'},
+            {'id': '2', 'author': 'a', 'text': 'camisa nueva'},
+            {'id': '3', 'author': 'a', 'text': 'sin coincidencias'},
+        ]
+        classified = classify_posts(posts)
+        self.assertEqual([p['id'] for p, _ in classified], ['1', '2', '2'])
+        with self.assertNumQueries(7):  # savepoint, IN, bandas SimHash, INSERT x2, release, cuentas vinculadas
+            result = persist_posts('x', classified, author='vendedor')
+        self.assertEqual((result.inserted, result.skipped), (1, 2))
+        post = SocialPost.objects.get(post_id='2')
+        self.assertEqual((post.author, post.matched_categories), ('vendedor', 'Ropa'))
+
+
+class RateLimitedFetchTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+        for name in ('ana', 'beto', 'caro'):
+            user = User.objects.create_user(username=name, password='p')
+            SocialAccount.objects.create(user=user, username=name, external_user_id=f'id-{name}')
+
+    def test_token_bucket_follows_headers(self):
+        clock = [1000.0]
+        bucket = TokenBucket(capacity=2, clock=lambda: clock[0])
+        self.assertEqual(bucket.acquire(), 0)
+        bucket.release({'x-rate-limit-limit': '5', 'x-rate-limit-remaining': '0', 'x-rate-limit-reset': '1060'})
+        self.assertEqual(bucket.acquire(), 60)
+        clock[0] = 1061
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.tokens, 4)
+
+    @override_settings(X_BEARER_TOKEN='token', X_RATE_LIMIT_MAX_WAIT=0)
+    def test_throttled_account_does_not_block_others(self):
+        def fake_request(self, bearer, user_id, username, params):
+            if username == 'beto':
+                return XFetchOutcome(status=429, headers={'x-rate-limit-reset': str(int(time.time()) + 900)})
+            text = f'{username} vende pan de la casa'
+            return XFetchOutcome(status=200, posts=[{'id': f'{username}-1', 'author': username, 'text': text}])
+
+        out = io.StringIO()
+        with mock.patch.object(FetchSocialCommand, '_x_timeline_request', fake_request):
+            call_command('fetch_social', '--platform', 'x', '--force', stdout=out)
+        self.assertEqual(set(SocialPost.objects.values_list('author', flat=True)), {'ana', 'caro'})
+        self.assertIn('1 cuenta(s) quedan para la próxima ejecución', out.getvalue())
+
+    @override_settings(X_BEARER_TOKEN='token')
+    def test_cursor_skips_recent_sources_and_tracks_since_id(self):
+        seen_params = []
+
+        def fake_request(self, bearer, user_id, username, params):
+            seen_params.append(dict(params))
+            return XFetchOutcome(
+                status=200,
+                posts=[{'id': f'{100 + len(seen_params)}', 'author': username, 'text': 'nada'}],
+                headers={'x-rate-limit-remaining': '42', 'x-rate-limit-reset': str(int(time.time()) + 900)},
+            )
+
+        with mock.patch.object(FetchSocialCommand, '_x_timeline_request', fake_request):
+            call_command('fetch_social', '--platform', 'x', stdout=io.StringIO())
+            self.assertEqual(len(seen_params), 3)
+            out = io.StringIO()
+            call_command('fetch_social', '--platform', 'x', stdout=out)
+            self.assertEqual(len(seen_params), 3)
+            self.assertIn('cache activa', out.getvalue())
+            call_command('fetch_social', '--platform', 'x', '--force', stdout=io.StringIO())
+
+        cursor = SourceCursor.objects.get(platform='x', source_key='id-ana')
+        self.assertEqual(cursor.rate_remaining, 42)
+        self.assertIn(seen_params[-1]['since_id'], {'101', '102', '103'})
+        self.assertNotIn('since_id', seen_params[0])
+
+
+    @override_settings(X_BEARER_TOKEN='token')
+    def test_page_cap_keeps_since_id_until_the_gap_is_read(self):
+        SourceCursor.objects.create(platform='x', source_key='id-ana', since_id='10')
+        seen_params = []
+
+        def fake_request(self, bearer, user_id, username, params):
+            # Timeline de 10 tweets (20..11) y un tope de 3 por consulta
+            if user_id == 'id-ana':
+                seen_params.append(dict(params))
+            since, until = int(params.get('since_id', 0)), int(params.get('until_id', 10 ** 9))
+            pending = [i for i in range(20, 10, -1) if since < i < until]
+            posts = [{'id': str(i), 'author': username, 'text': f'nada {i}'} for i in pending[:3]]
+            return XFetchOutcome(status=200, posts=posts, complete=len(pending) <= 3)
+
+        with mock.patch.object(FetchSocialCommand, '_x_timeline_request', fake_request):
+            call_command('fetch_social', '--platform', 'x', '--force', stdout=io.StringIO())
+            cursor = SourceCursor.objects.get(platform='x', source_key='id-ana')
+            self.assertEqual((cursor.since_id, cursor.gap_until_id, cursor.gap_newest_id), ('10', '18', '20'))
+            for _ in range(3):
+                call_command('fetch_social', '--platform', 'x', '--force', stdout=io.StringIO())
+            call_command('fetch_social', '--platform', 'x', '--force', stdout=io.StringIO())
+
+        self.assertEqual(
+            [(p['since_id'], p.get('until_id')) for p in seen_params],
+            [('10', None), ('10', '18'), ('10', '15'), ('10', '12'), ('20', None)],
+        )
+        cursor = SourceCursor.objects.get(platform='x', source_key='id-ana')
+        self.assertEqual((cursor.since_id, cursor.gap_until_id, cursor.gap_newest_id), ('20', '', ''))
+
+@override_settings(INGESTION_MIN_INTERVAL=60, INGESTION_MAX_INTERVAL=3600, INGESTION_TARGET_POSTS=5, INGESTION_EWMA_ALPHA=0.5)
+class IngestionSchedulerTests(TestCase):
+    def test_interval_adapts_to_activity_and_quota(self):
+        now = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+        cursor = SourceCursor(platform='x', source_key='1')
+        self.assertEqual(next_interval(cursor, now), 3600)
+
+        # 20 posts en 10 minutos: fuente muy activa, se consulta al mínimo
+        record_fetch(cursor, now, 20, now - timedelta(minutes=10))
+        self.assertEqual(cursor.post_rate, 60)
+        self.assertEqual(cursor.next_fetch_at, now + timedelta(seconds=300))
+
+        # Consultas vacías hacen decaer el promedio y espacian la fuente
+        record_fetch(cursor, now, 0, now - timedelta(hours=1))
+        self.assertEqual(next_interval(cursor, now), 600)
+
+        # 10 peticiones para 3 fuentes en 15 minutos: no bajar de 270s cada una
+        cursor.post_rate = 1000
+        cursor.rate_remaining, cursor.rate_reset_at = 10, now + timedelta(minutes=15)
+        self.assertEqual(next_interval(cursor, now, sharing_sources=3), 270)
+        cursor.rate_remaining = 0
+        self.assertEqual(next_interval(cursor, now), 900)
+
+    def test_queue_pops_earliest_and_reschedules(self):
+        now = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+        queue = SourceQueue()
+        queue.schedule(('x', 'a'), now + timedelta(minutes=5))
+        queue.schedule(('x', 'b'), now)
+        queue.schedule(('x', 'a'), now - timedelta(minutes=1))
+        self.assertEqual(queue.pop_due(now), ('x', 'a'))
+        self.assertEqual(queue.pop_due(now), ('x', 'b'))
+        self.assertIsNone(queue.pop_due(now))
+        self.assertEqual(len(queue), 0)
+
+    @override_settings(X_BEARER_TOKEN='token')
+    def test_daemon_fetches_and_persists_schedule(self):
+        user = User.objects.create_user(username='ana', password='p')
+        SocialAccount.objects.create(user=user, username='ana', external_user_id='id-ana')
+
+        def fake_request(self, bearer, user_id, username, params):
+            return XFetchOutcome(status=200, posts=[{'id': '7', 'author': username, 'text': 'vendo pan'}])
+
+        with mock.patch.object(FetchSocialCommand, '_x_timeline_request', fake_request):
+            call_command('run_ingestion', '--max-fetches', '1', stdout=io.StringIO())
+
+        cursor = SourceCursor.objects.get(platform='x', source_key='id-ana')
+        self.assertEqual(cursor.since_id, '7')
+        self.assertIsNotNone(cursor.next_fetch_at)
+        self.assertTrue(SocialPost.objects.filter(post_id='7').exists())
+
+    @override_settings(X_BEARER_TOKEN='token', X_RATE_LIMIT_MAX_WAIT=90)
+    def test_daemon_reschedules_throttled_source_without_sleeping(self):
+        user = User.objects.create_user(username='ana', password='p')
+        SocialAccount.objects.create(user=user, username='ana', external_user_id='id-ana')
+        reset = int(time.time()) + 30
+
+        def fake_request(self, bearer, user_id, username, params):
+            return XFetchOutcome(status=429, headers={'x-rate-limit-reset': str(reset)})
+
+        command = RunIngestionCommand(stdout=io.StringIO())
+        command.dry_run = False
+        command.fetcher = FetchSocialCommand(stdout=io.StringIO())
+        command.fetcher.setup(force=True, command='run_ingestion')
+        command.queue = SourceQueue()
+        command.sources = {('x', 'id-ana'): 'ana'}
+        now = datetime.now(dt_timezone.utc)
+        with mock.patch.object(FetchSocialCommand, '_x_timeline_request', fake_request), \
+                mock.patch('time.sleep', side_effect=AssertionError('el daemon no debe dormir')):
+            command._run_source(('x', 'id-ana'), now)
+
+        key, due_at = command.queue.peek()
+        self.assertEqual(key, ('x', 'id-ana'))
+        self.assertAlmostEqual((due_at - now).total_seconds(), 30, delta=2)
+        self.assertEqual(IngestionRun.objects.get().throttled, 1)
+
+
+@override_settings(TELEGRAM_WEBHOOK_SECRET='s3cret')
+class TelegramWebhookTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+        SocialSource.objects.create(platform='telegram', handle='-100', active=True)
+
+    def _update(self, update_id, chat_id=-100, text='vendo pan casero'):
+        return {
+            'update_id': update_id,
+            'channel_post': {'message_id': update_id, 'date': 1700000000, 'text': text,
+                             'chat': {'id': chat_id, 'title': 'Ventas'}},
+        }
+
+    def _post(self, body, secret='s3cret'):
+        # La URL literal que se registra en Telegram (sin prefijo de idioma)
+        return self.client.post(
+            '/telegram/webhook/', data=body, content_type='application/json',
+            HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=secret,
+        )
+
+    def test_rejects_wrong_secret(self):
+        self.assertEqual(self._post(self._update(1), secret='otro').status_code, 403)
+        self.assertEqual(self._post(self._update(1), secret='señal').status_code, 403)
+        self.assertFalse(TelegramUpdate.objects.exists())
+
+    def test_webhook_url_has_no_language_prefix(self):
+        self.assertEqual(reverse('telegram_webhook'), '/telegram/webhook/')
+        self.assertEqual(self._post(self._update(1)).status_code, 200)
+        self.assertTrue(TelegramUpdate.objects.filter(update_id=1).exists())
+
+    def test_queues_then_processes_in_bulk(self):
+        self.assertEqual(self._post(self._update(1)).status_code, 200)
+        # Reintento de Telegram del mismo update y un lote con otro chat
+        self._post(self._update(1))
+        self._post([self._update(2, text='audífonos nuevos'), self._update(3, chat_id=-999)])
+        self.assertEqual(TelegramUpdate.objects.count(), 3)
+        self.assertFalse(SocialPost.objects.exists())
+
+        result = process_pending_updates()
+        self.assertEqual((result.fetched, result.inserted), (2, 2))
+        self.assertEqual(set(SocialPost.objects.values_list('post_id', flat=True)), {'-100:1', '-100:2'})
+        self.assertFalse(TelegramUpdate.objects.filter(processed_at__isnull=True).exists())
+        self.assertEqual(process_pending_updates().fetched, 0)
+
+    @override_settings(TELEGRAM_UPDATE_RETENTION_DAYS=7)
+    def test_processed_updates_are_deleted_after_retention(self):
+        self._post([self._update(1), self._update(2, text='audífonos nuevos')])
+        process_pending_updates()
+        TelegramUpdate.objects.filter(update_id=1).update(processed_at=timezone.now() - timedelta(days=8))
+        self._post(self._update(3, text='zapatos de cuero'))
+
+        process_pending_updates()
+        self.assertEqual(set(TelegramUpdate.objects.values_list('update_id', flat=True)), {2, 3})
+        self.assertEqual(SocialPost.objects.count(), 3)
+
+
+class _StubXHandler(BaseHTTPRequestHandler):
+    """Timeline de 3 tweets en dos páginas (la primera petición falla con 503) y users/by"""
+    requests_seen: list = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.requests_seen.append((url.path, query, self.headers.get('Authorization')))
+        if url.path == '/2/users/by':
+            names = query['usernames'].split(',')
+            known = {'ana': '42', 'beto': '43'}
+            self._reply(200, {
+                'data': [{'id': known[n], 'username': n.capitalize()} for n in names if n in known],
+                'errors': [{'parameter': 'usernames', 'value': n} for n in names if n not in known],
+            })
+        elif sum(path.endswith('/tweets') for path, _, _ in self.requests_seen) == 1:
+            self._reply(503, {})
+        elif 'pagination_token' not in query:
+            self._reply(200, {'data': [{'id': '13', 'text': 'vendo pan'}, {'id': '12', 'text': 'nada'}],
+                              'meta': {'next_token': 'p2'}})
+        else:
+            self._reply(200, {'data': [{'id': '11', 'text': 'vendo café'}], 'meta': {}})
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('x-rate-limit-remaining', '100')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class XClientTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubXHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}/2'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        reset_matcher()
+        _StubXHandler.requests_seen = []
+
+    def test_pages_through_next_token_with_retries(self):
+        client = XClient('token', base_url=self.base_url)
+        timeline = client.user_timeline('42', {'since_id': '10'}, max_pages=5)
+        self.assertEqual([t['id'] for t in timeline], ['13', '12', '11'])
+        self.assertTrue(timeline.complete)
+        self.assertEqual(timeline.pages, 2)
+        paths = [(path, query.get('pagination_token')) for path, query, _ in _StubXHandler.requests_seen]
+        self.assertEqual(paths, [('/2/users/42/tweets', None)] * 2 + [('/2/users/42/tweets', 'p2')])
+        self.assertEqual(_StubXHandler.requests_seen[-1][2], 'Bearer token')
+        self.assertEqual(_StubXHandler.requests_seen[-1][1]['since_id'], '10')
+
+    def test_each_extra_page_takes_a_token(self):
+        client = XClient('token', base_url=self.base_url)
+        bucket = TokenBucket(capacity=1)
+        self.assertEqual(bucket.acquire(), 0)  # la ficha de la primera página
+        timeline = client.user_timeline('42', {'since_id': '10'}, max_pages=5, bucket=bucket)
+        self.assertEqual([t['id'] for t in timeline], ['13', '12'])
+        self.assertEqual(timeline.pages, 1)
+        self.assertFalse(timeline.complete)
+
+        _StubXHandler.requests_seen = []
+        bucket = TokenBucket(capacity=2)
+        self.assertEqual(bucket.acquire(), 0)
+        timeline = client.user_timeline('42', {'since_id': '10'}, max_pages=5, bucket=bucket)
+        self.assertEqual([t['id'] for t in timeline], ['13', '12', '11'])
+        self.assertTrue(timeline.complete)
+        # La segunda página devolvió su ficha; solo queda en vuelo la del llamador
+        self.assertEqual(bucket.in_flight, 1)
+
+    def test_fetch_social_catches_up_in_one_run(self):
+        user = User.objects.create_user(username='ana', password='p')
+        SocialAccount.objects.create(user=user, username='ana', external_user_id='42')
+        SourceCursor.objects.create(platform='x', source_key='42', since_id='10')
+
+        with override_settings(X_BEARER_TOKEN='token', X_API_BASE_URL=self.base_url):
+            call_command('fetch_social', '--platform', 'x', '--force', stdout=io.StringIO())
+
+        self.assertEqual(set(SocialPost.objects.values_list('post_id', flat=True)), {'13', '11'})
+        self.assertEqual(SourceCursor.objects.get(source_key='42').since_id, '13')
+
+    def test_resolves_usernames_in_one_batch_and_caches(self):
+        client = XClient('token', base_url=self.base_url)
+        users = [User.objects.create_user(username=n, password='p') for n in ('u1', 'u2', 'u3')]
+        accounts = [
+            SocialAccount.objects.create(user=user, username=name)
+            for user, name in zip(users, ('Ana', '@beto', 'nadie'))
+        ]
+
+        self.assertEqual(backfill_external_ids(accounts, client), 2)
+        self.assertEqual(len(_StubXHandler.requests_seen), 1)
+        self.assertEqual(
+            dict(SocialAccount.objects.values_list('username', 'external_user_id')),
+            {'Ana': '42', '@beto': '43', 'nadie': ''},
+        )
+        self.assertEqual(XUserCache.objects.get(username='nadie').user_id, '')
+
+        # Todo sale de la caché, incluida la cuenta inexistente
+        self.assertEqual(resolve_usernames(['ANA', 'beto', 'nadie'], client), {'ana': '42', 'beto': '43'})
+        self.assertEqual(len(_StubXHandler.requests_seen), 1)
+
+    def test_connect_x_uses_cache_without_calling_api(self):
+        XUserCache.objects.create(username='ana', user_id='42', resolved_at=timezone.now())
+        user = User.objects.create_user(username='ana', password='p')
+        with mock.patch('requests.Session.request', side_effect=AssertionError('sin llamadas a X')):
+            self.client.force_login(user)
+            self.client.post(reverse('connect_x'), {'username': '@Ana'})
+            self.client.post(reverse('connect_x'), {'username': 'otra'})
+            self.client.force_login(User.objects.create_user(username='beto', password='p'))
+            self.client.post(reverse('connect_x'), {'username': 'ana'})
+
+        self.assertEqual(SocialAccount.objects.get(user=user).external_user_id, '')
+        self.assertEqual(SocialAccount.objects.get(user__username='beto').external_user_id, '42')
+
+
+class ReplayHarnessTests(TestCase):
+    def _serve(self, server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_synthetic_timeline_paginates_and_rate_limits(self):
+        server = self._serve(StubAPIServer(('127.0.0.1', 0), config=SyntheticConfig(tweets_per_page=5, pages=2, rate_limit=2)))
+        timeline = XClient('token', base_url=f'{server.base_url}/2').user_timeline('42', {}, max_pages=5)
+        tweets = list(timeline)
+        self.assertEqual(len(tweets), 10)
+        self.assertEqual(len({t['text'] for t in tweets}), 10)
+        self.assertTrue(timeline.complete)
+        self.assertEqual(timeline.headers['x-rate-limit-remaining'], '0')
+
+        exhausted = XClient('token', base_url=f'{server.base_url}/2').user_timeline('42', {})
+        self.assertEqual(list(exhausted), [])
+        self.assertEqual(exhausted.status, 429)
+        self.assertIn('x-rate-limit-reset', exhausted.headers)
+
+    def test_records_cassette_and_replays_it(self):
+        synthetic = self._serve(StubAPIServer(('127.0.0.1', 0), config=SyntheticConfig(tweets_per_page=3, pages=1)))
+        with tempfile.TemporaryDirectory() as tmp:
+            cassette = os.path.join(tmp, 'x.jsonl')
+            with override_settings(SOCIAL_API_CASSETTE=cassette):
+                recorded = [t['id'] for t in XClient('secreto', base_url=f'{synthetic.base_url}/2').user_timeline('7', {})]
+            entries = load_cassette(cassette)
+            self.assertNotIn('secreto', open(cassette).read())
+
+        self.assertEqual(entries[0]['request']['path'], '/2/users/7/tweets')
+        self.assertIn('x-rate-limit-limit', entries[0]['response']['headers'])
+        entries[0]['response']['body']['data'][0]['text'] = 'grabado'
+        replay = self._serve(StubAPIServer(('127.0.0.1', 0), cassettes=entries))
+        tweets = list(XClient('token', base_url=f'{replay.base_url}/2').user_timeline('7', {}))
+        self.assertEqual([t['id'] for t in tweets], recorded)
+        self.assertEqual(tweets[0]['text'], 'grabado')
+
+    def test_telegram_get_updates_against_stub(self):
+        server = self._serve(StubAPIServer(('127.0.0.1', 0), config=SyntheticConfig(updates_per_poll=3)))
+        with override_settings(TELEGRAM_API_BASE_URL=server.base_url):
+            updates = get_updates('123:abc', offset=10).json()['result']
+        self.assertEqual([u['update_id'] for u in updates], [10, 11, 12])
+        self.assertEqual(updates[0]['channel_post']['chat']['id'], -1001)
+
+
+class IngestionMetricsTests(TestCase):
+    def setUp(self):
+        reset_matcher()
+        user = User.objects.create_user(username='ana', password='p')
+        SocialAccount.objects.create(user=user, username='ana', external_user_id='42')
+        SourceCursor.objects.create(platform='x', source_key='42', since_id='1')
+
+    def _fetch(self, **config):
+        server = StubAPIServer(('127.0.0.1', 0), config=SyntheticConfig(**config))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        with override_settings(X_BEARER_TOKEN='token', X_API_BASE_URL=f'{server.base_url}/2', X_MAX_RESULTS=5):
+            call_command('fetch_social', '--platform', 'x', '--force', stdout=io.StringIO())
+        return IngestionRun.objects.get()
+
+    def test_run_and_source_metrics_are_persisted(self):
+        run = self._fetch(tweets_per_page=5, pages=2, rate_limit=50)
+        self.assertEqual((run.command, run.requests, run.throttled, run.fetched), ('fetch_social', 2, 0, 10))
+        self.assertEqual(run.inserted + run.duplicates, run.matched)
+
+        source = run.sources.get()
+        self.assertEqual((source.platform, source.source_key, source.fetched), ('x', '42', 10))
+        self.assertEqual(sum(source.latency_buckets), 2)
+        self.assertEqual((source.rate_limit, source.rate_remaining), (50, 48))
+
+    def test_throttled_requests_are_counted(self):
+        run = self._fetch(error_rate=1.0)
+        self.assertEqual((run.requests, run.throttled, run.errors, run.fetched), (1, 1, 0, 0))
+
+    def test_prometheus_endpoint_reads_stored_metrics(self):
+        self._fetch(tweets_per_page=5, pages=2, rate_limit=50)
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        with override_settings(METRICS_TOKEN='s3creto'):
+            self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer señal').status_code, 403)
+
+        with override_settings(METRICS_TOKEN='s3creto'):
+            response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer s3creto')
+        body = response.content.decode()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('social_ingestion_runs_total{command="fetch_social"} 1', body)
+        self.assertIn('social_ingestion_requests_total{platform="x"} 2', body)
+        self.assertIn('social_ingestion_posts_total{platform="x",stage="fetched"} 10', body)
+        self.assertIn('social_ingestion_request_latency_seconds_bucket{platform="x",le="+Inf"} 2', body)
+        self.assertIn('social_ingestion_rate_limit_remaining{platform="x",source="42"} 48', body)
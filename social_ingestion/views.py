@@ -3,11 +3,20 @@ from django.core.paginator import Paginator
 from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
-import requests
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+import hmac
+import json
 
 from .models import SocialPost, SocialAccount, UserInterest
 from .forms import ConnectXForm, UserInterestForm
-from social_ingestion import recommend_categories_from_text
+from .metrics import render_prometheus
+from social_ingestion import recommend_categories_from_text, telegram
+from .categories import CATEGORY_BITS, mask_to_categories, masks_with_any
+from .recommender import MAX_ITEMS, get_recommendations, serialize_product
+from .resolver import cached_user_ids, normalize_username
+from .search import parse_query, search_interests, search_posts
 from django.conf import settings
 from products.models import Product
 
@@ -30,57 +39,57 @@ def recommendations(request):
         interests_qs = UserInterest.objects.filter(user=request.user)
     
     if category:
-        posts_qs = posts_qs.filter(matched_categories__icontains=category)
-        interests_qs = interests_qs.filter(matched_categories__icontains=category)
+        # Búsqueda indexada: todas las máscaras que incluyen el bit de la categoría
+        masks = masks_with_any(CATEGORY_BITS.get(category, 0))
+        posts_qs = posts_qs.filter(category_mask__in=masks)
+        interests_qs = interests_qs.filter(category_mask__in=masks)
     if query:
-        posts_qs = posts_qs.filter(Q(text__icontains=query) | Q(author__icontains=query))
-        interests_qs = interests_qs.filter(text__icontains=query)
-
-    # Construir lista de categorías detectadas a partir de posts e intereses
-    detected_categories: set[str] = set()
-    for p in posts_qs.order_by('-published_at')[:3]:
-        cats = (p.matched_categories or '')
-        for c in [c.strip() for c in cats.split(',') if c.strip()]:
-            detected_categories.add(c)
-    for i in interests_qs.order_by('-created_at')[:3]:
-        cats = (i.matched_categories or '')
-        for c in [c.strip() for c in cats.split(',') if c.strip()]:
-            detected_categories.add(c)
-
-    # Si el usuario filtró una categoría válida, usarla preferentemente
-    if category:
-        detected_categories = {category}
-
-    # Buscar productos que coincidan con las categorías detectadas
-    products_qs = Product.objects.none()
-    if detected_categories:
-        products_qs = Product.objects.filter(available=True, category__in=sorted(detected_categories))
-    if query:
-        products_qs = products_qs.filter(Q(name__icontains=query) | Q(description__icontains=query))
-
-    products_qs = products_qs.select_related('seller')[:48]
+        # Índice de texto completo: prefijos, sin tildes y @autor (ver search.py)
+        posts_qs = search_posts(posts_qs, query)
+        interests_qs = search_interests(interests_qs, query)
+
+    if request.user.is_authenticated and not category and not query:
+        # Caso común (incluido el iframe del home): lista precalculada, una lectura por clave
+        recommendation = get_recommendations(request.user)
+        detected_categories = recommendation.detected_categories
+        products = recommendation.items
+    else:
+        # Categorías detectadas: OR de las máscaras de los posts e intereses recientes
+        detected_mask = 0
+        for mask in posts_qs.order_by('-published_at').values_list('category_mask', flat=True)[:3]:
+            detected_mask |= mask
+        for mask in interests_qs.order_by('-created_at').values_list('category_mask', flat=True)[:3]:
+            detected_mask |= mask
+        detected_categories = mask_to_categories(detected_mask)
+
+        # Si el usuario filtró una categoría válida, usarla preferentemente
+        if category:
+            detected_categories = [category]
+
+        # Buscar productos que coincidan con las categorías detectadas
+        products_qs = Product.objects.none()
+        if detected_categories:
+            products_qs = Product.objects.filter(available=True, category__in=detected_categories)
+        text_query = parse_query(query).text
+        if text_query:
+            products_qs = products_qs.filter(Q(name__icontains=text_query) | Q(description__icontains=text_query))
+        products = [serialize_product(p) for p in products_qs.order_by('-published_at', '-id')[:MAX_ITEMS]]
 
     # Paginación de posts para referencia
     paginator = Paginator(posts_qs, 12)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    for p in page_obj.object_list:
-        cats = (p.matched_categories or '')
-        p.categories_list = [c.strip() for c in cats.split(',') if c.strip()]
 
-    # Preparar intereses para mostrar
+    # Intereses recientes (cada uno expone categories_list a partir de su máscara)
     recent_interests = interests_qs.order_by('-created_at')[:5]
-    for i in recent_interests:
-        cats = (i.matched_categories or '')
-        i.categories_list = [c.strip() for c in cats.split(',') if c.strip()]
 
     categories = ['Comida', 'Ropa', 'Tecnología', 'Libros']
     # Modo embed: simplificar layout para el iframe del home
     is_embed = request.GET.get('embed') == '1'
     context = {
         'page_obj': page_obj,
-        'products': products_qs,
-        'detected_categories': sorted(detected_categories),
+        'products': products,
+        'detected_categories': detected_categories,
         'category': category,
         'query': query,
         'categories': categories,
@@ -102,30 +111,21 @@ def connect_x(request):
         form = ConnectXForm(request.POST)
         if form.is_valid():
             username = form.cleaned_data['username'].strip().lstrip('@')
-            bearer = getattr(settings, 'X_BEARER_TOKEN', '').strip()
-            user_id = None
-            if bearer and username:
-                url = f"https://api.twitter.com/2/users/by/username/{username}"
-                headers = {"Authorization": f"Bearer {bearer}"}
-                try:
-                    resp = requests.get(url, headers=headers, timeout=10)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        user_id = data.get('data', {}).get('id')
-                except requests.exceptions.RequestException:
-                    user_id = None
+            # Sin llamadas a la API: el id sale de la caché o lo completa la próxima ingesta por lotes
+            user_id = cached_user_ids([username]).get(normalize_username(username), '')
 
             if existing:
-                existing.username = username
-                if user_id:
+                if normalize_username(existing.username) != normalize_username(username):
                     existing.external_user_id = user_id
+                existing.username = username
+                existing.external_user_id = existing.external_user_id or user_id
                 existing.save()
             else:
                 SocialAccount.objects.create(
                     user=request.user,
                     platform='x',
                     username=username,
-                    external_user_id=user_id or '',
+                    external_user_id=user_id,
                 )
             return redirect('connect_x')
     else:
@@ -155,4 +155,36 @@ def add_interest(request):
     return render(request, 'social_ingestion/add_interest.html', {'form': form})
 
 
+@csrf_exempt
+@require_POST
+def telegram_webhook(request):
+    """Recibe updates de Telegram y los encola; la clasificación ocurre en process_telegram_updates"""
+    secret = getattr(settings, 'TELEGRAM_WEBHOOK_SECRET', '')
+    received = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+    # Comparar bytes: compare_digest con str no admite caracteres fuera de ASCII
+    if not secret or not hmac.compare_digest(received.encode('utf-8'), secret.encode('utf-8')):
+        return HttpResponseForbidden()
+    try:
+        body = json.loads(request.body)
+    except ValueError:
+        return HttpResponseBadRequest()
+    # Telegram envía un update por petición; también se acepta una lista
+    updates = body if isinstance(body, list) else [body]
+    queued = telegram.enqueue_updates(updates)
+    return JsonResponse({'ok': True, 'queued': queued})
+
+
+def ingestion_metrics(request):
+    """Métricas de ingesta y cuota en formato Prometheus (lee solo la BD, no consulta las APIs)"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        received = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        allowed = hmac.compare_digest(received.encode('utf-8'), token.encode('utf-8'))
+    else:
+        allowed = request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 # Create your views here.